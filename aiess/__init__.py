@@ -1,4 +1,5 @@
 from .objects import User, Beatmapset, Discussion, Usergroup, NewsPost, Event
 from .errors import ParsingError, DeletedContextError
 from .reader import Reader
-from .database import Database
\ No newline at end of file
+from .host import ReaderHost
+from .database import Database, AsyncDatabase
\ No newline at end of file
@@ -0,0 +1,98 @@
+import sys
+import copy
+import random
+import itertools
+from time import perf_counter
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from aiess import Event, Beatmapset, User
+from aiess import event_types as types
+from aiess.reader import merge_concurrent, MERGABLE_TYPES
+
+BATCH_SIZES = [100, 1000, 3000]
+
+def merge_concurrent_quadratic(events: Iterable[Event]) -> List[Event]:
+    """The former implementation of `aiess.reader.merge_concurrent`, comparing every pair of events.
+    Kept as the reference both the results and timings of the current implementation are compared to."""
+    new_events = list(dict.fromkeys(copy.deepcopy(list(events))))
+    new_events = list(sorted(new_events, key=lambda event: event.time))
+    merged_events = []
+
+    for event, other_event in itertools.permutations(reversed(new_events), 2):
+        if abs((event.time - other_event.time).total_seconds()) > 1:
+            continue
+
+        if event.beatmapset != other_event.beatmapset:
+            continue
+
+        if (event.type, other_event.type) in MERGABLE_TYPES:
+            if event in merged_events or other_event in merged_events:
+                continue
+
+            if other_event in new_events:
+                event.type = other_event.type
+                merged_events.append(event)
+                new_events.remove(other_event)
+
+    return new_events
+
+def synthetic_events(count: int, seed: int=0) -> List[Event]:
+    """Returns `count` events spread over a number of beatmapsets in proportion, clustered within seconds of
+    each other such that many are candidates for merging (e.g. nominate, nominate, qualify within 1 second),
+    including duplicates as the scraper would produce them. Same seed, same events."""
+    rng = random.Random(seed)
+    beatmapsets = [
+        Beatmapset(_id, artist="artist", title="title", creator=User(_id, "creator"), modes=["osu"], genre="g", language="l")
+        for _id in range(1, count // 20 + 2)
+    ]
+    # Users of the former events of merges are distinct from those of the latter, as they would be in practice.
+    mappers = [User(_id, f"user {_id}") for _id in range(1000, 1050)]
+    admins  = [User(_id, f"admin {_id}") for _id in range(2000, 2005)]
+    former_types = [types.NOMINATE, types.PROBLEM, types.REPLY]
+    latter_types = [types.QUALIFY, types.RESET, types.DISQUALIFY, types.RESOLVE, types.REOPEN]
+    other_types  = [types.PRAISE, types.HYPE, types.SUGGESTION]
+
+    start = datetime(2020, 1, 1)
+    events = []
+    while len(events) < count:
+        beatmapset = rng.choice(beatmapsets) if rng.random() < 0.95 else None
+        time = start + timedelta(seconds=rng.randrange(count * 5))
+        for _ in range(rng.randint(1, 4)):
+            roll = rng.random()
+            if roll < 0.4:
+                event = Event(rng.choice(former_types), time, beatmapset, user=rng.choice(mappers))
+            elif roll < 0.7:
+                event = Event(rng.choice(latter_types), time, beatmapset, user=rng.choice(admins + [None]))
+            else:
+                event = Event(rng.choice(other_types), time, beatmapset, user=rng.choice(mappers))
+            events.append(event)
+            if rng.random() < 0.05:
+                events.append(copy.deepcopy(event))
+            time += timedelta(seconds=rng.randint(0, 1))
+
+    return events[:count]
+
+def run(batch_sizes: List[int]=BATCH_SIZES) -> None:
+    """Prints the time taken by either implementation to merge synthetic batches of each size."""
+    for batch_size in batch_sizes:
+        events = synthetic_events(batch_size)
+
+        start_time = perf_counter()
+        merged_events = merge_concurrent(events)
+        time = perf_counter() - start_time
+
+        start_time = perf_counter()
+        expected_events = merge_concurrent_quadratic(events)
+        former_time = perf_counter() - start_time
+
+        assert merged_events == expected_events, f"Results differ for {batch_size} events."
+        print(
+            f"{batch_size:>6} events -> {len(merged_events):>6} | "
+            f"current {time * 1000:>9.1f} ms | former {former_time * 1000:>9.1f} ms | "
+            f"{former_time / time:>6.1f}x"
+        )
+
+if __name__ == "__main__":
+    # E.g. `python -m aiess.benchmarks.merge_concurrent 1000 10000`.
+    run([int(arg) for arg in sys.argv[1:]] or BATCH_SIZES)
@@ -0,0 +1,50 @@
+from contextlib import suppress
+import os
+
+from aiess.settings import ROOT_PATH
+
+PATH_PREFIX = ROOT_PATH + "checkpoints/"
+
+FILE_NAME_PREFIX = "last_id-"
+FILE_NAME_POSTFIX = ".txt"
+
+def get_last(_id: str) -> int:
+    """Returns the last event id we're done with for this id, or None if no checkpoint exists yet.
+    Raises ValueError if the checkpoint exists but has invalid contents (e.g. corruption due to power loss),
+    to prevent silent failure."""
+    path = get_path(_id)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r") as _file:
+        last_id_text = _file.read().strip()
+        if not last_id_text:
+            raise ValueError(f"{path} has no contents.")
+
+        return int(last_id_text)
+
+def set_last(last_id: int, _id: str) -> None:
+    """Sets the last event id we're done with for this id. Creates the respective file if it does not exist.
+
+    The checkpoint is written to a temporary file first and then moved in place, so a crash while writing
+    leaves either the previous or the new checkpoint, never an empty or partial one."""
+    if not os.path.exists(PATH_PREFIX):
+        os.makedirs(PATH_PREFIX)
+
+    path = get_path(_id)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as _file:
+            _file.write(str(last_id))
+        os.replace(temp_path, path)
+    finally:
+        with suppress(OSError):
+            os.remove(temp_path)
+
+def exists(_id: str) -> bool:
+    """Returns whether a checkpoint for this id exists."""
+    return os.path.exists(get_path(_id))
+
+def get_path(_id: str) -> str:
+    """Returns the path to the checkpoint file with the given identifier."""
+    return f"{PATH_PREFIX}{FILE_NAME_PREFIX}{_id}{FILE_NAME_POSTFIX}"
@@ -1,19 +1,47 @@
 import asyncio
+import functools
+import inspect
+import itertools
+import threading
 import mysql.connector
-from mysql.connector.errors import Error, OperationalError
-from typing import List, Generator, Tuple
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Generator, Tuple, Dict, Iterable, Callable, Union
 from enum import Enum
 from datetime import datetime
+from time import perf_counter
 
 from aiess.objects import User, Beatmapset, Discussion, Event, NewsPost, Usergroup
-from aiess.settings import DB_CONFIG
-from aiess.logger import log
+from aiess.pool import get_pool
+from aiess.registry import registry
+from aiess import query_cache
+from aiess.query_stats import query_stats
+from aiess.settings import DB_POOL_SIZE
 from aiess.common import anext
 from aiess import event_types as types
 
 SCRAPER_DB_NAME      = "aiess"
 SCRAPER_TEST_DB_NAME = "aiess_test"
 
+# Rows per multi-row insert query, keeps us well below the max packet size of MySQL.
+INSERT_CHUNK_SIZE = 500
+
+# Rows read from the server at a time when streaming (e.g. `retrieve_events` with a `chunk_size`).
+STREAM_CHUNK_SIZE = 1000
+# Fields of events which are hydrated from other tables, see `Database.hydrate_events`.
+EVENT_FIELDS = ["beatmapset", "discussion", "user", "newspost"]
+
+# Blocking queries made from async code run on these threads instead of the event loop.
+# One thread per pooled connection, so threads never have to wait on each other for a connection.
+executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="aiess-db")
+
+async def run_in_executor(func: Callable, *args, **kwargs) -> object:
+    """Calls the given blocking function with the given arguments on a database worker thread,
+    and returns its result once done, without blocking the event loop in the meantime."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
 class InterpolationDict(dict):
     def __missing__(self, key):
         return "%(" + key + ")s"
@@ -31,34 +59,46 @@ class Database:
 
     def __init__(self, _db_name: str):
         self.db_name = _db_name
-        db_config = {
-            "host":     DB_CONFIG["host"],
-            "port":     int(DB_CONFIG["port"]),
-            "database": self.db_name,
-            "user":     DB_CONFIG["user"],
-            "password": DB_CONFIG["password"]
-        }
-        
-        try:
-            self.connection = mysql.connector.connect(**db_config)
-        except Error as error:
-            raise ValueError(f"Could not connect to MySQL; {error}")
-    
-    def __get_cursor(self):
-        attempts = 0
-        while(attempts < 3):
-            attempts += 1
+        # Connections are shared across all database objects with the same name, see `aiess.pool`.
+        self.pool = get_pool(_db_name)
+        # Connection pinned by `transaction`, separate for each thread using this object.
+        self.__local = threading.local()
+
+    @contextmanager
+    def transaction(self) -> Generator[None, None, None]:
+        """Runs any query within the with-block on the same connection, and commits them all at once afterwards.
+        Rolls back all of them if an exception is raised instead. Nested transactions join the outermost one."""
+        if getattr(self.__local, "connection", None) is not None:
+            yield
+            return
+
+        with self.pool.connection() as connection:
+            self.__local.connection = connection
+            self.__local.written_tables = set()
             try:
-                return self.connection.cursor()
-            except OperationalError as error:
-                log(f"WARNING | {error}")
-                self.__init__(self.db_name)
-
-    def __del__(self):
-        """Clears up allocated resources such as memory upon destruction."""
-        if (hasattr(self, "connection") and self.connection.is_connected()):
-            self.connection.cursor().close()
-            self.connection.close()
+                yield
+                connection.commit()
+            finally:
+                self.__local.connection = None
+                # Also after a rollback, since results may have been cached from within the transaction.
+                query_cache.invalidate(self.db_name, self.__local.written_tables)
+
+    def in_transaction(self) -> bool:
+        """Returns whether the current thread is within a `transaction` of this database."""
+        return getattr(self.__local, "connection", None) is not None
+
+    @contextmanager
+    def __connection(self) -> Generator[object, None, None]:
+        """Yields the connection pinned by an ongoing transaction, if any, otherwise checks one out from the pool
+        and commits once the with-block exits."""
+        connection = getattr(self.__local, "connection", None)
+        if connection is not None:
+            yield connection
+            return
+
+        with self.pool.connection() as connection:
+            yield connection
+            connection.commit()
     
     def __fetch(self, cursor: object) -> List[tuple]:
         """Attempts to return fetch all from a cursor object. Does not throw if nothing to fetch.
@@ -74,14 +114,18 @@ class Database:
     def _execute(self, query: str, values: tuple=None) -> List[tuple]:
         """Executes the given SQL query with the given argument values, if any. Use like "%s" in query
         and ("name",) in values. Returns the fetched result sets as a list of tuples, or None if no result."""
-        cursor = self.__get_cursor()
-        cursor.nextset()
-        cursor.execute(query, values)
-
-        fetch = self.__fetch(cursor)
-        cursor.close()
-        self.connection.commit()
-        return fetch
+        with self.__connection() as connection:
+            cursor = connection.cursor()
+            try:
+                start_time = perf_counter()
+                cursor.execute(query, values)
+                result = self.__fetch(cursor)
+                self.__record(cursor, query, values, perf_counter() - start_time, result)
+            finally:
+                cursor.close()
+
+        self.__invalidate_written(query)
+        return result
     
     def __execute_dict(self, query: str, **values: object) -> List[tuple]:
         """Executes the given SQL query with the given argument values, if any. Use like "%(name)s" in query
@@ -92,13 +136,76 @@ class Database:
         """Executes the given SQL query over multiple values (e.g. list or array of tuples).
         Use like "%s, %s" in query and array of (id, name) in values.
         Returns the fetched result sets as a list of tuples, or None of no result."""
-        cursor = self.connection.cursor()
-        cursor.nextset()
-        cursor.executemany(query, values)
+        with self.__connection() as connection:
+            cursor = connection.cursor()
+            try:
+                start_time = perf_counter()
+                cursor.executemany(query, values)
+                result = self.__fetch(cursor)
+                self.__record(cursor, query, values, perf_counter() - start_time, result)
+            finally:
+                cursor.close()
+
+        self.__invalidate_written(query)
+        return result
+
+    def _stream(self, query: str, values: tuple=None, chunk_size: int=STREAM_CHUNK_SIZE) -> Generator[List[tuple], None, None]:
+        """Executes the given SQL query with the given argument values, if any, and yields its result rows in lists of up to
+        `chunk_size` rows. Rows are read from the server as they are needed through an unbuffered cursor, rather than all at once,
+        so memory use does not grow with the size of the result.
+
+        The connection is held until the generator is exhausted or closed, and MySQL drops it if the next chunk is not read
+        within its `net_write_timeout`, so consumers should not take long per chunk. Within a transaction, the pinned connection is
+        needed for other queries in the meantime, so the result is read at once there and only yielded in chunks."""
+        if self.in_transaction():
+            rows = self._execute(query, values) or []
+            for index in range(0, len(rows), chunk_size):
+                yield rows[index:index + chunk_size]
+            return
+
+        connection = self.pool.checkout()
+        exhausted = False
+        try:
+            cursor = connection.cursor(buffered=False)
+            # Only time spent on the query itself counts, not time spent by the consumer in between chunks.
+            start_time = perf_counter()
+            cursor.execute(query, values)
+            duration = perf_counter() - start_time
+            row_count = 0
+            while True:
+                start_time = perf_counter()
+                rows = cursor.fetchmany(chunk_size)
+                duration += perf_counter() - start_time
+                if not rows:
+                    break
+                row_count += len(rows)
+                yield rows
+            query_stats.record(self.db_name, query, values, duration, row_count)
+            cursor.close()
+            connection.commit()
+            exhausted = True
+        finally:
+            if exhausted:
+                self.pool.checkin(connection)
+            else:
+                # Any unread rows would otherwise need to be read in full before the connection could be used again.
+                self.pool.discard(connection)
 
-        fetch = self.__fetch(cursor)
-        self.connection.commit()
-        return fetch
+    def __record(self, cursor: object, query: str, values: object, duration: float, result: List[tuple]) -> None:
+        """Records the latency and number of rows read or affected by the given query, see `aiess.query_stats`."""
+        rows = len(result) if result is not None else max(cursor.rowcount, 0)
+        query_stats.record(self.db_name, query, values, duration, rows)
+
+    def __invalidate_written(self, query: str) -> None:
+        """Drops any cached results read from tables the given query wrote to, see `aiess.query_cache`.
+        Within a transaction this is deferred until the transaction ends, as the write is not visible before then."""
+        if not query_cache.is_write(query):
+            return
+
+        if self.in_transaction():
+            self.__local.written_tables.update(query_cache.tables_in(query))
+        else:
+            query_cache.invalidate(self.db_name, query_cache.tables_in(query))
 
     def __raise_missing(self, message: str):
         raise ValueError(f"""
@@ -130,10 +237,49 @@ class Database:
 
         return self.__execute_dict(query, **new_column_dict)
 
+    def insert_table_data_many(self, table: str, new_column_dicts: List[dict]) -> None:
+        """Inserts all dictionaries into the table, or if already present, updates the columns, using multi-row queries
+        of up to `INSERT_CHUNK_SIZE` rows each. All dictionaries should have the same keys, which are column names,
+        with values being their respective value to assign."""
+        if not new_column_dicts:
+            return
+
+        keys = list(new_column_dicts[0].keys())
+        key_string = ", ".join(keys)
+        row_format_string = "(" + ", ".join(["%s"] * len(keys)) + ")"
+        keyword_format_string = ", ".join(f"{key}=VALUES({key})" for key in keys)
+
+        for index in range(0, len(new_column_dicts), INSERT_CHUNK_SIZE):
+            chunk = new_column_dicts[index:index + INSERT_CHUNK_SIZE]
+            query = """
+                INSERT INTO %(db_name)s.%(table)s (%(key_string)s)
+                VALUES %(rows_format_string)s
+                ON DUPLICATE KEY
+                UPDATE %(keyword_format_string)s
+                """ % InterpolationDict(
+                    db_name               = self.db_name,
+                    table                 = table,
+                    key_string            = key_string,
+                    rows_format_string    = ", ".join([row_format_string] * len(chunk)),
+                    keyword_format_string = keyword_format_string
+                )
+
+            self._execute(query, tuple(column_dict[key] for column_dict in chunk for key in keys))
+
     def retrieve_table_data(self, table: str, where: str=None, where_values: tuple=None, selection: str="*") -> List[tuple]:
         """Returns all rows from the table where the WHERE clause applies (e.g. `where` as "type=%s AND id=%s" and 
         `where_values` as ("nominate", 5)), if specified, otherwise any data present in the table."""
-        return self._execute("""
+        return self._execute(self.__select_query(table, where, selection), where_values)
+
+    def stream_table_data(
+            self, table: str, where: str=None, where_values: tuple=None, selection: str="*",
+            chunk_size: int=STREAM_CHUNK_SIZE) -> Generator[List[tuple], None, None]:
+        """Same as `retrieve_table_data`, except the rows are yielded in lists of up to `chunk_size` rows as they are
+        read from the server, see `_stream`."""
+        return self._stream(self.__select_query(table, where, selection), where_values, chunk_size)
+
+    def __select_query(self, table: str, where: str=None, selection: str="*") -> str:
+        return """
             SELECT %(selection)s FROM %(db_name)s.%(table)s
             WHERE %(where)s
             """ % InterpolationDict(
@@ -141,9 +287,7 @@ class Database:
                 db_name   = self.db_name,
                 table     = table,
                 where     = where if where else "TRUE"
-            ),
-            where_values
-        )
+            )
 
     def delete_table_data(self, table: str, where: str, where_values: tuple=None, ignore_exception: bool=False) -> List[tuple]:
         """Deletes all rows from the table where the WHERE clause applies (e.g. `where` as "type=%s AND id=%s" and 
@@ -164,15 +308,20 @@ class Database:
     def clear_table_data(self, table: str) -> None:
         """Deletes all rows from the table. Ignores the foreign key check, meaning this
         will disconnect keys from values. As such use with care."""
-        self._execute("SET FOREIGN_KEY_CHECKS = 0")
-        self._execute("""
-            TRUNCATE %(db_name)s.%(table)s
-            """ % InterpolationDict(
-                db_name = self.db_name,
-                table   = table
-            )
-        )
-        self._execute("SET FOREIGN_KEY_CHECKS = 1")
+        # The foreign key check is a session variable, so all of these need to run on the same connection.
+        with self.transaction():
+            self._execute("SET FOREIGN_KEY_CHECKS = 0")
+            try:
+                self._execute("""
+                    TRUNCATE %(db_name)s.%(table)s
+                    """ % InterpolationDict(
+                        db_name = self.db_name,
+                        table   = table
+                    )
+                )
+            finally:
+                # Otherwise the pooled connection would keep ignoring foreign keys for whoever uses it next.
+                self._execute("SET FOREIGN_KEY_CHECKS = 1")
     
     def delete_group_user(self, group: Usergroup, user: User) -> None:
         """Deletes the given user to group relation from the group_users table."""
@@ -182,15 +331,15 @@ class Database:
             where_values = (group.id, user.id)
         )
 
+    def __user_columns(self, user: User) -> dict:
+        return dict(
+            id   = user.id,
+            name = user.name
+        )
+
     def insert_user(self, user: User) -> None:
         """Inserts/updates the given user object into the users table."""
-        self.insert_table_data(
-            "users",
-            dict(
-                id   = user.id,
-                name = user.name
-            )
-        )
+        self.insert_table_data("users", self.__user_columns(user))
     
     def insert_beatmapset_modes(self, beatmapset: Beatmapset) -> None:
         """Inserts/updates the beatmapset-modes relation of the given beatmapset.
@@ -216,21 +365,53 @@ class Database:
             beatmapset_mode_pairs
         )
     
+    def insert_beatmapsets_modes(self, beatmapsets: Iterable[Beatmapset]) -> None:
+        """Inserts/updates the beatmapset-modes relations of all given beatmapsets, using one query to delete
+        the old modes and one to insert the new ones."""
+        beatmapsets = list(beatmapsets)
+        if not beatmapsets:
+            return
+
+        # Ensures any mode no longer present in the sets is not included.
+        self._execute("""
+            DELETE IGNORE FROM {db_name}.beatmapset_modes
+            WHERE beatmapset_id IN ({id_format_string})
+            """.format(
+                db_name          = self.db_name,
+                id_format_string = ", ".join(["%s"] * len(beatmapsets))
+            ),
+            tuple(beatmapset.id for beatmapset in beatmapsets)
+        )
+
+        beatmapset_mode_pairs = [(beatmapset.id, mode) for beatmapset in beatmapsets for mode in beatmapset.modes]
+        if not beatmapset_mode_pairs:
+            return
+
+        self._execute("""
+            INSERT IGNORE INTO {db_name}.beatmapset_modes (beatmapset_id, mode)
+            VALUES {pair_format_string}
+            """.format(
+                db_name            = self.db_name,
+                pair_format_string = ", ".join(["(%s, %s)"] * len(beatmapset_mode_pairs))
+            ),
+            tuple(value for pair in beatmapset_mode_pairs for value in pair)
+        )
+
     def insert_beatmapset(self, beatmapset: Beatmapset) -> None:
         """Inserts/updates the given beatmapset object into the beatmapsets table and modes into the beatmapset_modes table.
         Also inserts/updates the creator into the users table."""
         self.insert_user(beatmapset.creator)
         self.insert_beatmapset_modes(beatmapset)
-        self.insert_table_data(
-            "beatmapsets",
-            dict(
-                id         = beatmapset.id,
-                title      = beatmapset.title,
-                artist     = beatmapset.artist,
-                creator_id = beatmapset.creator.id,
-                genre      = beatmapset.genre,
-                language   = beatmapset.language
-            )
+        self.insert_table_data("beatmapsets", self.__beatmapset_columns(beatmapset))
+
+    def __beatmapset_columns(self, beatmapset: Beatmapset) -> dict:
+        return dict(
+            id         = beatmapset.id,
+            title      = beatmapset.title,
+            artist     = beatmapset.artist,
+            creator_id = beatmapset.creator.id,
+            genre      = beatmapset.genre,
+            language   = beatmapset.language
         )
     
     def insert_discussion(self, discussion: Discussion) -> None:
@@ -239,22 +420,22 @@ class Database:
         if discussion.beatmapset: self.insert_beatmapset(discussion.beatmapset)
         if discussion.user: self.insert_user(discussion.user)
         
+        self.insert_table_data("discussions", self.__discussion_columns(discussion))
+
+    def __discussion_columns(self, discussion: Discussion) -> dict:
         # These will be missing when scraped from /events (e.g. disqualify, nomination_reset),
         # but should then be filled in through the respective /beatmap-discussions events before
         # being inserted into the database.
         if discussion.user is None: self.__raise_missing("User is missing from discussion")
         if discussion.content is None: self.__raise_missing("Content is missing from discussion")
 
-        self.insert_table_data(
-            "discussions",
-            dict(
-                id            = discussion.id,
-                beatmapset_id = discussion.beatmapset.id,
-                user_id       = discussion.user.id,
-                content       = discussion.content,
-                tab           = discussion.tab,
-                difficulty    = discussion.difficulty
-            )
+        return dict(
+            id            = discussion.id,
+            beatmapset_id = discussion.beatmapset.id,
+            user_id       = discussion.user.id,
+            content       = discussion.content,
+            tab           = discussion.tab,
+            difficulty    = discussion.difficulty
         )
     
     def insert_newspost(self, newspost: NewsPost) -> None:
@@ -262,17 +443,17 @@ class Database:
         Also inserts/updates the associated user (i.e. author of the newspost)."""
         # Specifically checks `author.id`, as the id may be None in case of e.g. "The Spotlight Team".
         if newspost.author.id: self.insert_user(newspost.author)
-        self.insert_table_data(
-            "newsposts",
-            dict(
-                id          = newspost.id,
-                title       = newspost.title,
-                preview     = newspost.preview,
-                author_id   = newspost.author.id,
-                author_name = newspost.author.name,
-                slug        = newspost.slug,
-                image_url   = newspost.image_url
-            )
+        self.insert_table_data("newsposts", self.__newspost_columns(newspost))
+
+    def __newspost_columns(self, newspost: NewsPost) -> dict:
+        return dict(
+            id          = newspost.id,
+            title       = newspost.title,
+            preview     = newspost.preview,
+            author_id   = newspost.author.id,
+            author_name = newspost.author.name,
+            slug        = newspost.slug,
+            image_url   = newspost.image_url
         )
     
     def insert_group_user(self, group: Usergroup, user: User) -> None:
@@ -297,21 +478,71 @@ class Database:
         if event.group:
             if event.type == types.ADD:    self.insert_group_user(event.group, event.user)
             if event.type == types.REMOVE: self.delete_group_user(event.group, event.user)
-        self.insert_table_data(
-            "events",
-            dict(
-                insert_time   = datetime.utcnow(),
-                time          = event.time,
-                type          = event.type,
-                beatmapset_id = event.beatmapset.id if event.beatmapset is not None else None,
-                discussion_id = event.discussion.id if event.discussion is not None else None,
-                user_id       = event.user.id if event.user is not None else None,
-                group_id      = event.group.id if event.group is not None else None,
-                group_mode    = event.group.mode if event.group is not None else None,
-                news_id       = event.newspost.id if event.newspost is not None else None,
-                content       = event.content if event.content is not None else None
-            )
+        self.insert_table_data("events", self.__event_columns(event))
+
+    def __event_columns(self, event: Event) -> dict:
+        return dict(
+            insert_time   = datetime.utcnow(),
+            time          = event.time,
+            type          = event.type,
+            beatmapset_id = event.beatmapset.id if event.beatmapset is not None else None,
+            discussion_id = event.discussion.id if event.discussion is not None else None,
+            user_id       = event.user.id if event.user is not None else None,
+            group_id      = event.group.id if event.group is not None else None,
+            group_mode    = event.group.mode if event.group is not None else None,
+            news_id       = event.newspost.id if event.newspost is not None else None,
+            content       = event.content if event.content is not None else None
         )
+
+    def insert_events(self, events: List[Event]) -> None:
+        """Inserts/updates the given events into the events table, along with any other values (e.g. beatmapset,
+        discussion, user) into their respective tables. Results in the same state as calling `insert_event` for each
+        event in order, except everything is written in one transaction, and values referred to by several events
+        are only written once (the last version of them, same as if updated one after the other).
+
+        If any event is incomplete (e.g. missing discussion content), nothing is inserted."""
+        users       = {}
+        beatmapsets = {}
+        discussions = {}
+        newsposts   = {}
+        group_users = {}  # Only the last addition/removal of a user in a group matters.
+
+        def add_beatmapset(beatmapset: Beatmapset) -> None:
+            users[beatmapset.creator.id] = beatmapset.creator
+            beatmapsets[beatmapset.id] = beatmapset
+
+        for event in events:
+            if event.beatmapset: add_beatmapset(event.beatmapset)
+            if event.user:       users[event.user.id] = event.user
+            if event.discussion:
+                if event.discussion.beatmapset: add_beatmapset(event.discussion.beatmapset)
+                if event.discussion.user:       users[event.discussion.user.id] = event.discussion.user
+                discussions[event.discussion.id] = event.discussion
+            if event.newspost:
+                if event.newspost.author.id: users[event.newspost.author.id] = event.newspost.author
+                newsposts[event.newspost.id] = event.newspost
+            if event.group and event.type in [types.ADD, types.REMOVE]:
+                group_users[(event.group.id, event.user.id)] = event.type
+
+        # Done before writing anything, so that incomplete discussions don't leave us with half a batch.
+        discussion_column_dicts = [self.__discussion_columns(discussion) for discussion in discussions.values()]
+        removed_group_users = [key for key, _type in group_users.items() if _type == types.REMOVE]
+        added_group_users   = [key for key, _type in group_users.items() if _type == types.ADD]
+
+        with self.transaction():
+            self.insert_table_data_many("users", [self.__user_columns(user) for user in users.values()])
+            self.insert_beatmapsets_modes(beatmapsets.values())
+            self.insert_table_data_many("beatmapsets", [self.__beatmapset_columns(beatmapset) for beatmapset in beatmapsets.values()])
+            self.insert_table_data_many("discussions", discussion_column_dicts)
+            self.insert_table_data_many("newsposts", [self.__newspost_columns(newspost) for newspost in newsposts.values()])
+            if removed_group_users:
+                self.delete_table_data(
+                    table        = "group_users",
+                    where        = "(group_id, user_id) IN (" + ", ".join(["(%s, %s)"] * len(removed_group_users)) + ")",
+                    where_values = tuple(_id for key in removed_group_users for _id in key)
+                )
+            self.insert_table_data_many("group_users", [dict(group_id=group_id, user_id=user_id) for group_id, user_id in added_group_users])
+            self.insert_table_data_many("events", [self.__event_columns(event) for event in events])
     
     def retrieve_user(self, where: str, where_values: tuple=None) -> User:
         """Returns the first user from the database matching the given WHERE clause, or None if no such user is stored."""
@@ -328,7 +559,7 @@ class Database:
         for row in (fetched_rows or []):
             _id  = row[0]
             name = row[1]
-            yield User(_id, name)
+            yield registry.user(_id, name)
     
     def retrieve_beatmapset_modes(self, beatmapset_id: int) -> List[str]:
         """Returns an array of modes corresponding to the given beatmapset id.
@@ -344,6 +575,74 @@ class Database:
             modes.append(row[0])
         return modes
     
+    def __retrieve_rows_in(self, table: str, column: str, values: Iterable[object], selection: str) -> List[tuple]:
+        """Returns all rows from the table where the column equals any of the given values, using a single query.
+        Returns an empty list if no values are given, without querying."""
+        values = list(set(value for value in values if value is not None))
+        if not values:
+            return []
+
+        fetched_rows = self.retrieve_table_data(
+            table        = table,
+            where        = f"{column} IN ({', '.join(['%s'] * len(values))})",
+            where_values = tuple(values),
+            selection    = selection
+        )
+        return fetched_rows or []
+
+    def __load_users(self, user_ids: Iterable[int], users: Dict[int, User]) -> Dict[int, User]:
+        """Retrieves any of the given user ids not already in `users` from the database into it, using a single query.
+        Ids of users which are not stored are left out. Returns the same dictionary."""
+        fetched_rows = self.__retrieve_rows_in(
+            table     = "users",
+            column    = "id",
+            values    = set(user_ids) - users.keys(),
+            selection = "id, name"
+        )
+        for row in fetched_rows:
+            users[row[0]] = registry.user(row[0], row[1])
+        return users
+
+    def __load_beatmapsets(
+            self, beatmapset_ids: Iterable[int], beatmapsets: Dict[int, Beatmapset],
+            users: Dict[int, User]) -> Dict[int, Beatmapset]:
+        """Retrieves any of the given beatmapset ids not already in `beatmapsets` from the database into it, along
+        with their creators and modes. Uses three queries regardless of how many beatmapsets are retrieved.
+        Any creator retrieved is also put into `users`. Returns the same beatmapset dictionary."""
+        fetched_rows = self.__retrieve_rows_in(
+            table     = "beatmapsets",
+            column    = "id",
+            values    = set(beatmapset_ids) - beatmapsets.keys(),
+            selection = "id, title, artist, creator_id, genre, language"
+        )
+        for beatmapset in self.__beatmapsets_from_rows(fetched_rows, users):
+            beatmapsets[beatmapset.id] = beatmapset
+        return beatmapsets
+
+    def __beatmapsets_from_rows(self, rows: List[tuple], users: Dict[int, User]) -> Generator[Beatmapset, None, None]:
+        """Returns a generator of beatmapsets from the given (id, title, artist, creator_id, genre, language) rows,
+        retrieving all of their creators and modes at once beforehand."""
+        self.__load_users((row[3] for row in rows), users)
+
+        modes_rows = self.__retrieve_rows_in(
+            table     = "beatmapset_modes",
+            column    = "beatmapset_id",
+            values    = (row[0] for row in rows),
+            selection = "beatmapset_id, mode"
+        )
+        modes = defaultdict(list)
+        for row in modes_rows:
+            modes[row[0]].append(row[1])
+
+        for row in rows:
+            _id      = row[0]
+            title    = row[1]
+            artist   = row[2]
+            creator  = users.get(row[3])
+            genre    = row[4]
+            language = row[5]
+            yield registry.beatmapset(_id, artist, title, creator, modes[_id], genre, language)
+
     def retrieve_beatmapset(self, where: str, where_values: tuple=None) -> Beatmapset:
         """Returns the first beatmapset from the database matching the given WHERE clause, or None if no such beatmapset is stored."""
         return next(self.retrieve_beatmapsets(where + " LIMIT 1", where_values), None)
@@ -356,15 +655,7 @@ class Database:
             where_values = where_values,
             selection    = "id, title, artist, creator_id, genre, language"
         )
-        for row in (fetched_rows or []):
-            _id      = row[0]
-            title    = row[1]
-            artist   = row[2]
-            creator  = self.retrieve_user("id=%s", (row[3],))
-            modes    = self.retrieve_beatmapset_modes(_id)
-            genre    = row[4]
-            language = row[5]
-            yield Beatmapset(_id, artist, title, creator, modes, genre, language)
+        yield from self.__beatmapsets_from_rows(fetched_rows or [], users={})
 
     def retrieve_discussion(self, where: str, where_values: tuple=None, beatmapset: Beatmapset=None) -> Discussion:
         """Returns the first discussion from the database matching the given WHERE clause, or None if no such discussion is stored.
@@ -379,16 +670,24 @@ class Database:
             where        = where,
             where_values = where_values,
             selection    = "id, beatmapset_id, user_id, content, tab, difficulty"
-        )
-        for row in (fetched_rows or []):
-            _id     = row[0]
-            if not beatmapset:
-                beatmapset = self.retrieve_beatmapset("id=%s", (row[1],))
-            user       = self.retrieve_user("id=%s", (row[2],))
-            content    = row[3]
-            tab        = row[4]
-            difficulty = row[5]
-            yield Discussion(_id, beatmapset, user, content, tab, difficulty)
+        ) or []
+
+        users = self.__load_users((row[2] for row in fetched_rows), users={})
+        beatmapsets = {}
+        if not beatmapset:
+            self.__load_beatmapsets((row[1] for row in fetched_rows), beatmapsets, users)
+
+        for row in fetched_rows:
+            yield self.__discussion_from_row(row, beatmapset or beatmapsets.get(row[1]), users)
+
+    def __discussion_from_row(self, row: tuple, beatmapset: Beatmapset, users: Dict[int, User]) -> Discussion:
+        """Returns a discussion from the given (id, beatmapset_id, user_id, content, tab, difficulty) row."""
+        _id        = row[0]
+        user       = users.get(row[2])
+        content    = row[3]
+        tab        = row[4]
+        difficulty = row[5]
+        return registry.discussion(_id, beatmapset, user, content, tab, difficulty)
     
     def retrieve_newspost(self, where: str, where_values: tuple=None) -> NewsPost:
         """Returns the first newspost from the database matching the given WHERE clause, or None if no such newspost is stored."""
@@ -401,18 +700,24 @@ class Database:
             where        = where,
             where_values = where_values,
             selection    = "id, title, preview, author_id, author_name, slug, image_url"
-        )
-        for row in (fetched_rows or []):
-            _id         = row[0]
-            title       = row[1]
-            preview     = row[2]
-            author      = self.retrieve_user("id=%s", (row[3],))
-            author_name = row[4]
-            if not author:
-                author = User(_id=None, name=author_name)
-            slug        = row[5]
-            image_url   = row[6]
-            yield NewsPost(_id, title, preview, author, slug, image_url)
+        ) or []
+
+        users = self.__load_users((row[3] for row in fetched_rows), users={})
+        for row in fetched_rows:
+            yield self.__newspost_from_row(row, users)
+
+    def __newspost_from_row(self, row: tuple, users: Dict[int, User]) -> NewsPost:
+        """Returns a newspost from the given (id, title, preview, author_id, author_name, slug, image_url) row."""
+        _id         = row[0]
+        title       = row[1]
+        preview     = row[2]
+        author      = users.get(row[3])
+        author_name = row[4]
+        if not author:
+            author = User(_id=None, name=author_name)
+        slug        = row[5]
+        image_url   = row[6]
+        return NewsPost(_id, title, preview, author, slug, image_url)
 
     def retrieve_group_user(self, where: str, where_values: tuple=None) -> NewsPost:
         """Returns the first group user relation from the database matching the given WHERE clause,
@@ -426,10 +731,12 @@ class Database:
             where        = where,
             where_values = where_values,
             selection    = "group_id, user_id"
-        )
-        for row in (fetched_rows or []):
+        ) or []
+
+        users = self.__load_users((row[1] for row in fetched_rows), users={})
+        for row in fetched_rows:
             group = Usergroup(row[0])
-            user  = self.retrieve_user("id=%s", (row[1],))
+            user  = users.get(row[1])
             yield (group, user)
 
     async def retrieve_event(self, where: str, where_values: tuple=None, extensive: bool=False) -> Event:
@@ -443,36 +750,148 @@ class Database:
             default_value = None
         )
     
-    async def retrieve_events(self, where: str, where_values: tuple=None, extensive: bool=False) -> Generator[Event, None, None]:
+    async def retrieve_events(
+            self, where: str, where_values: tuple=None, extensive: bool=False,
+            chunk_size: int=None, fields: Iterable[str]=None) -> Generator[Event, None, None]:
         """Returns an asynchronous generator of all events from the database matching the given WHERE clause.
-        Optionally retrieve extensively so that more can be queried (e.g. user name, beatmap creator/artist/title)."""
+        Optionally retrieve extensively so that more can be queried (e.g. user name, beatmap creator/artist/title).
+
+        All events found are hydrated together, see `hydrate_events`. The queries run on a worker thread,
+        so other tasks on the event loop keep running in the meantime.
+
+        Optionally streams the events in chunks of `chunk_size` instead, each hydrated and yielded as it is read,
+        such that large reads (e.g. replaying months of events) use constant memory, see `_stream`.
+
+        Optionally only hydrates the given fields of the events, see `hydrate_events`."""
+        if chunk_size:
+            async for event in self.__stream_events(where, where_values, extensive, chunk_size, fields):
+                yield event
+            return
+
+        events = await run_in_executor(self.__retrieve_event_list, where, where_values, extensive, fields)
+        for event in events:
+            await asyncio.sleep(0)  # Return control back to the event loop, granting other tasks a window to start/resume.
+            yield event
+
+    async def __stream_events(
+            self, where: str, where_values: tuple, extensive: bool,
+            chunk_size: int, fields: Iterable[str]=None) -> Generator[Event, None, None]:
+        """Yields each event matching the given WHERE clause, reading and hydrating `chunk_size` of them at a time."""
+        if not extensive:
+            row_chunks = self.__fetch_events(where, where_values, chunk_size)
+        else:
+            row_chunks = self.__fetch_events_extensive(where, where_values, chunk_size)
+
+        try:
+            while True:
+                events = await run_in_executor(self.__hydrate_next, row_chunks, fields)
+                if events is None:
+                    break
+
+                for event in events:
+                    await asyncio.sleep(0)
+                    yield event
+        finally:
+            # Releases the connection if we stopped early (e.g. the consumer broke out of its loop).
+            row_chunks.close()
+
+    def __hydrate_next(self, row_chunks: Generator[List[tuple], None, None], fields: Iterable[str]=None) -> List[Event]:
+        """Returns the next chunk of rows hydrated into events, or None if there are no more chunks."""
+        rows = next(row_chunks, None)
+        if rows is None:
+            return None
+        return self.hydrate_events(rows, fields)
+
+    def __retrieve_event_list(
+            self, where: str, where_values: tuple=None, extensive: bool=False,
+            fields: Iterable[str]=None) -> List[Event]:
+        """Returns a list of all events from the database matching the given WHERE clause. Blocks until done."""
         if not extensive:
             fetched_rows = self.__fetch_events(where, where_values)
         else:
             fetched_rows = self.__fetch_events_extensive(where, where_values)
-        
-        for row in (fetched_rows or []):
-            await asyncio.sleep(0)  # Return control back to the event loop, granting other tasks a window to start/resume.
+
+        return self.hydrate_events(fetched_rows or [], fields)
+
+    def hydrate_events(self, rows: List[tuple], fields: Iterable[str]=None) -> List[Event]:
+        """Returns the events of the given rows from the events table (see `__fetch_events` for the columns), along with
+        their beatmapsets, creators, modes, discussions, authors, users and newsposts. These are retrieved in a fixed
+        number of queries for the entire batch, rather than several queries per event.
+
+        Optionally only retrieves the given fields of `EVENT_FIELDS` (e.g. ["beatmapset", "user"]), leaving any other
+        None, such that consumers not needing e.g. discussions or newsposts do not query for them.
+
+        Events referring to the same beatmapset, user, etc share the same object."""
+        fields = set(fields) if fields is not None else set(EVENT_FIELDS)
+        if not fields.issubset(EVENT_FIELDS):
+            raise ValueError(f"Cannot hydrate {fields - set(EVENT_FIELDS)}, only {EVENT_FIELDS}.")
+
+        discussion_rows = self.__retrieve_rows_in(
+            table     = "discussions",
+            column    = "id",
+            values    = (row[3] for row in rows if row[3] and "discussion" in fields),
+            selection = "id, beatmapset_id, user_id, content, tab, difficulty"
+        )
+        newspost_rows = self.__retrieve_rows_in(
+            table     = "newsposts",
+            column    = "id",
+            values    = (row[7] for row in rows if row[7] and "newspost" in fields),
+            selection = "id, title, preview, author_id, author_name, slug, image_url"
+        )
+
+        beatmapset_rows = self.__retrieve_rows_in(
+            table     = "beatmapsets",
+            column    = "id",
+            values    = itertools.chain(
+                (row[2] for row in rows if row[2] and "beatmapset" in fields),
+                (row[1] for row in discussion_rows)
+            ),
+            selection = "id, title, artist, creator_id, genre, language"
+        )
+
+        # All users are retrieved at once, so creators need not be retrieved separately for the beatmapsets.
+        users = self.__load_users(
+            itertools.chain(
+                (row[4] for row in rows if row[4] and "user" in fields),
+                (row[2] for row in discussion_rows),
+                (row[3] for row in newspost_rows),
+                (row[3] for row in beatmapset_rows)
+            ),
+            users = {}
+        )
+        beatmapsets = {beatmapset.id: beatmapset for beatmapset in self.__beatmapsets_from_rows(beatmapset_rows, users)}
+        discussions = {row[0]: self.__discussion_from_row(row, beatmapsets.get(row[1]), users) for row in discussion_rows}
+        newsposts   = {row[0]: self.__newspost_from_row(row, users) for row in newspost_rows}
+
+        events = []
+        for row in rows:
             _type      = row[0]
             time       = row[1]
-            beatmapset = self.retrieve_beatmapset("id=%s", (row[2],)) if row[2] else None
-            discussion = self.retrieve_discussion("id=%s", (row[3],)) if row[3] else None
-            user       = self.retrieve_user("id=%s", (row[4],)) if row[4] else None
+            # Beatmapsets and users may also have been retrieved for discussions, newsposts, etc.
+            beatmapset = beatmapsets.get(row[2]) if row[2] and "beatmapset" in fields else None
+            discussion = discussions.get(row[3]) if row[3] else None
+            user       = users.get(row[4]) if row[4] and "user" in fields else None
             group      = Usergroup(row[5], mode=row[6] if row[6] else None) if row[5] else None
-            newspost   = self.retrieve_newspost("id=%s", (row[7],)) if row[7] else None
+            newspost   = newsposts.get(row[7]) if row[7] else None
             content    = row[8]
-            yield Event(_type, time, beatmapset, discussion, user, group, newspost, content=content)
+            _id        = row[9] if len(row) > 9 else None
+            events.append(Event(_type, time, beatmapset, discussion, user, group, newspost, content=content, _id=_id))
+        return events
     
-    def __fetch_events(self, where: str, where_values: tuple=None):
-        return self.retrieve_table_data(
+    def __fetch_events(self, where: str, where_values: tuple=None, chunk_size: int=None):
+        """Returns the event rows matching the given WHERE clause, or a generator of chunks of them if a chunk size is given."""
+        return self.__fetch_table_data(
             table        = "events",
             where        = where,
             where_values = where_values,
-            selection    = "type, time, beatmapset_id, discussion_id, user_id, group_id, group_mode, news_id, content"
+            selection    = "type, time, beatmapset_id, discussion_id, user_id, group_id, group_mode, news_id, content, id",
+            chunk_size   = chunk_size
         )
 
-    def __fetch_events_extensive(self, where: str, where_values: tuple=None):
-        return self.retrieve_table_data(
+    def __fetch_events_extensive(self, where: str, where_values: tuple=None, chunk_size: int=None):
+        """Same as `__fetch_events`, except the WHERE clause can also refer to the discussion, beatmapset, newspost,
+        author, creator, user and modes of each event."""
+        return self.__fetch_table_data(
             table        = f"""events
                 LEFT JOIN {self.db_name}.discussions AS discussion ON events.discussion_id=discussion.id
                 LEFT JOIN {self.db_name}.beatmapsets AS beatmapset ON events.beatmapset_id=beatmapset.id
@@ -483,27 +902,76 @@ class Database:
                 LEFT JOIN {self.db_name}.beatmapset_modes AS modes ON beatmapset.id=modes.beatmapset_id""",
             where        = where,
             where_values = where_values,
-            selection    = "events.type, events.time, events.beatmapset_id, events.discussion_id, events.user_id, events.group_id, events.group_mode, events.news_id, events.content"
+            selection    = "events.type, events.time, events.beatmapset_id, events.discussion_id, events.user_id, events.group_id, events.group_mode, events.news_id, events.content, events.id",
+            chunk_size   = chunk_size
         )
 
+    def __fetch_table_data(self, table: str, where: str, where_values: tuple, selection: str, chunk_size: int=None):
+        if chunk_size:
+            return self.stream_table_data(table, where, where_values, selection, chunk_size)
+        return self.retrieve_table_data(table, where, where_values, selection)
+
+class AsyncDatabase:
+    """Wraps an aiess database such that its methods can be awaited (e.g. `await database.retrieve_user("id=%s", (2,))`),
+    running the queries on a bounded pool of worker threads rather than blocking the event loop.
+
+    Methods returning generators return lists instead, since these are consumed on the worker thread.
+    Methods which are already asynchronous (e.g. `retrieve_events`) are returned as is.
+
+    Transactions are not supported, as awaited calls each run on any worker thread, whereas a transaction is pinned
+    to the thread it was started on. Use `database.transaction` within a single call to `run_in_executor` instead."""
+    def __init__(self, database: Union[Database, str]):
+        self.database = database if isinstance(database, Database) else Database(database)
+
+    def __getattr__(self, name: str) -> object:
+        if name == "transaction":
+            raise ValueError(
+                "Cannot use transactions through an AsyncDatabase, as its calls run on any worker thread. "
+                "Call `database.transaction` within a function given to `run_in_executor` instead.")
+
+        attr = getattr(self.database, name)
+        if not callable(attr) or inspect.iscoroutinefunction(attr) or inspect.isasyncgenfunction(attr):
+            return attr
+
+        async def wrapper(*args, **kwargs):
+            return await run_in_executor(self.__call_to_completion, attr, *args, **kwargs)
+        return wrapper
+
+    @staticmethod
+    def __call_to_completion(func: Callable, *args, **kwargs) -> object:
+        """Calls the given function, and returns its result, consuming it into a list if it's a generator."""
+        result = func(*args, **kwargs)
+        if inspect.isgenerator(result):
+            return list(result)
+        return result
+
 class CachedDatabase(Database):
-    """Creates an aiess database connection. Stores any query results in a cache and retrieves from it whenever available."""
+    """Creates an aiess database connection. Stores the results of read queries in a cache shared by all cached
+    databases with the same name, and retrieves from it whenever available, see `aiess.query_cache`.
+
+    Cached results expire after a while, and are dropped as soon as this process writes to any table they were read from."""
     def __init__(self, _db_name: str):
         super().__init__(_db_name=_db_name)
-        self.cache = {}
+        self.cache = query_cache.get_query_cache(_db_name)
     
     def _execute(self, query: str, values: tuple=None) -> List[tuple]:
         """Executes the given SQL query with the given argument values, if any. Use like "%s" in query
         and ("name",) in values. Returns the fetched result sets as a list of tuples, or None if no result.
         
-        Returns from cache, if available, otherwise caches the result."""
-        cache_line = f"Q:{query}, V:{values}"
-        if cache_line in self.cache and self.cache[cache_line]:
-            return self.cache[cache_line]
+        Returns from cache, if available, otherwise caches the result. Writes and queries within transactions bypass the cache."""
+        if query_cache.is_write(query) or self.in_transaction():
+            return super()._execute(query, values)
+
+        result = self.cache.get(query, values)
+        if result:
+            return result
         
-        self.cache[cache_line] = super()._execute(
+        result = super()._execute(
             query  = query,
             values = values
         )
+        if result:
+            # Empty results are not cached, so anything inserted by other processes shows up right away.
+            self.cache.put(query, values, result)
         
-        return self.cache[cache_line]
\ No newline at end of file
+        return result
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Set
+
+from aiess import Event
+
+# Events dispatched but not yet done per concurrent call, before `Dispatcher.dispatch` waits for some to be done.
+BACKLOG_PER_CALL = 16
+
+class Dispatcher:
+    """Calls `callback` with each event dispatched, with up to `concurrency` events in flight at once,
+    such that one slow call (e.g. sending to an unresponsive channel) does not hold up the others.
+
+    Events with the same key (see `key`, e.g. their beatmapset) are still called back one at a time in the order
+    they were dispatched. Events waiting for an earlier one with their key do not count as in flight, so a burst of
+    events with one slow key does not hold up other keys either. Up to `backlog` events can be dispatched but not yet
+    done (by default `BACKLOG_PER_CALL` per concurrent call, or 1 without concurrency, i.e. strictly in order).
+
+    Should a call fail, any later event with the same key is not called back, and no more events can be dispatched;
+    `join` then raises the exception.
+
+    Events called back successfully are kept in `completed`, unless `keep_completed` is False (e.g. when dispatching
+    more events than fit in memory), in which case only `completed_count` is kept track of."""
+    def __init__(
+            self, callback: Callable[[Event], Awaitable[None]], concurrency: int=1,
+            key: Callable[[Event], object]=None, keep_completed: bool=True, backlog: int=None):
+        if concurrency < 1:
+            raise ValueError(f"Concurrency must be at least 1, not {concurrency}.")
+        if backlog is None:
+            backlog = concurrency * BACKLOG_PER_CALL if concurrency > 1 else 1
+        if backlog < concurrency:
+            raise ValueError(f"Backlog must be at least the concurrency ({concurrency}), not {backlog}.")
+
+        self.callback  = callback
+        self.key       = key or (lambda event: None)
+        self.in_flight = asyncio.Semaphore(concurrency)
+        self.pending   = asyncio.Semaphore(backlog)
+
+        self.keep_completed = keep_completed
+
+        self.tasks: Set[asyncio.Task] = set()  # Those not done yet.
+        self.completed: List[Event] = []
+        self.completed_count = 0
+        self.error: BaseException = None
+        self.__last_tasks: Dict[object, asyncio.Task] = {}
+
+    async def dispatch(self, event: Event) -> None:
+        """Calls back with the given event in the background, once the events dispatched before it with the same key
+        are done. Waits until fewer than `backlog` events are not yet done first. Raises if any call failed."""
+        await self.pending.acquire()
+        if self.error:
+            self.pending.release()
+            raise self.error
+
+        key = self.key(event)
+        task = asyncio.ensure_future(self.__call(event, self.__last_tasks.get(key)))
+        task.add_done_callback(lambda task: self.__on_done(key, task))
+
+        self.__last_tasks[key] = task
+        self.tasks.add(task)
+
+    async def join(self) -> None:
+        """Waits for all dispatched events to be done. Raises the first exception of any call, if any."""
+        if self.tasks:
+            await asyncio.wait(self.tasks)
+        if self.error:
+            raise self.error
+
+    async def cancel(self) -> None:
+        """Cancels any events still in flight, and waits for them to be done."""
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.wait(self.tasks)
+
+    async def __call(self, event: Event, previous_task: asyncio.Task) -> None:
+        if previous_task:
+            # Raises if the previous call failed, in which case we would otherwise be out of order.
+            await previous_task
+
+        # Only once it is our turn within our key, such that waiting on our key leaves room for other keys.
+        async with self.in_flight:
+            await self.callback(event)
+        self.completed_count += 1
+        if self.keep_completed:
+            self.completed.append(event)
+
+    def __on_done(self, key: object, task: asyncio.Task) -> None:
+        # Here rather than in `__call`, as tasks cancelled before they start never run it.
+        self.pending.release()
+        self.tasks.discard(task)
+        if self.__last_tasks.get(key) is task:
+            del self.__last_tasks[key]
+        if not task.cancelled() and task.exception() and not self.error:
+            self.error = task.exception()
@@ -0,0 +1,176 @@
+import sys
+import asyncio
+import importlib
+from time import perf_counter
+from collections import defaultdict
+from typing import Dict, Generator, Iterable, List, Tuple
+
+from aiess import Event
+from aiess.database import Database, SCRAPER_DB_NAME
+from aiess.reader import Reader, BATCH_SIZE, POLL_INTERVAL, NOTIFIED_POLL_INTERVAL
+from aiess.reader import read_batch, events_after_where
+from aiess.logger import log, log_err
+from aiess import notifier
+from aiess import logger
+
+# Seconds before a reader which failed to handle events is retried, doubling for each consecutive failure.
+RETRY_DELAY = 10
+MAX_RETRY_DELAY = 600
+# Seconds a reader may take to handle a batch, before it is considered failed (e.g. its website not responding).
+BATCH_TIMEOUT = 300
+
+class ReaderHost:
+    """Reads new events once for any number of registered readers (see `register`), rather than each reader polling
+    and hydrating the same events separately. Has an async method `run`, which works like `Reader.run`.
+
+    Each reader keeps its own checkpoint and event types, and handles events independently of the others.
+    Should a reader fail to handle an event (e.g. its website being down), it is retried on its own later,
+    catching up from its checkpoint, while the other readers carry on.
+
+    Events are shared between readers, so readers should not modify them."""
+    def __init__(self, host_id: str, db_name: str):
+        self.host_id  = host_id
+        self.database = Database(db_name)
+        self.readers: List[Reader] = []
+        self.running  = False
+
+        self.__failures: Dict[str, int] = {}      # reader id -> consecutive failures
+        self.__retry_times: Dict[str, float] = {}  # reader id -> when to retry, in `perf_counter` time
+
+    def register(self, reader: Reader) -> None:
+        """Adds the given reader to those events are read for. Raises ValueError if it is running on its own,
+        or if a reader with the same id is already registered (as they would share their checkpoint)."""
+        if any(other.reader_id == reader.reader_id for other in self.readers):
+            raise ValueError(f"A reader with id \"{reader.reader_id}\" is already registered.")
+        if reader.running:
+            raise ValueError(f"Reader \"{reader.reader_id}\" is already running.")
+
+        reader.running = self.running
+        self.readers.append(reader)
+
+    async def run(self) -> None:
+        """A blocking method which initiates a loop reading new events and pushing them to each registered reader,
+        whenever the scraper notifies that new ones were inserted, or every so often if not (see `Reader.run`)."""
+        if self.running:
+            raise ValueError("Reader host is already running.")
+
+        self.running = True
+        for reader in self.readers:
+            reader.running = True
+
+        listener = notifier.Listener(f"host-{self.host_id}")
+        notified = listener.open()
+        try:
+            while True:
+                await self.__push_all_new_events()
+                await listener.wait(timeout=NOTIFIED_POLL_INTERVAL if notified else POLL_INTERVAL)
+        finally:
+            listener.close()
+
+    async def __push_all_new_events(self) -> None:
+        """Pushes any new events to each reader not waiting to be retried. Readers at the same checkpoint (usually all
+        of them) share the same reads, whereas readers behind (e.g. having failed before) catch up on their own."""
+        readers = [reader for reader in self.readers if not self.__is_waiting(reader)]
+        for reader in readers:
+            await reader._seed()
+
+        readers_by_last_id = defaultdict(list)
+        for reader in readers:
+            readers_by_last_id[reader.last_id].append(reader)
+
+        await asyncio.gather(*(
+            self.__push_new_events(last_id, readers_at_id)
+            for last_id, readers_at_id in readers_by_last_id.items()
+        ))
+
+    async def __push_new_events(self, last_id: int, readers: List[Reader]) -> None:
+        """Reads the events after the given id in batches, pushing each batch to all of the given readers at once.
+        Readers failing to handle a batch in time are left out of any further batches. While a full batch is being
+        handled, the next is read.
+
+        Only events of types any of the readers handle are read, with only fields any of them need hydrated."""
+        event_types  = union(reader.event_types for reader in readers)
+        event_fields = union(reader.event_fields for reader in readers)
+
+        next_batch = asyncio.ensure_future(self.__read_batch(last_id, event_types, event_fields))
+        try:
+            while next_batch and readers:
+                events, read_until_id = await next_batch
+                next_batch = (
+                    asyncio.ensure_future(self.__read_batch(read_until_id, event_types, event_fields))
+                    if len(events) >= BATCH_SIZE else None
+                )
+
+                results = await asyncio.gather(
+                    *(asyncio.wait_for(reader._push_batch(events, read_until_id), BATCH_TIMEOUT) for reader in readers),
+                    return_exceptions = True
+                )
+                readers = [reader for reader, result in zip(readers, results) if self.__succeeded(reader, result)]
+        finally:
+            if next_batch:
+                next_batch.cancel()
+
+    async def __read_batch(
+            self, last_id: int, event_types: List[str],
+            event_fields: List[str]) -> Tuple[List[Event], int]:
+        """Returns the next batch of events after the given id, along with the id read up to, see `read_batch`."""
+        async def events_after(last_id: int, limit: int=None, until_id: int=None):
+            return await self.events_after(last_id, limit, until_id, event_types, event_fields)
+        return await read_batch(events_after, self.database, last_id, event_types)
+
+    def __succeeded(self, reader: Reader, result: object) -> bool:
+        """Returns whether the given result of a reader handling a batch is a success. If not, logs the failure,
+        and waits longer before retrying the reader the more times in a row it failed."""
+        if not isinstance(result, BaseException):
+            self.__failures.pop(reader.reader_id, None)
+            return True
+
+        failures = self.__failures.get(reader.reader_id, 0) + 1
+        delay = min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+        self.__failures[reader.reader_id] = failures
+        self.__retry_times[reader.reader_id] = perf_counter() + delay
+
+        log_err(f"WARNING | Reader \"{reader.reader_id}\" failed to handle events, retrying in {delay} s; {result!r}")
+        return False
+
+    def __is_waiting(self, reader: Reader) -> bool:
+        """Returns whether the given reader failed and is waiting to be retried."""
+        retry_time = self.__retry_times.get(reader.reader_id)
+        return retry_time is not None and perf_counter() < retry_time
+
+    async def events_after(
+            self, last_id: int, limit: int=None, until_id: int=None, event_types: List[str]=None,
+            event_fields: List[str]=None) -> Generator[Event, None, None]:
+        """Yields each event found in the database with an id after the given id, in order of id. Optionally only
+        retrieves up to `limit` of these, up to and including `until_id`, of the given types and hydrating the given
+        fields, see `Reader.events_after`."""
+        where, where_values = events_after_where(last_id, limit, until_id, event_types)
+        return self.database.retrieve_events(where=where, where_values=where_values, fields=event_fields)
+
+def union(lists: Iterable[List[str]]) -> List[str]:
+    """Returns the union of the given lists (e.g. event types), or None if any is None (i.e. no restriction)."""
+    items = set()
+    for _list in lists:
+        if _list is None:
+            return None
+        items.update(_list)
+    return sorted(items)
+
+def load_reader(path: str) -> Reader:
+    """Returns the reader at the given path, formatted as "module:attribute" (e.g. "bnsite.main:reader")."""
+    module_name, _, attribute = path.partition(":")
+    reader = getattr(importlib.import_module(module_name), attribute or "reader", None)
+    if not isinstance(reader, Reader):
+        raise ValueError(f"\"{path}\" is not a reader.")
+    return reader
+
+if __name__ == "__main__":
+    # E.g. `python -m aiess.host bnsite.main:reader bnstats.main:reader`, reading events once for both.
+    logger.init()
+    host = ReaderHost("main", db_name=SCRAPER_DB_NAME)
+    for path in sys.argv[1:]:
+        host.register(load_reader(path))
+        log(f"Registered {path}.", postfix="host")
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(host.run())
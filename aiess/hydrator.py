@@ -0,0 +1,168 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable, Tuple
+
+from aiess.objects import Beatmapset
+from aiess.registry import registry
+from aiess.web import api
+from aiess.web.cache import DiskCache
+from aiess import event_types as types
+
+# Seconds beatmapset metadata is served from memory or the database before it is refreshed from the api.
+# Changes we know of invalidate it before then (see `STALE_AFTER_TYPES`), so this only bounds how long
+# changes without an event (e.g. metadata edits by moderators) go unnoticed.
+BEATMAPSET_TTL = 21600  # 6 hours
+# Events after which the metadata of their beatmapset is stale, i.e. its genre, language or modes (beatmaps
+# may have been added or removed since the last time we requested it, right up until it is qualified or ranked).
+STALE_AFTER_TYPES = [types.GENRE_EDIT, types.LANGUAGE_EDIT, types.QUALIFY, types.RANK, types.LOVE]
+# Beatmapsets kept in memory before the least recently used ones are dropped.
+HYDRATOR_SIZE = 5000
+
+class BeatmapsetHydrator:
+    """Returns beatmapsets with their metadata (i.e. artist, title, creator, modes, genre, language) from the first
+    of these which has it fresh: an in-memory cache, the `beatmapsets` table of the database given to `use_database`
+    (if any), and lastly the api.
+
+    Metadata is fresh for `ttl` seconds after it was last requested from the api, by any process on this host (kept
+    track of in a `DiskCache`, as the tables do not say when rows were updated), unless invalidated before then (see
+    `invalidate`). Beatmapsets on the same page should be looked up at once using `prefetch`."""
+    def __init__(self, ttl: float=BEATMAPSET_TTL, size: int=HYDRATOR_SIZE):
+        self.ttl      = ttl
+        self.size     = size
+        self.database = None
+        self.lock     = threading.Lock()
+
+        self.entries: OrderedDict = OrderedDict()  # id -> (beatmapset, refreshed_at)
+        # str(id) -> when the metadata was last requested from the api, shared between processes.
+        self.refresh_times = DiskCache("beatmapsets", ttl=ttl)
+
+        self.memory_hits   = 0
+        self.database_hits = 0
+        self.api_refreshes = 0
+        self.invalidations = 0
+
+    def use_database(self, database: object) -> None:
+        """Serves fresh beatmapsets from the `beatmapsets` table of the given database (e.g. `Database(SCRAPER_DB_NAME)`)
+        before requesting them from the api. Only memory and the api are used until this is called."""
+        self.database = database
+
+    def get(self, _id: int) -> Beatmapset:
+        """Returns the beatmapset with the given id, from memory or the database if fresh, otherwise from the api.
+        Raises DeletedContextError if it is not in the api either (e.g. deleted)."""
+        _id = int(_id)
+        beatmapset = self.__fresh(_id)
+        if beatmapset:
+            with self.lock:
+                self.memory_hits += 1
+            return beatmapset
+
+        self.prefetch([_id])
+        beatmapset = self.__fresh(_id)
+        if beatmapset:
+            with self.lock:
+                self.database_hits += 1
+            return beatmapset
+
+        return self.__refresh(_id)
+
+    def prefetch(self, ids: Iterable[int]) -> None:
+        """Loads any of the given beatmapsets which are not in memory, but are fresh in the database, into memory
+        using a single query (and one for each of their creators and modes), after a single lookup of when they were
+        last refreshed. Others are left to `get`."""
+        ids = set(int(_id) for _id in ids if _id is not None)
+        ids = set(_id for _id in ids if not self.__fresh(_id))
+        if not self.database or not ids:
+            return
+
+        cached_times = self.refresh_times.get_many(str(_id) for _id in ids)
+        refresh_times = {int(_id): refreshed_at for _id, refreshed_at in cached_times.items()}
+        fresh_ids = sorted(refresh_times)
+        if not fresh_ids:
+            return
+
+        for beatmapset in self.database.retrieve_beatmapsets(
+                where        = f"id IN ({', '.join(['%s'] * len(fresh_ids))})",
+                where_values = tuple(fresh_ids)):
+            self.__store(beatmapset, refresh_times[beatmapset.id])
+
+    def invalidate(self, _id: int) -> None:
+        """Makes the beatmapset with the given id stale for all processes, such that it is requested from the api next
+        time (e.g. after its genre was edited)."""
+        _id = int(_id)
+        with self.lock:
+            self.entries.pop(_id, None)
+            self.invalidations += 1
+        self.refresh_times.invalidate([str(_id)])
+        api.cache.invalidate([f"/get_beatmaps?s={_id}"])
+        registry.invalidate(Beatmapset, _id)
+
+    def invalidate_by_event(self, _type: str, _id: int, event_time: datetime) -> bool:
+        """Invalidates the beatmapset with the given id if an event of the given type (see `STALE_AFTER_TYPES`)
+        happened to it at the given time (in UTC), since it was last refreshed. Returns whether it was invalidated.
+
+        Events seen again (e.g. on later passes) are after the refresh they caused, so are only acted on once."""
+        if _type not in STALE_AFTER_TYPES:
+            return False
+
+        refreshed_at = self.refresh_times.get(str(_id))
+        if refreshed_at is not None and refreshed_at >= event_time.replace(tzinfo=timezone.utc).timestamp():
+            return False
+
+        self.invalidate(_id)
+        return True
+
+    def stats(self) -> dict:
+        """Returns the number of beatmapsets in memory and how many lookups were served by memory, the database and the api."""
+        with self.lock:
+            return dict(
+                size          = len(self.entries),
+                memory_hits   = self.memory_hits,
+                database_hits = self.database_hits,
+                api_refreshes = self.api_refreshes,
+                invalidations = self.invalidations
+            )
+
+    def clear(self) -> None:
+        """Forgets all beatmapsets in memory. Those fresh in the database are still served from there."""
+        with self.lock:
+            self.entries.clear()
+
+    def __fresh(self, _id: int) -> Beatmapset:
+        """Returns the beatmapset with the given id from memory, or None if not in memory or stale."""
+        with self.lock:
+            entry: Tuple[Beatmapset, float] = self.entries.get(_id)
+            if entry is None:
+                return None
+
+            beatmapset, refreshed_at = entry
+            if time.time() - refreshed_at >= self.ttl:
+                del self.entries[_id]
+                return None
+
+            self.entries.move_to_end(_id)
+            return beatmapset
+
+    def __refresh(self, _id: int) -> Beatmapset:
+        """Requests the beatmapset with the given id from the api, marking it as fresh for all processes."""
+        # Otherwise a stale instance may be returned, rather than one constructed from the api.
+        registry.invalidate(Beatmapset, _id)
+        beatmapset = registry.beatmapset(_id)
+
+        refreshed_at = time.time()
+        self.refresh_times.put(str(_id), refreshed_at)
+        self.__store(beatmapset, refreshed_at)
+        with self.lock:
+            self.api_refreshes += 1
+        return beatmapset
+
+    def __store(self, beatmapset: Beatmapset, refreshed_at: float) -> None:
+        with self.lock:
+            self.entries[beatmapset.id] = (beatmapset, refreshed_at)
+            self.entries.move_to_end(beatmapset.id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+# Shared by the parsers of a process.
+beatmapset_hydrator = BeatmapsetHydrator()
@@ -0,0 +1,173 @@
+import sys
+from datetime import datetime
+from typing import List, Dict, Union
+
+from aiess.database import Database, SCRAPER_DB_NAME
+from aiess.logger import log
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+class Index:
+    """Represents a secondary index on the given columns of a table (e.g. ("type", "time") on "events").
+    Creating it is a no-op if an index with the same name already exists (e.g. from a fresh `schema.sql`)."""
+    def __init__(self, table: str, name: str, columns: List[str]):
+        self.table   = table
+        self.name    = name
+        self.columns = columns
+
+    def exists(self, database: Database) -> bool:
+        """Returns whether this index already exists in the given database."""
+        return bool(database._execute("""
+            SELECT index_name FROM information_schema.statistics
+            WHERE table_schema=%s AND table_name=%s AND index_name=%s
+            """,
+            (database.db_name, self.table, self.name)
+        ))
+
+    def apply(self, database: Database) -> None:
+        """Creates this index in the given database, unless it already exists."""
+        if self.exists(database):
+            return
+
+        database._execute(f"CREATE INDEX `{self.name}` ON {database.db_name}.{self.table} ({', '.join(self.columns)})")
+
+    def __str__(self) -> str:
+        return f"index {self.name} on {self.table} ({', '.join(self.columns)})"
+
+class Migration:
+    """Represents a versioned change to the schema of a database, consisting of SQL statements and/or indexes
+    applied in order. Each migration is applied at most once per database, see `migrate`.
+
+    SQL statements refer to the database being migrated as "%(db_name)s"."""
+    def __init__(self, version: int, description: str, steps: List[Union[str, Index]]):
+        self.version     = version
+        self.description = description
+        self.steps       = steps
+
+    def apply(self, database: Database) -> None:
+        """Applies each step of this migration to the given database."""
+        for step in self.steps:
+            if isinstance(step, Index):
+                step.apply(database)
+            else:
+                database._execute(step % dict(db_name=database.db_name))
+
+    def __str__(self) -> str:
+        return f"{self.version:03d} {self.description}"
+
+# Applied in order of version. Never change or remove a migration once released; add a new one instead.
+MIGRATIONS = [
+    Migration(1, "Index events by time", [
+        # Readers poll on `time > %s AND time <= %s ORDER BY time`.
+        Index("events", "events_time_idx", ["time"])
+    ]),
+    Migration(2, "Index events by type, beatmapset, user and group, then time", [
+        # Filters (e.g. `+recent type:nominate`) and beatmapset histories order by time within these.
+        Index("events", "events_type_time_idx",          ["type", "time"]),
+        Index("events", "events_beatmapset_id_time_idx", ["beatmapset_id", "time"]),
+        Index("events", "events_user_id_time_idx",       ["user_id", "time"]),
+        Index("events", "events_group_id_time_idx",      ["group_id", "time"])
+    ])
+]
+
+# Representative queries for each access pattern the indexes above are meant for,
+# used to report how their query plans change (e.g. from full table scans to index range scans).
+PLAN_QUERIES = [
+    ("reader poll",       "SELECT id FROM %(db_name)s.events WHERE time > %%s AND time <= %%s ORDER BY time ASC", (datetime(2020, 1, 1), datetime(2020, 1, 2))),
+    ("beatmapset events", "SELECT id FROM %(db_name)s.events WHERE beatmapset_id=%%s ORDER BY time DESC",         (1,)),
+    ("recent by type",    "SELECT id FROM %(db_name)s.events WHERE type=%%s ORDER BY time DESC LIMIT 1",          ("nominate",)),
+    ("recent by user",    "SELECT id FROM %(db_name)s.events WHERE user_id=%%s ORDER BY time DESC LIMIT 1",       (1,)),
+    ("recent by group",   "SELECT id FROM %(db_name)s.events WHERE group_id=%%s ORDER BY time DESC LIMIT 1",      (28,))
+]
+
+def ensure_migrations_table(database: Database) -> None:
+    """Creates the table keeping track of applied migrations in the given database, if it does not exist yet."""
+    database._execute(f"""
+        CREATE TABLE IF NOT EXISTS {database.db_name}.{MIGRATIONS_TABLE} (
+            `version` int unsigned NOT NULL,
+            `description` mediumtext NOT NULL,
+            `applied_at` datetime NOT NULL,
+            PRIMARY KEY (`version`)
+        )
+        """)
+
+def applied_versions(database: Database) -> List[int]:
+    """Returns the versions of all migrations applied to the given database, in ascending order."""
+    fetched_rows = database.retrieve_table_data(
+        table     = MIGRATIONS_TABLE,
+        where     = "TRUE ORDER BY version",
+        selection = "version"
+    )
+    return [row[0] for row in (fetched_rows or [])]
+
+def pending_migrations(database: Database, migrations: List[Migration]=MIGRATIONS) -> List[Migration]:
+    """Returns the migrations not yet applied to the given database, in order of version."""
+    applied = set(applied_versions(database))
+    return sorted(
+        (migration for migration in migrations if migration.version not in applied),
+        key = lambda migration: migration.version
+    )
+
+def explain(database: Database, query: str, values: tuple=None) -> List[Dict[str, object]]:
+    """Returns the query plan MySQL would use for the given query, one dictionary per table accessed
+    (e.g. {"table": "events", "type": "ALL", "key": None, "rows": 120000, "Extra": "Using filesort"})."""
+    with database.pool.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("EXPLAIN " + query, values)
+            return [dict(zip(cursor.column_names, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+def format_plan(plan: List[Dict[str, object]]) -> str:
+    """Returns a one-line summary of the given query plan, see `explain`."""
+    return "; ".join(
+        f"{row.get('table')}: {row.get('type')} using {row.get('key') or 'no index'}, ~{row.get('rows')} rows" +
+        (f" ({row.get('Extra')})" if row.get("Extra") else "")
+        for row in plan
+    )
+
+def explain_all(database: Database) -> Dict[str, List[Dict[str, object]]]:
+    """Returns the query plans of all `PLAN_QUERIES` in the given database, by name."""
+    return {
+        name: explain(database, query % dict(db_name=database.db_name), values)
+        for name, query, values in PLAN_QUERIES
+    }
+
+def migrate(db_name: str, migrations: List[Migration]=MIGRATIONS) -> List[Migration]:
+    """Applies all pending migrations to the given database in order of version, recording each as it completes,
+    and logs the query plans of the common event queries before and after. Returns the migrations applied."""
+    database = Database(db_name)
+    ensure_migrations_table(database)
+
+    pending = pending_migrations(database, migrations)
+    if not pending:
+        log(f"{db_name} is up to date.", postfix="migrations")
+        return []
+
+    plans_before = explain_all(database)
+    for migration in pending:
+        log(f"Applying {migration} to {db_name}...", postfix="migrations")
+        # MySQL commits DDL statements implicitly, so this is recorded per migration rather than all at once.
+        migration.apply(database)
+        database.insert_table_data(
+            MIGRATIONS_TABLE,
+            dict(
+                version     = migration.version,
+                description = migration.description,
+                applied_at  = datetime.utcnow()
+            )
+        )
+
+    plans_after = explain_all(database)
+    for name, _, _ in PLAN_QUERIES:
+        log(f"{name}", postfix="migrations")
+        log(f"  before | {format_plan(plans_before[name])}", postfix="migrations")
+        log(f"  after  | {format_plan(plans_after[name])}", postfix="migrations")
+
+    return pending
+
+if __name__ == "__main__":
+    # E.g. `python -m aiess.migrations aiess aiess_test`, defaults to the scraper database.
+    for db_name in (sys.argv[1:] or [SCRAPER_DB_NAME]):
+        migrate(db_name)
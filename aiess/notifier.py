@@ -0,0 +1,114 @@
+import os
+import json
+import socket
+import asyncio
+from contextlib import suppress
+from datetime import datetime
+
+from aiess.settings import ROOT_PATH
+from aiess.logger import log
+from aiess import timestamp
+
+# Each listening process binds its own socket in here, and publishers send to every socket found.
+PATH_PREFIX = ROOT_PATH + "notify/"
+SOCKET_POSTFIX = ".sock"
+MAX_MESSAGE_SIZE = 1024
+
+def is_supported() -> bool:
+    """Returns whether this platform supports the unix domain sockets used for notifications (e.g. not Windows)."""
+    return hasattr(socket, "AF_UNIX")
+
+def publish(latest_time: datetime, count: int=None) -> int:
+    """Notifies every listening process (see `Listener`) that new events up to the given time have been inserted.
+    Returns the number of listeners notified. Never raises; listeners fall back to polling if this fails."""
+    if not is_supported() or not os.path.isdir(PATH_PREFIX):
+        return 0
+
+    message = json.dumps(dict(time=timestamp.to_string(latest_time), count=count)).encode("utf-8")
+    notified = 0
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            for file_name in os.listdir(PATH_PREFIX):
+                if not file_name.endswith(SOCKET_POSTFIX):
+                    continue
+
+                path = PATH_PREFIX + file_name
+                try:
+                    sender.sendto(message, path)
+                    notified += 1
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The listener exited without cleaning up (e.g. killed), so no one is bound to this anymore.
+                    with suppress(OSError):
+                        os.remove(path)
+                except BlockingIOError:
+                    # The listener's receive buffer is full, so it has plenty of notifications to wake up to already.
+                    notified += 1
+    except OSError as error:
+        log(f"WARNING | Could not publish event notification; {error}")
+
+    return notified
+
+class Listener:
+    """Receives notifications published by `publish` (e.g. from the scraper after inserting events),
+    such that readers can react to new events right away rather than on their next poll.
+
+    If the socket cannot be bound (e.g. unsupported platform), `wait` simply sleeps for the timeout instead."""
+    def __init__(self, name: str):
+        self.name   = name
+        self.path   = f"{PATH_PREFIX}{name}-{os.getpid()}{SOCKET_POSTFIX}"
+        self.socket = None
+
+    def open(self) -> bool:
+        """Binds the socket of this listener, if possible. Returns whether notifications can be received."""
+        if self.socket:
+            return True
+        if not is_supported():
+            return False
+
+        try:
+            if not os.path.exists(PATH_PREFIX):
+                os.makedirs(PATH_PREFIX)
+            with suppress(OSError):
+                os.remove(self.path)  # Left over from a previous process with the same pid.
+
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.socket.setblocking(False)
+            self.socket.bind(self.path)
+        except OSError as error:
+            log(f"WARNING | Could not listen for event notifications, falling back to polling; {error}")
+            self.close()
+            return False
+
+        return True
+
+    def close(self) -> None:
+        """Closes the socket of this listener, if open, and removes its file."""
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+        with suppress(OSError):
+            os.remove(self.path)
+
+    async def wait(self, timeout: float) -> bool:
+        """Waits until notified or the timeout (in seconds) runs out. Returns whether notified.
+        Any further notifications already received are consumed as well, since one wake up covers them all."""
+        if not self.socket:
+            await asyncio.sleep(timeout)
+            return False
+
+        loop = asyncio.get_event_loop()
+        try:
+            await asyncio.wait_for(loop.sock_recv(self.socket, MAX_MESSAGE_SIZE), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        self.__drain()
+        return True
+
+    def __drain(self) -> None:
+        while True:
+            try:
+                self.socket.recv(MAX_MESSAGE_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
@@ -2,10 +2,11 @@ from datetime import datetime
 from typing import List
 
 from aiess.web import api
+from aiess.resolver import user_resolver
 from aiess.errors import DeletedContextError
 
 class User:
-    """Contains the user data either requested from the api or directly supplied (i.e. id, name)."""
+    """Contains the user data either looked up (see `UserResolver`) or directly supplied (i.e. id, name)."""
     def __init__(self, _id: int=None, name: str=None):
         if _id is None and name is None:
             raise ValueError("Cannot create a User object with neither id nor name provided.")
@@ -13,21 +14,17 @@ class User:
         self.id = int(_id) if _id is not None else None
         self.name = str(name) if name is not None else None
 
+        # The database and api are only consulted if the user is not known yet, see `UserResolver`.
         if name is None:
-            user_json = api.request_user(_id)
-            if user_json is not None:
-                self.name = str(user_json["username"])
-            else:
-                # User doesn't exist, likely restricted.
-                self.name = None
+            # None if the user doesn't exist, likely restricted.
+            self.name = user_resolver.name_of(_id)
         
         if _id is None:
-            user_json = api.request_user(name)
-            if user_json is not None:
-                self.id = int(user_json["user_id"])
-            else:
-                # User doesn't exist, either restricted or renamed a long time ago.
-                self.id = None
+            # None if the user doesn't exist, either restricted or renamed a long time ago.
+            self.id = user_resolver.id_of(name)
+
+        if _id is not None and name is not None:
+            user_resolver.remember(self.id, self.name)
     
     def __str__(self) -> str:
         return self.name if self.name is not None else str(self.id)
@@ -39,6 +36,8 @@ class User:
         )
     
     def __eq__(self, other) -> bool:
+        if other is self:
+            return True  # Shared instances (see `aiess.registry`) need not compare every attribute.
         if not isinstance(other, User):
             return False
         return self.__key() == other.__key()
@@ -112,6 +111,8 @@ class Beatmapset:
         )
     
     def __eq__(self, other) -> bool:
+        if other is self:
+            return True
         if not isinstance(other, Beatmapset):
             return False
         return self.__key() == other.__key()
@@ -140,6 +141,8 @@ class Discussion:
         )
     
     def __eq__(self, other) -> bool:
+        if other is self:
+            return True
         if not isinstance(other, Discussion):
             return False
         return self.__key() == other.__key()
@@ -176,6 +179,8 @@ class Usergroup:
         )
 
     def __eq__(self, other) -> bool:
+        if other is self:
+            return True
         if not isinstance(other, Usergroup):
             return False
         return self.__key() == other.__key()
@@ -209,6 +214,8 @@ class NewsPost:
         )
 
     def __eq__(self, other) -> bool:
+        if other is self:
+            return True
         if not isinstance(other, NewsPost):
             return False
         return self.__key() == other.__key()
@@ -224,7 +231,8 @@ class Event:
     Some of these properties will be None depending on type."""
     def __init__(
             self, _type: str, time: datetime, beatmapset: Beatmapset=None, discussion: Discussion=None,
-            user: User=None, group: Usergroup=None, newspost: NewsPost=None, content: str=None):
+            user: User=None, group: Usergroup=None, newspost: NewsPost=None, content: str=None, _id: int=None):
+        self.id = _id  # Auto-incremented id in the events table, if retrieved from there, otherwise None.
         self.type = _type
         self.time = time.replace(microsecond=0)  # Simplify precision to database-level
         self.beatmapset = beatmapset
@@ -260,6 +268,8 @@ class Event:
         )
 
     def __eq__(self, other) -> bool:
+        if other is self:
+            return True
         if not isinstance(other, Event):
             return False
         return self.__key() == other.__key()
@@ -0,0 +1,170 @@
+import threading
+import mysql.connector
+from mysql.connector.errors import Error, InterfaceError, OperationalError
+from queue import LifoQueue, Empty
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Generator
+
+from aiess.settings import DB_CONFIG, DB_POOL_SIZE
+from aiess.logger import log
+
+# Connections idle for less than this many seconds are assumed to still be alive,
+# so we don't pay for a ping round trip on every single query.
+HEALTH_CHECK_INTERVAL = 30
+CHECKOUT_TIMEOUT      = 30
+
+class ConnectionPool:
+    """Keeps up to `size` MySQL connections to the given database open, which are checked out for each
+    query and returned afterwards, rather than opening a new connection for every `Database` object.
+
+    Connections which have been idle for a while are pinged on checkout, and reconnected if they died."""
+    def __init__(self, db_name: str, size: int=DB_POOL_SIZE):
+        self.db_name = db_name
+        self.size    = size
+        self.health_check_interval = HEALTH_CHECK_INTERVAL
+        self.checkout_timeout      = CHECKOUT_TIMEOUT
+
+        # LIFO such that the same few connections are reused, letting any excess ones go idle.
+        self.idle   = LifoQueue()
+        self.opened = 0
+        self.lock   = threading.Lock()
+
+        self.checkouts  = 0
+        self.waits      = 0
+        self.wait_time  = 0.0
+        self.reconnects = 0
+
+    def __connect(self) -> object:
+        """Returns a new connection to the database of this pool."""
+        db_config = {
+            "host":     DB_CONFIG["host"],
+            "port":     int(DB_CONFIG["port"]),
+            "database": self.db_name,
+            "user":     DB_CONFIG["user"],
+            "password": DB_CONFIG["password"]
+        }
+
+        try:
+            return mysql.connector.connect(**db_config)
+        except Error as error:
+            raise ValueError(f"Could not connect to MySQL; {error}")
+
+    def checkout(self) -> object:
+        """Returns an idle connection, or opens a new one if none are idle and the pool is not full.
+        Otherwise waits until another caller checks a connection back in."""
+        with self.lock:
+            self.checkouts += 1
+            can_open = self.idle.empty() and self.opened < self.size
+            if can_open:
+                self.opened += 1
+
+        if can_open:
+            try:
+                return self.__connect()
+            except Exception:
+                with self.lock:
+                    self.opened -= 1
+                raise
+
+        try:
+            connection, last_used = self.idle.get_nowait()
+        except Empty:
+            start_time = perf_counter()
+            try:
+                connection, last_used = self.idle.get(timeout=self.checkout_timeout)
+            except Empty:
+                raise ValueError(f"Timed out waiting for a connection to {self.db_name}; all {self.size} are in use.")
+            finally:
+                with self.lock:
+                    self.waits += 1
+                    self.wait_time += perf_counter() - start_time
+
+        return self.__ensure_healthy(connection, last_used)
+
+    def __ensure_healthy(self, connection: object, last_used: float) -> object:
+        """Returns the given connection if it has been used recently or still responds to a ping,
+        otherwise reconnects it. Connections which fail to reconnect are discarded."""
+        if perf_counter() - last_used < self.health_check_interval:
+            return connection
+
+        try:
+            connection.ping()
+        except Error as error:
+            log(f"WARNING | Reconnecting to {self.db_name}; {error}")
+            try:
+                connection.reconnect(attempts=3, delay=1)
+            except Error:
+                self.discard(connection)
+                raise
+            with self.lock:
+                self.reconnects += 1
+
+        return connection
+
+    def checkin(self, connection: object) -> None:
+        """Returns the given connection to the pool, making it available to the next caller."""
+        self.idle.put((connection, perf_counter()))
+
+    def discard(self, connection: object) -> None:
+        """Closes the given checked out connection and frees its slot in the pool."""
+        try:
+            connection.close()
+        except Error:
+            pass  # Most likely already closed on the server's end.
+
+        with self.lock:
+            self.opened -= 1
+
+    @contextmanager
+    def connection(self) -> Generator[object, None, None]:
+        """Checks out a connection for the duration of the with-block, and checks it back in afterwards.
+        Connections which broke during the block are discarded rather than reused."""
+        connection = self.checkout()
+        try:
+            yield connection
+        except (InterfaceError, OperationalError):
+            self.discard(connection)
+            raise
+        except Exception:
+            try:
+                connection.rollback()
+            except Error:
+                self.discard(connection)
+                raise
+            self.checkin(connection)
+            raise
+        else:
+            self.checkin(connection)
+
+    def close(self) -> None:
+        """Closes all idle connections. Checked out connections are unaffected."""
+        while True:
+            try:
+                connection, _ = self.idle.get_nowait()
+            except Empty:
+                break
+            self.discard(connection)
+
+    def stats(self) -> dict:
+        """Returns the current size and usage counters of this pool (e.g. how often callers had to wait)."""
+        with self.lock:
+            return dict(
+                size       = self.size,
+                opened     = self.opened,
+                idle       = self.idle.qsize(),
+                checkouts  = self.checkouts,
+                waits      = self.waits,
+                wait_time  = self.wait_time,
+                reconnects = self.reconnects
+            )
+
+pools: Dict[str, ConnectionPool] = {}
+pools_lock = threading.Lock()
+
+def get_pool(db_name: str) -> ConnectionPool:
+    """Returns the process-wide connection pool for the given database, creating it on first use."""
+    with pools_lock:
+        if db_name not in pools:
+            pools[db_name] = ConnectionPool(db_name)
+        return pools[db_name]
@@ -0,0 +1,117 @@
+import re
+import threading
+from collections import OrderedDict
+from time import perf_counter
+from typing import Dict, Iterable, List, Set
+
+# Cached results older than this many seconds are dropped, since other processes
+# (e.g. the scraper) may write to the same tables without us knowing.
+QUERY_CACHE_TTL  = 60
+QUERY_CACHE_SIZE = 1000
+
+WRITE_STATEMENTS = ["INSERT", "REPLACE", "UPDATE", "DELETE", "TRUNCATE"]
+# The lookahead skips "ON DUPLICATE KEY UPDATE column=...", which names a column rather than a table.
+TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE|TRUNCATE)\s+(?:`?\w+`?\.)?`?(\w+)\b(?!`?\.|\s*=)", re.IGNORECASE)
+
+def is_write(query: str) -> bool:
+    """Returns whether the given SQL query modifies data (e.g. INSERT, DELETE), as opposed to only reading it."""
+    words = query.split(None, 1)
+    return bool(words) and words[0].upper() in WRITE_STATEMENTS
+
+def tables_in(query: str) -> Set[str]:
+    """Returns the names of all tables the given SQL query reads from or writes to (e.g. {"events", "users"})."""
+    return set(table.lower() for table in TABLE_PATTERN.findall(query))
+
+class QueryCache:
+    """Keeps the results of up to `size` read queries for `ttl` seconds, evicting the least recently used first.
+    Results are dropped as soon as any table they were read from is written to, see `invalidate`."""
+    def __init__(self, size: int=QUERY_CACHE_SIZE, ttl: float=QUERY_CACHE_TTL):
+        self.size = size
+        self.ttl  = ttl
+
+        self.entries: OrderedDict = OrderedDict()  # key -> (result, tables, stored_at)
+        self.lock = threading.Lock()
+
+        self.hits          = 0
+        self.misses        = 0
+        self.evictions     = 0
+        self.expirations   = 0
+        self.invalidations = 0
+
+    def __key(self, query: str, values: object) -> str:
+        return f"Q:{query}, V:{values}"
+
+    def get(self, query: str, values: object=None) -> List[tuple]:
+        """Returns the cached result of the given query and values, or None if not cached or expired."""
+        key = self.__key(query, values)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            result, _, stored_at = entry
+            if perf_counter() - stored_at > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, query: str, values: object, result: List[tuple]) -> None:
+        """Caches the result of the given query and values, evicting the least recently used result if full."""
+        key = self.__key(query, values)
+        with self.lock:
+            self.entries[key] = (result, tables_in(query), perf_counter())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Drops any cached result read from any of the given tables."""
+        tables = set(table.lower() for table in tables)
+        if not tables:
+            return
+
+        with self.lock:
+            stale_keys = [key for key, (_, read_tables, _) in self.entries.items() if read_tables & tables]
+            for key in stale_keys:
+                del self.entries[key]
+            self.invalidations += len(stale_keys)
+
+    def clear(self) -> None:
+        """Drops all cached results."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the current size and usage counters of this cache (e.g. how often results were served from it)."""
+        with self.lock:
+            return dict(
+                size          = len(self.entries),
+                hits          = self.hits,
+                misses        = self.misses,
+                evictions     = self.evictions,
+                expirations   = self.expirations,
+                invalidations = self.invalidations
+            )
+
+caches: Dict[str, QueryCache] = {}
+caches_lock = threading.Lock()
+
+def get_query_cache(db_name: str) -> QueryCache:
+    """Returns the process-wide query cache for the given database, creating it on first use."""
+    with caches_lock:
+        if db_name not in caches:
+            caches[db_name] = QueryCache()
+        return caches[db_name]
+
+def invalidate(db_name: str, tables: Iterable[str]) -> None:
+    """Drops any cached result of the given database read from any of the given tables, if it has a cache."""
+    cache = caches.get(db_name)
+    if cache is not None:
+        cache.invalidate(tables)
@@ -0,0 +1,90 @@
+import re
+import threading
+from typing import Dict, List
+
+from aiess.logger import log
+
+# Queries taking longer than this many seconds are written to the slow query log.
+SLOW_QUERY_THRESHOLD = 1.0
+# Upper bounds in seconds of each latency histogram bucket, the last catching anything slower.
+HISTOGRAM_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf")]
+
+SHAPE_PATTERNS = [
+    (re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""), "?"),     # String literals
+    (re.compile(r"%\(\w+\)s|%s"),                            "?"),     # Placeholders, e.g. "%s" and "%(name)s"
+    (re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b"),             "?"),     # Numeric literals, but not in names like "aiess_test2"
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"),              "(?+)"),  # Lists of any length, e.g. "IN (?, ?, ?)"
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"),            "(?+)+"), # Multi-row values, e.g. "VALUES (?, ?), (?, ?)"
+    (re.compile(r"\s+"),                                     " ")
+]
+
+def shape_of(query: str) -> str:
+    """Returns the given SQL query with any literals, placeholders and lists of these replaced, such that queries
+    differing only in their values have the same shape (e.g. "SELECT * FROM aiess.users WHERE id IN (?+)")."""
+    for pattern, replacement in SHAPE_PATTERNS:
+        query = pattern.sub(replacement, query)
+    return query.strip()
+
+class ShapeStats:
+    """Contains the latency and row counts of all executions of queries with the same shape."""
+    def __init__(self, shape: str):
+        self.shape      = shape
+        self.count      = 0
+        self.total_time = 0.0
+        self.max_time   = 0.0
+        self.rows       = 0
+        self.histogram  = [0] * len(HISTOGRAM_BUCKETS)
+
+    def record(self, duration: float, rows: int) -> None:
+        self.count      += 1
+        self.total_time += duration
+        self.max_time    = max(self.max_time, duration)
+        self.rows       += rows
+        self.histogram[next(index for index, bound in enumerate(HISTOGRAM_BUCKETS) if duration <= bound)] += 1
+
+    def to_dict(self) -> dict:
+        return dict(
+            shape      = self.shape,
+            count      = self.count,
+            total_time = self.total_time,
+            mean_time  = self.total_time / self.count if self.count else 0.0,
+            max_time   = self.max_time,
+            rows       = self.rows,
+            histogram  = dict(zip(HISTOGRAM_BUCKETS, self.histogram))
+        )
+
+class QueryStats:
+    """Keeps latency histograms and row counts of executed queries, grouped by their shape (see `shape_of`),
+    and logs any query slower than `slow_threshold` seconds to the slow query log."""
+    def __init__(self, slow_threshold: float=SLOW_QUERY_THRESHOLD):
+        self.slow_threshold = slow_threshold
+        self.shapes: Dict[str, ShapeStats] = {}
+        self.lock = threading.Lock()
+
+    def record(self, db_name: str, query: str, values: object, duration: float, rows: int) -> None:
+        """Records that the given query took `duration` seconds and read or affected `rows` rows."""
+        shape = shape_of(query)
+        with self.lock:
+            if shape not in self.shapes:
+                self.shapes[shape] = ShapeStats(shape)
+            self.shapes[shape].record(duration, rows)
+
+        if duration >= self.slow_threshold:
+            values_str = str(values)
+            if len(values_str) > 200:
+                values_str = values_str[:200] + "..."  # Bulk inserts can have thousands of values.
+            log(f"SLOW {duration:.3f}s | {db_name} | {rows} rows | {shape} | {values_str}", postfix="-slow-queries")
+
+    def stats(self) -> List[dict]:
+        """Returns the stats of each query shape, most total time spent first."""
+        with self.lock:
+            shape_stats = [stats.to_dict() for stats in self.shapes.values()]
+        return sorted(shape_stats, key=lambda stats: stats["total_time"], reverse=True)
+
+    def clear(self) -> None:
+        """Forgets all recorded queries."""
+        with self.lock:
+            self.shapes.clear()
+
+# Shared by all databases of a process, so the stats cover everything it queries.
+query_stats = QueryStats()
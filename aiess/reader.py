@@ -1,12 +1,21 @@
-from typing import Generator, List, Iterable, Callable
-from datetime import datetime
+from typing import Generator, List, Iterable, Callable, Tuple, Union
+from datetime import datetime, timedelta
+from collections import defaultdict
+from contextlib import suppress
+from bisect import bisect_left, bisect_right
 import itertools
 import asyncio
 import copy
+import os
+from time import perf_counter
 
 from aiess import Event
-from aiess.database import Database
+from aiess.database import Database, run_in_executor
+from aiess.dispatcher import Dispatcher
 from aiess import timestamp
+from aiess import checkpoint
+from aiess import notifier
+from aiess.logger import log
 from aiess import event_types as types
 
 # The former element takes the type of the second, which is removed.
@@ -17,28 +26,82 @@ MERGABLE_TYPES = [
     (types.REPLY,    types.RESOLVE),
     (types.REPLY,    types.REOPEN)
 ]
+MERGING_TYPES = set(former_type for former_type, _ in MERGABLE_TYPES)
+
+# Seconds between reads when we cannot be notified of new events, see `aiess.notifier`.
+POLL_INTERVAL = 10
+# Seconds between reads when we can, in case notifications are missed (e.g. the scraper restarted in between).
+NOTIFIED_POLL_INTERVAL = 60
+
+# Most events read per query. If this many are found, the next batch is read right away.
+BATCH_SIZE = 1000
+# Events read and hydrated per query when replaying, see `Reader.replay`.
+REPLAY_CHUNK_SIZE = 5000
+# Seconds between each progress report when replaying.
+REPLAY_LOG_INTERVAL = 10
 
 class Scope():
-    """Determines which events should be read in a Reader. The `sql_target` WHERE clause is used
-    whenever events are retrieved using this scope."""
-    def __init__(self, name: str, sql_target: str="TRUE"):
+    """Determines which events fall within a scope of a Reader, being those of any of the given `event_types`, or
+    those the given `predicate` returns True for (e.g. any type but a few), otherwise all events."""
+    def __init__(self, name: str, event_types: List[str]=None, predicate: Callable[[Event], bool]=None):
+        if event_types is not None and predicate is not None:
+            raise ValueError("Cannot scope by both event types and a predicate, include the types in the predicate.")
+
         self.name = name
-        self.sql_target = sql_target
+        self.event_types = event_types
+        self.predicate = predicate
+
+    def matches(self, event: Event) -> bool:
+        """Returns whether the given event falls within this scope."""
+        if self.event_types is not None:
+            return event.type in self.event_types
+        return self.predicate(event) if self.predicate else True
+
+NEWS_TYPES  = [types.NEWS]
+GROUP_TYPES = [types.ADD, types.REMOVE]
+
+# Events of each batch are delivered scope by scope in this order. Every event falls within exactly one of these.
+SCOPES = [
+    Scope("mapset", predicate=lambda event: event.type not in NEWS_TYPES and event.type not in GROUP_TYPES),
+    Scope("news",   event_types=NEWS_TYPES),
+    Scope("groups", event_types=GROUP_TYPES)
+]
 
 class Reader():
-    """This has an async method `run`, which starts a loop that reads Aiess events every 10 seconds.
+    """This has an async method `run`, which starts a loop that reads Aiess events whenever the scraper notifies
+    that new ones were inserted, or every 10 seconds if notifications are unavailable (see `aiess.notifier`).
+
+    Events are read in order of their id in the events table, starting after the id checkpointed by the last
+    batch (initially the latest event on first run), such that events inserted late with older times are still read.
+    `on_event` is called with each of these; basically called for every new event.
 
-    If an event is found that is after an internal timestamp (initially current time on first run),
-    then `on_event` is called with this; basically called for every new event.
+    For each of these reads, `on_event_batch` is called, regardless of if any new events were found. Then, for each
+    scope with new events (see `SCOPES`), `on_events` is called with all of them at once, such that they can be
+    handled in bulk (e.g. one insert rather than one per event), followed by `on_event` for each of them.
 
-    For each of these reads, `on_event_batch` is called, regardless of if any new events were found.
+    Events are handled one at a time by default. Given a `concurrency` above 1, up to that many are handled at once,
+    except for events with the same key (see `dispatch_key`), which are still handled one at a time, in order.
     
-    Use this by creating a class inheriting Reader, and override above methods with custom functionality."""
-    def __init__(self, reader_id: str, db_name: str):
-        self.reader_id = reader_id
-        self.database  = Database(db_name)
-        self.running   = False
+    Only events of the types in `event_types` are handled, or any type if None. Events of other types are not
+    retrieved from the database, but still count as read. Likewise, only the fields of events in `event_fields`
+    are retrieved (e.g. ["beatmapset", "user"], see `aiess.database.EVENT_FIELDS`), or all if None.
+    
+    Use this by creating a class inheriting Reader, and override above methods with custom functionality.
+    Several readers can share the same reads by registering them to a `ReaderHost` instead of running each."""
+    event_types: List[str] = None
+    event_fields: List[str] = None
+
+    def __init__(self, reader_id: str, db_name: str, concurrency: int=1):
+        self.reader_id   = reader_id
+        self.database    = Database(db_name)
+        self.concurrency = concurrency
+        self.running     = False
         self.latest_event_time = None
+        self.last_id = None
+        # While upgrading from the former per-scope time files, events up to `__upgrade_id` at or before
+        # the time of their scope's file were already read, see `__seed_id`.
+        self.__upgrade_id    = None
+        self.__upgrade_times = None
 
     async def run(self) -> None:
         """A blocking method which initiates a loop looking through events in the database.
@@ -50,40 +113,273 @@ class Reader():
             raise ValueError("Reader is already running.")
 
         self.running = True
-        while True:
-            await self.__push_all_new_events()
-            await asyncio.sleep(10)
+        listener = notifier.Listener(f"reader-{self.reader_id}")
+        notified = listener.open()
+        try:
+            while True:
+                await self.__push_all_new_events()
+                await listener.wait(timeout=NOTIFIED_POLL_INTERVAL if notified else POLL_INTERVAL)
+        finally:
+            listener.close()
 
     async def __push_all_new_events(self) -> None:
-        """Triggers the on_event method for each new event since the last stored datetime for each scope."""
-        news_target   = f"type=\"{types.NEWS}\""
-        groups_target = f"type=\"{types.ADD}\" OR type=\"{types.REMOVE}\""
-
-        await self.__push_new_events(Scope("mapset", sql_target=f"NOT ({news_target}) AND NOT ({groups_target})"))
-        await self.__push_new_events(Scope("news",   sql_target=news_target))
-        await self.__push_new_events(Scope("groups", sql_target=groups_target))
-
-    async def __push_new_events(self, scope: Scope) -> None:
-        """Triggers the on_event method for each new event since the last stored datetime for the given scope."""
-        last_time = timestamp.get_last(self.__time_id(scope))
-        await self.__push_events_between(last_time, datetime.utcnow(), scope)
-    
-    async def __push_events_between(self, last_time: datetime, current_time: datetime, scope: Scope) -> datetime:
-        """Triggers the on_event method for each event between the two datetimes.
-        Updates the last stored datetime after each on_event call."""
+        """Triggers the on_event method for each event after the last checkpointed id, reading all scopes
+        at once in batches of at most `BATCH_SIZE` events. While a full batch is being handled, the next is read.
+
+        The checkpoint is updated after each batch, or should this be interrupted during a batch (e.g. `on_event`
+        raising), up to the events fully handled, such that only the rest are read again next time."""
+        await self._seed()
+
+        next_batch = asyncio.ensure_future(self.__read_batch(self.last_id))
+        while next_batch:
+            events, read_until_id = await next_batch
+            next_batch = asyncio.ensure_future(self.__read_batch(read_until_id)) if len(events) >= BATCH_SIZE else None
+
+            try:
+                await self._push_batch(events, read_until_id)
+            except BaseException:
+                if next_batch:
+                    next_batch.cancel()
+                raise
+
+    async def __read_batch(self, last_id: int) -> Tuple[List[Event], int]:
+        """Returns the next batch of events after the given id, along with the id read up to, see `read_batch`."""
+        return await read_batch(self.events_after, self.database, last_id, self.event_types)
+
+    async def _seed(self) -> None:
+        """Determines the id to start reading after, unless already known, see `__seed_id`."""
+        if self.last_id is None:
+            self.last_id = await run_in_executor(self.__seed_id)
+
+    async def _push_batch(self, events: List[Event], read_until_id: int=None) -> None:
+        """Handles the given batch of events read after `last_id` (see `__push_events`), and updates the checkpoint
+        to the id read up to, or if not given, the last event. Used by `run`, or by a `ReaderHost` reading events
+        for several readers at once."""
+        await self.__push_events(events)
+
+        if read_until_id is None:
+            read_until_id = events[-1].id if events else self.last_id
+
+        if read_until_id != self.last_id:
+            self.__checkpoint(read_until_id)
+        elif self.__upgrade_id is not None and self.last_id >= self.__upgrade_id:
+            self.__finish_upgrade()
+
+    async def __push_events(self, events: List[Event]) -> None:
+        """Triggers the on_event_batch method, and then for each scope (see `SCOPES`), the on_events method with the
+        given events in that scope, followed by the on_event method for each of them, otherwise in the given order.
+
+        With a `concurrency` above 1, events with different keys (see `dispatch_key`) are handled concurrently."""
         await self.on_event_batch()
-        async for event in await self.events_between(last_time, current_time, scope.sql_target):
-            await self.on_event(event)
-            timestamp.set_last(event.time, self.__time_id(scope))
 
-            if self.latest_event_time is None or event.time > self.latest_event_time:
-                self.latest_event_time = event.time
+        events_by_scope = [
+            [
+                event for event in events
+                if scope.matches(event) and self.__handles(event) and not self.__read_before_upgrade(event, scope)
+            ]
+            for scope in SCOPES
+        ]
+        scoped_events = [event for scope_events in events_by_scope for event in scope_events]
+        dispatcher = Dispatcher(self.__on_event, concurrency=self.concurrency, key=self.dispatch_key)
+        try:
+            await self.__dispatch_scoped(events_by_scope, dispatcher)
+            await dispatcher.join()
+        except BaseException:
+            await dispatcher.cancel()
+            # Events are handled scope by scope, and possibly concurrently, so an event may be done while another
+            # with a lower id is not. Only the events up to the first not done can be skipped next time.
+            pending_ids = set(event.id for event in scoped_events) - set(event.id for event in dispatcher.completed)
+            done_events = list(itertools.takewhile(lambda event: event.id not in pending_ids, events))
+            if done_events:
+                self.__checkpoint(done_events[-1].id)
+            raise
+
+    async def __dispatch_scoped(self, events_by_scope: List[List[Event]], dispatcher: Dispatcher) -> None:
+        """Calls on_events with the events of each scope, if any, before dispatching each of them to on_event."""
+        for scope_events in events_by_scope:
+            if not scope_events:
+                continue
+
+            await self.on_events(scope_events)
+            for event in scope_events:
+                await dispatcher.dispatch(event)
+
+    def __handles(self, event: Event) -> bool:
+        """Returns whether the given event is of any of the types this reader handles, see `event_types`."""
+        return self.event_types is None or event.type in self.event_types
+
+    async def __on_event(self, event: Event) -> None:
+        await self.on_event(event)
+
+        if self.latest_event_time is None or event.time > self.latest_event_time:
+            self.latest_event_time = event.time
+
+    def dispatch_key(self, event: Event) -> object:
+        """Returns the key of the given event when handling events concurrently (see `concurrency`). Events with the
+        same key are handled one at a time, in order. By default these are per beatmapset, otherwise per scope."""
+        if event.beatmapset:
+            return event.beatmapset.id
+        return next((scope.name for scope in SCOPES if scope.matches(event)), None)
+
+    def __checkpoint(self, last_id: int) -> None:
+        """Updates the checkpoint to the given id, being done with any event up to and including it."""
+        self.last_id = last_id
+        checkpoint.set_last(self.last_id, self.__checkpoint_id())
+
+        if self.__upgrade_id is not None and self.last_id >= self.__upgrade_id:
+            self.__finish_upgrade()
+
+    def __seed_id(self) -> int:
+        """Returns the id to start reading after. This is the checkpointed id, if any, otherwise the latest id.
+
+        If the time files of the former time-based reader exist, reading instead starts at the first event after
+        the earliest of these times, skipping any event at or before the time of its own scope (see `__push_events`).
+        These files are removed once read up to the latest id (see `__finish_upgrade`), so until then this repeats."""
+        if any(timestamp.exists(self.__time_id(scope)) for scope in SCOPES):
+            self.__upgrade_times = {scope.name: timestamp.get_last(self.__time_id(scope)) for scope in SCOPES}
+            self.__upgrade_id    = self.__max_id()
+
+            fetched_rows = self.database.retrieve_table_data(
+                table        = "events",
+                where        = "time > %s",
+                where_values = (min(self.__upgrade_times.values()),),
+                selection    = "MIN(id)"
+            )
+            first_id = fetched_rows[0][0] if fetched_rows else None
+            return first_id - 1 if first_id is not None else self.__upgrade_id
+
+        last_id = checkpoint.get_last(self.__checkpoint_id())
+        if last_id is None:
+            last_id = self.__max_id()
+            checkpoint.set_last(last_id, self.__checkpoint_id())
+
+        return last_id
+
+    def __max_id(self) -> int:
+        """Returns the id of the latest event inserted, or 0 if there are no events."""
+        return latest_id(self.database)
+
+    def __read_before_upgrade(self, event: Event, scope: Scope) -> bool:
+        """Returns whether the given event was already read by the former time-based reader, see `__seed_id`."""
+        return (
+            self.__upgrade_id is not None and
+            event.id <= self.__upgrade_id and
+            event.time <= self.__upgrade_times[scope.name]
+        )
+
+    def __finish_upgrade(self) -> None:
+        """Writes the checkpoint and removes the former time files, now that we have read past what they cover."""
+        checkpoint.set_last(self.last_id, self.__checkpoint_id())
+        for scope in SCOPES:
+            with suppress(OSError):
+                os.remove(timestamp.get_path(self.__time_id(scope)))
 
-    def __time_id(self, scope: Scope):
-        """Returns the identifier of the file the reader creates to keep track of the last time for this scope.
+        self.__upgrade_id    = None
+        self.__upgrade_times = None
+
+    def __checkpoint_id(self) -> str:
+        """Returns the identifier of the file the reader creates to keep track of the last event id it read.
         This is based on the identifier supplied to the reader on initialization."""
+        return f"reader-{self.reader_id}"
+
+    def __time_id(self, scope: Scope) -> str:
+        """Returns the identifier of the file the former time-based reader created to keep track of the
+        last time for this scope, see `__seed_id`."""
         return f"reader-{self.reader_id}-{scope.name}"
 
+    async def replay(
+            self, _from: Union[datetime, int], to: Union[datetime, int]=None,
+            chunk_size: int=REPLAY_CHUNK_SIZE) -> int:
+        """Triggers the on_events and on_event methods again for the events in the given range (e.g. to resend events
+        lost downstream), in order of id. The range is either of times or of event ids, both ends included, up to the
+        latest event if `to` is None. Only events of the `event_types` of this reader are read.
+
+        Events are read in hydrated chunks of `chunk_size`, each handled like a batch read by `run` (i.e. scope by
+        scope), as fast as `on_events` and `on_event` allow (see `concurrency`), logging progress and throughput along
+        the way. Neither the checkpoint nor the latest event time are affected, and on_event_batch is not called.
+        Returns the number of events replayed.
+
+        Each chunk is its own query, continuing after the last id of the previous one, and is read in full before any
+        of it is handled. Unlike streaming a single result set, slow consumers then hold no connection in between."""
+        where, where_values = self.__replay_where(_from, to)
+        total = await run_in_executor(self.__count_events, where, where_values)
+        log(f"Replaying {total} events from {_from} to {to if to is not None else 'latest'}...", postfix=self.reader_id)
+
+        dispatcher = Dispatcher(self.on_event, concurrency=self.concurrency, key=self.dispatch_key, keep_completed=False)
+        start_time = perf_counter()
+        log_time = start_time
+        last_id = 0
+        try:
+            while True:
+                chunk = await self.__read_replay_chunk(where, where_values, last_id, chunk_size)
+                if not chunk:
+                    break
+
+                await self.__dispatch_scoped(by_scope(chunk), dispatcher)
+                last_id = chunk[-1].id
+
+                if perf_counter() - log_time >= REPLAY_LOG_INTERVAL:
+                    log_time = perf_counter()
+                    self.__log_replay_progress(dispatcher.completed_count, total, log_time - start_time, chunk[-1])
+
+                if len(chunk) < chunk_size:
+                    break
+
+            await dispatcher.join()
+        except BaseException:
+            await dispatcher.cancel()
+            raise
+
+        self.__log_replay_progress(dispatcher.completed_count, total, perf_counter() - start_time)
+        return dispatcher.completed_count
+
+    async def __read_replay_chunk(self, where: str, where_values: tuple, last_id: int, chunk_size: int) -> List[Event]:
+        """Returns the next `chunk_size` events matching the given WHERE clause after the given id, in order of id."""
+        events = self.database.retrieve_events(
+            where        = f"({where}) AND id > %s ORDER BY id ASC LIMIT %s",
+            where_values = where_values + (last_id, chunk_size),
+            fields       = self.event_fields
+        )
+        return [event async for event in events]
+
+    def __replay_where(self, _from: Union[datetime, int], to: Union[datetime, int]=None) -> Tuple[str, tuple]:
+        """Returns the WHERE clause and its values selecting the events in the given range, see `replay`."""
+        if to is not None and isinstance(_from, int) != isinstance(to, int):
+            raise ValueError("Cannot replay from an id to a time, or vice versa.")
+
+        column = "id" if isinstance(_from, int) else "time"
+        where = f"{column} >= %s"
+        where_values = (_from,)
+        if to is not None:
+            where += f" AND {column} <= %s"
+            where_values += (to,)
+        if self.event_types is not None:
+            types_where, types_where_values = types_condition(self.event_types)
+            where += f" AND {types_where}"
+            where_values += types_where_values
+
+        return where, where_values
+
+    def __count_events(self, where: str, where_values: tuple) -> int:
+        fetched_rows = self.database.retrieve_table_data(table="events", where=where, where_values=where_values, selection="COUNT(*)")
+        return fetched_rows[0][0] if fetched_rows else 0
+
+    def __log_replay_progress(self, count: int, total: int, duration: float, event: Event=None) -> None:
+        percentage = count / total * 100 if total else 100
+        rate = count / duration if duration else 0
+        message = f"Replayed {count}/{total} events ({percentage:.1f}%, {rate:.0f} events/s)"
+        if event is not None:
+            message += f", reading {event.time} (id {event.id})"
+        log(message, postfix=self.reader_id)
+
+    async def events_after(self, last_id: int, limit: int=None, until_id: int=None) -> Generator[Event, None, None]:
+        """Yields each event found in the database with an id after the given id, in order of id.
+        Optionally only retrieves up to `limit` of these, and only up to and including `until_id`.
+
+        Only events of the `event_types` of this reader are retrieved, with only its `event_fields` hydrated."""
+        where, where_values = events_after_where(last_id, limit, until_id, self.event_types)
+        return self.database.retrieve_events(where=where, where_values=where_values, fields=self.event_fields)
+
     async def events_between(self, _from: datetime, to: datetime, sql_target: str="TRUE") -> Generator[Event, None, None]:
         """Yields each event found in the database, from (excluding) the later time to (including) the earlier time.
         Optionally only retrieves events matching the `sql_target` WHERE clause."""
@@ -93,38 +389,117 @@ class Reader():
         """Called for each new event batch found in the running loop of the reader.
         This happens before on_event is called for each event."""
 
+    async def on_events(self, events: List[Event]) -> None:
+        """Called with all new events of a scope (see `SCOPES`) found in the running loop of the reader, in order,
+        if there are any. This happens before on_event is called for each of them.
+
+        Override this to handle events in bulk (e.g. one request for all events rather than one per event).
+        Should this raise, none of the given events count as read, so all are pushed again next time."""
+
     async def on_event(self, event: Event) -> None:
         """Called for each new event found in the running loop of the reader."""
 
+def by_scope(events: Iterable[Event]) -> List[List[Event]]:
+    """Returns the given events split by scope, in the order of `SCOPES`, otherwise in the given order."""
+    events = list(events)
+    return [[event for event in events if scope.matches(event)] for scope in SCOPES]
+
+def types_condition(event_types: List[str]) -> Tuple[str, tuple]:
+    """Returns the WHERE condition and its values selecting events of any of the given types."""
+    return f"type IN ({', '.join(['%s'] * len(event_types)) or 'NULL'})", tuple(event_types)
+
+def events_after_where(
+        last_id: int, limit: int=None, until_id: int=None,
+        event_types: List[str]=None) -> Tuple[str, tuple]:
+    """Returns the WHERE clause and its values selecting events after the given id in order of id, optionally only
+    up to `limit` of these, up to and including `until_id`, and of any of the given types."""
+    where = "id > %s"
+    where_values = (last_id,)
+    if until_id is not None:
+        where += " AND id <= %s"
+        where_values += (until_id,)
+    if event_types is not None:
+        types_where, types_where_values = types_condition(event_types)
+        where += f" AND {types_where}"
+        where_values += types_where_values
+
+    where += " ORDER BY id ASC"
+    if limit:
+        where += " LIMIT %s"
+        where_values += (limit,)
+
+    return where, where_values
+
+def latest_id(database: Database) -> int:
+    """Returns the id of the latest event inserted into the given database, or 0 if there are no events."""
+    fetched_rows = database.retrieve_table_data(table="events", selection="MAX(id)")
+    return (fetched_rows[0][0] if fetched_rows else None) or 0
+
+async def read_batch(
+        events_after: Callable, database: Database, last_id: int,
+        event_types: List[str]=None) -> Tuple[List[Event], int]:
+    """Returns the next batch of at most `BATCH_SIZE` events after the given id using the given `events_after`
+    (see `Reader.events_after`), along with the id read up to.
+
+    When only some types are read, this is the latest id as of reading, unless the batch is full. Otherwise we
+    would go through the same events of other types again next time (e.g. every reply since the last nomination)."""
+    until_id = await run_in_executor(latest_id, database) if event_types is not None else None
+    events = [event async for event in await events_after(last_id, limit=BATCH_SIZE, until_id=until_id)]
+
+    if len(events) >= BATCH_SIZE or until_id is None:
+        return events, events[-1].id if events else last_id
+    return events, max(until_id, last_id)
+
 def merge_concurrent(events: Iterable[Event]) -> List[Event]:
     """Returns a list of events where certain concurrent events are merged
-    (e.g. user nominates + system qualifies -> user qualifies)."""
+    (e.g. user nominates + system qualifies -> user qualifies), in order of time.
+
+    Since only events on the same beatmapset within a second of each other can merge, each event is only compared
+    to those in its beatmapset within that window, found by bisecting their times. Merged events are copies,
+    any other event is returned as is, so the given events are never modified."""
     # `dict.fromkeys` removes duplicates in the db, as keys in a dictonary are unique. We essentially merge same events.
-    # This is copied such that any modification we make to this list won't affect the original references.
-    new_events = list(dict.fromkeys(copy.deepcopy(list(events))))
-    new_events = list(sorted(new_events, key=lambda event: event.time))
-    merged_events = []
-
-    # `reversed(new_events)` is to go through events closer to each other first.
-    for event, other_event in itertools.permutations(reversed(new_events), 2):
-        # The system event is rarely 1 second late, hence the leniency.
-        if abs((event.time - other_event.time).total_seconds()) > 1:
-            continue
-
-        if event.beatmapset != other_event.beatmapset:
-            continue
-
-        if (event.type, other_event.type) in MERGABLE_TYPES:
-            if event in merged_events or other_event in merged_events:
-                # This would result in lost information (e.g. overriding a user attribute).
+    new_events = sorted(dict.fromkeys(events), key=lambda event: event.time)
+
+    beatmapset_events = defaultdict(list)
+    for event in new_events:
+        beatmapset_events[event.beatmapset].append(event)
+
+    merged_types = {}  # Event -> type of the event it was merged with.
+    removed_events = set()
+    for events_of_beatmapset in beatmapset_events.values():
+        times = [event.time for event in events_of_beatmapset]
+
+        # Latest first, for each event going through events closer to each other first.
+        for event in reversed(events_of_beatmapset):
+            if event.type not in MERGING_TYPES:
                 continue
 
-            # Ensure that we have not already merged this event (e.g. nominate 1s <- nominate 0s <- qualify 0s).
-            if other_event in new_events:
+            # The system event is rarely 1 second late, hence the leniency.
+            start = bisect_left(times, event.time - timedelta(seconds=1))
+            end   = bisect_right(times, event.time + timedelta(seconds=1))
+            for other_event in reversed(events_of_beatmapset[start:end]):
+                if other_event is event or (event.type, other_event.type) not in MERGABLE_TYPES:
+                    continue
+
+                # Merging already merged events would result in lost information (e.g. overriding a user attribute),
+                # and we cannot merge events that were already merged into another (e.g. nominate 1s <- nominate 0s <- qualify 0s).
+                if other_event in merged_types or other_event in removed_events:
+                    continue
+
                 # Former event has all properties the second does and more,
                 # and is represented better having the type of the latter.
-                event.type = other_event.type
-                merged_events.append(event)
-                new_events.remove(other_event)
+                merged_types[event] = other_event.type
+                removed_events.add(other_event)
+                break
+
+    return [
+        __with_type(event, merged_types[event]) if event in merged_types else event
+        for event in new_events
+        if event not in removed_events
+    ]
 
-    return new_events
\ No newline at end of file
+def __with_type(event: Event, _type: str) -> Event:
+    """Returns a copy of the given event with the given type."""
+    new_event = copy.copy(event)
+    new_event.type = _type
+    return new_event
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Callable
+
+from aiess.objects import User, Beatmapset, Discussion
+
+# Entities kept per type before the least recently used ones are dropped.
+REGISTRY_SIZE = 5000
+
+class Registry:
+    """Keeps shared user, beatmapset and discussion instances keyed by id, such that the same entity is only
+    constructed (and possibly requested from the api) once, rather than for every event or row it appears in.
+
+    A stored instance is only returned if it agrees with every field supplied by the caller, otherwise a new
+    instance is constructed and replaces it. Fields left as None are considered unknown, and match anything."""
+    def __init__(self, size: int=REGISTRY_SIZE):
+        self.size    = size
+        self.entries: Dict[type, OrderedDict] = { User: OrderedDict(), Beatmapset: OrderedDict(), Discussion: OrderedDict() }
+        self.lock    = threading.Lock()
+
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    def user(self, _id: int, name: str=None) -> User:
+        """Returns the stored user with the given id, or a new one if none is stored or the name differs.
+        Users without an id cannot be identified, so are always constructed."""
+        if _id is None:
+            return User(_id, name)
+
+        return self.__get_or_create(User, int(_id), dict(name=name), lambda: User(_id, name))
+
+    def beatmapset(
+            self, _id: int, artist: str=None, title: str=None, creator: User=None,
+            modes: List[str]=None, genre: str=None, language: str=None, beatmapset_json: object=None) -> Beatmapset:
+        """Returns the stored beatmapset with the given id, or a new one if none is stored or any supplied field differs.
+        Only the latter case may request the beatmapset from the api, see `Beatmapset`."""
+        if _id is None:
+            raise ValueError("Beatmapset id should not be None.")
+
+        fields = dict(artist=artist, title=title, creator=creator, modes=modes, genre=genre, language=language)
+        return self.__get_or_create(Beatmapset, int(_id), fields, lambda: Beatmapset(
+            _id, artist, title, creator, modes, genre, language, beatmapset_json))
+
+    def discussion(
+            self, _id: int, beatmapset: Beatmapset, user: User=None, content: str=None,
+            tab: str=None, difficulty: str=None) -> Discussion:
+        """Returns the stored discussion with the given id, or a new one if none is stored or any supplied field differs."""
+        fields = dict(beatmapset=beatmapset, user=user, content=content, tab=tab, difficulty=difficulty)
+        return self.__get_or_create(Discussion, int(_id), fields, lambda: Discussion(
+            _id, beatmapset, user, content, tab, difficulty))
+
+    def __get_or_create(self, _type: type, _id: int, fields: dict, create: Callable[[], object]) -> object:
+        """Returns the stored instance of the given type and id if it agrees with all non-None fields,
+        otherwise stores and returns the instance from `create`."""
+        entries = self.entries[_type]
+        with self.lock:
+            stored = entries.get(_id)
+            if stored is not None and all(
+                    value is None or getattr(stored, name) == value
+                    for name, value in fields.items()):
+                entries.move_to_end(_id)
+                self.hits += 1
+                return stored
+            self.misses += 1
+
+        # Constructing may request the api, so we don't want to hold the lock meanwhile.
+        created = create()
+        with self.lock:
+            entries[_id] = created
+            entries.move_to_end(_id)
+            while len(entries) > self.size:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+        return created
+
+    def invalidate(self, _type: type, _id: int) -> None:
+        """Forgets the stored instance of the given type and id (e.g. `User`, 2), if any, such that
+        the next lookup constructs it anew."""
+        with self.lock:
+            self.entries[_type].pop(int(_id), None)
+
+    def clear(self) -> None:
+        """Forgets all stored instances, e.g. at the start of each scraping pass so renames and metadata changes are seen."""
+        with self.lock:
+            for entries in self.entries.values():
+                entries.clear()
+
+    def stats(self) -> dict:
+        """Returns the number of stored instances per type and how often lookups were served from them."""
+        with self.lock:
+            return dict(
+                users       = len(self.entries[User]),
+                beatmapsets = len(self.entries[Beatmapset]),
+                discussions = len(self.entries[Discussion]),
+                hits        = self.hits,
+                misses      = self.misses,
+                evictions   = self.evictions
+            )
+
+# Shared by the parsers and database of a process.
+registry = Registry()
@@ -0,0 +1,27 @@
+import sys
+import asyncio
+from datetime import datetime
+from typing import Union
+
+from aiess.host import load_reader
+from aiess import timestamp
+from aiess import logger
+
+def parse_bound(string: str) -> Union[datetime, int]:
+    """Returns the given event id (e.g. "15023") or time (e.g. "2020-01-01 00:00:00") bound of a replay."""
+    return int(string) if string.isdigit() else timestamp.from_string(string)
+
+if __name__ == "__main__":
+    # E.g. `python -m aiess.replay bnsite.main:reader "2020-01-01 00:00:00" "2020-02-01 00:00:00"`,
+    # or by event id `python -m aiess.replay bnstats.main:reader 15023`, up to the latest event if no end is given.
+    if len(sys.argv) not in [3, 4]:
+        print("Usage: python -m aiess.replay <module:reader> <from id/time> [to id/time]")
+        sys.exit(1)
+
+    logger.init()
+    reader = load_reader(sys.argv[1])
+    _from = parse_bound(sys.argv[2])
+    to = parse_bound(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(reader.replay(_from, to))
@@ -0,0 +1,209 @@
+import threading
+from urllib.parse import quote
+from typing import Dict, Iterable, List, Tuple
+
+from aiess.web import api
+
+# Users kept in memory before the longest known ones are dropped. Each takes up about 200 bytes, so
+# this holds far more users than we come across (e.g. ~200 MB for everyone who ever mapped or modded).
+USER_MAP_SIZE = 1000000
+
+class UserResolver:
+    """Resolves user names from ids and the other way around, from the first of these which knows the user:
+    an in-memory id <-> name map, the `users` table of the database given to `use_database` (if any), and
+    lastly the api. Whatever is found is kept in the map, such that each user is only looked up once.
+
+    Users on the same page should be looked up at once using `prefetch`, rather than one database query each."""
+    def __init__(self, size: int=USER_MAP_SIZE):
+        self.size     = size
+        self.database = None
+        self.lock     = threading.Lock()
+
+        # Plain dictionaries rather than an `OrderedDict`, which takes about twice the memory, at the cost of dropping
+        # the first added rather than least recently used users when full. Names are case insensitive in osu!.
+        self.names: Dict[int, str] = {}  # id -> name
+        self.ids: Dict[str, int]   = {}  # casefolded name -> id
+
+        self.map_hits      = 0
+        self.database_hits = 0
+        self.api_requests  = 0
+        self.renames       = 0
+        self.harvested     = 0
+
+    def use_database(self, database: object) -> None:
+        """Looks up users in the `users` table of the given database (e.g. `Database(SCRAPER_DB_NAME)`) before
+        requesting them from the api. Users are only looked up in the map and the api until this is called."""
+        self.database = database
+
+    def remember(self, _id: int, name: str) -> None:
+        """Keeps the given user in the map. Should the user have been renamed, or someone else have had this name
+        before, the old pairing is forgotten, along with any api response of it, for all processes."""
+        if _id is None or name is None:
+            return
+
+        _id  = int(_id)
+        name = str(name)
+        key  = name.casefold()
+        with self.lock:
+            old_name = self.names.pop(_id, None)
+            if old_name is not None and self.ids.get(old_name.casefold()) == _id:
+                del self.ids[old_name.casefold()]
+            old_id = self.ids.pop(key, None)
+            if old_id is not None and old_id != _id:
+                self.names.pop(old_id, None)
+
+            self.names[_id] = name
+            self.ids[key]   = _id
+
+            # Api responses of the old pairings would otherwise still be used by other processes.
+            stale_users = []
+            if old_name is not None and old_name != name:
+                stale_users += [_id, old_name]
+                self.renames += 1
+            if old_id is not None and old_id != _id:
+                stale_users += [name]
+
+            while len(self.names) > self.size:
+                first_id = next(iter(self.names))
+                first_name = self.names.pop(first_id)
+                if self.ids.get(first_name.casefold()) == first_id:
+                    del self.ids[first_name.casefold()]
+
+        if stale_users:
+            invalidate_api_responses(stale_users)
+
+    def harvest(self, users: Iterable[Tuple[int, str]]) -> int:
+        """Remembers all of the given (id, name) pairs (e.g. every user embedded in a page), and stores those which are
+        new to us or renamed in the `users` table of the database, using a single query. Returns how many that was."""
+        changed_users = {}
+        for _id, name in users:
+            if _id is None or name is None:
+                continue
+            with self.lock:
+                known_name = self.names.get(int(_id))
+            if known_name != str(name):
+                changed_users[int(_id)] = str(name)
+
+        if not changed_users:
+            return 0
+
+        for _id, name in changed_users.items():
+            self.remember(_id, name)
+        if self.database:
+            self.database.insert_table_data_many("users", [dict(id=_id, name=name) for _id, name in changed_users.items()])
+
+        with self.lock:
+            self.harvested += len(changed_users)
+        return len(changed_users)
+
+    def forget(self, _id: int) -> None:
+        """Drops the user with the given id from the map, such that it is looked up again next time."""
+        with self.lock:
+            name = self.names.pop(int(_id), None)
+            if name is not None and self.ids.get(name.casefold()) == int(_id):
+                del self.ids[name.casefold()]
+
+    def name_of(self, _id: int) -> str:
+        """Returns the name of the user with the given id, or None if no such user exists (e.g. restricted)."""
+        with self.lock:
+            name = self.names.get(int(_id))
+        if name is not None:
+            with self.lock:
+                self.map_hits += 1
+            return name
+
+        self.prefetch(ids=[_id])
+        with self.lock:
+            name = self.names.get(int(_id))
+        if name is not None:
+            with self.lock:
+                self.database_hits += 1
+            return name
+
+        with self.lock:
+            self.api_requests += 1
+        user_json = api.request_user(_id)
+        if user_json is None:
+            return None
+
+        self.remember(user_json["user_id"], user_json["username"])
+        return str(user_json["username"])
+
+    def id_of(self, name: str) -> int:
+        """Returns the id of the user with the given name, or None if no such user exists (e.g. restricted or
+        renamed a long time ago)."""
+        with self.lock:
+            _id = self.ids.get(name.casefold())
+        if _id is not None:
+            with self.lock:
+                self.map_hits += 1
+            return _id
+
+        self.prefetch(names=[name])
+        with self.lock:
+            _id = self.ids.get(name.casefold())
+        if _id is not None:
+            with self.lock:
+                self.database_hits += 1
+            return _id
+
+        with self.lock:
+            self.api_requests += 1
+        user_json = api.request_user(name)
+        if user_json is None:
+            return None
+
+        # Only the id is needed here, so a response without the name still resolves it (`remember` then skips it).
+        self.remember(user_json["user_id"], user_json.get("username"))
+        return int(user_json["user_id"])
+
+    def prefetch(self, ids: Iterable[int]=(), names: Iterable[str]=()) -> None:
+        """Looks up any of the given user ids and names not yet in the map in the database, using a single query.
+        Those not stored there either are left to be requested from the api when needed."""
+        with self.lock:
+            ids   = set(int(_id) for _id in ids if _id is not None and int(_id) not in self.names)
+            names = set(name for name in names if name is not None and name.casefold() not in self.ids)
+        if not self.database or (not ids and not names):
+            return
+
+        for _id, name in self.__retrieve_rows(ids, names):
+            self.remember(_id, name)
+
+    def __retrieve_rows(self, ids: Iterable[int], names: Iterable[str]) -> List[tuple]:
+        """Returns the (id, name) rows of the users table matching any of the given ids or names."""
+        conditions = []
+        if ids:   conditions.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+        if names: conditions.append(f"name IN ({', '.join(['%s'] * len(names))})")
+
+        return self.database.retrieve_table_data(
+            table        = "users",
+            where        = " OR ".join(conditions),
+            where_values = tuple(ids) + tuple(names),
+            selection    = "id, name"
+        ) or []
+
+    def stats(self) -> dict:
+        """Returns the current size of the map, how many lookups were resolved by the map, the database and the api,
+        and how many users were renamed or harvested."""
+        with self.lock:
+            return dict(
+                size          = len(self.names),
+                map_hits      = self.map_hits,
+                database_hits = self.database_hits,
+                api_requests  = self.api_requests,
+                renames       = self.renames,
+                harvested     = self.harvested
+            )
+
+    def clear(self) -> None:
+        """Forgets all users in the map."""
+        with self.lock:
+            self.names.clear()
+            self.ids.clear()
+
+def invalidate_api_responses(users: Iterable[object]) -> None:
+    """Drops any cached api response of the given user ids and/or names, see `api.request_user`."""
+    api.cache.invalidate([f"/get_user?u={quote(str(user))}" for user in users])
+
+# Shared by the whole process, such that users found by any parser or reader are known to all of them.
+user_resolver = UserResolver()
@@ -13,8 +13,9 @@ PAGE_RATE_LIMIT   = settings["page-rate-limit"]
 BNSITE_RATE_LIMIT = settings["bnsite-rate-limit"]
 
 # STORAGE
-ROOT_PATH = settings["root-path"]
-DB_CONFIG = settings["db-config"]
+ROOT_PATH    = settings["root-path"]
+DB_CONFIG    = settings["db-config"]
+DB_POOL_SIZE = settings["db-pool-size"]
 
 # 3RD PARTY
 BNSITE_MONGODB_URI = settings["bnsite-mongodb-uri"]
@@ -0,0 +1,83 @@
+import os
+import pytest
+from unittest import mock
+from contextlib import suppress
+
+from aiess.web import bucket
+from aiess.web.bucket import TokenBucket, get_bucket
+
+@pytest.fixture
+def bucket_id():
+    _id = "test"
+    with suppress(OSError):
+        os.remove(bucket.get_path(_id))
+    yield _id
+    with suppress(OSError):
+        os.remove(bucket.get_path(_id))
+
+def test_burst(bucket_id):
+    token_bucket = TokenBucket(bucket_id, interval=10, burst=3)
+    with mock.patch("aiess.web.bucket.time.time", return_value=1000):
+        waits = [token_bucket.acquire() for _ in range(5)]
+        remaining = token_bucket.remaining()
+
+    # Reserved tokens are queued up one interval apart.
+    assert waits == [0, 0, 0, 10, 20]
+    assert remaining == -2
+
+def test_refill(bucket_id):
+    token_bucket = TokenBucket(bucket_id, interval=10, burst=2)
+    with mock.patch("aiess.web.bucket.time.time", return_value=1000):
+        token_bucket.acquire()
+        token_bucket.acquire()
+    with mock.patch("aiess.web.bucket.time.time", return_value=1015):
+        assert token_bucket.remaining() == 1.5
+    with mock.patch("aiess.web.bucket.time.time", return_value=2000):
+        # Never more than the burst.
+        assert token_bucket.remaining() == 2
+
+def test_shared_between_processes(bucket_id):
+    # Separate instances, as each process would have, sharing the same state.
+    token_bucket = TokenBucket(bucket_id, interval=10)
+    other_token_bucket = TokenBucket(bucket_id, interval=10)
+    with mock.patch("aiess.web.bucket.time.time", return_value=1000):
+        assert token_bucket.acquire() == 0
+        assert other_token_bucket.acquire() == 10
+        assert token_bucket.acquire() == 20
+
+def test_back_off(bucket_id):
+    token_bucket = TokenBucket(bucket_id, interval=10)
+    with mock.patch("aiess.web.bucket.time.time", return_value=1000):
+        token_bucket.acquire()
+        assert token_bucket.back_off() == 30
+        assert token_bucket.acquire() == 40
+        assert token_bucket.back_off() == 60
+
+        token_bucket.succeed()
+        assert token_bucket.back_off() == 30
+
+def test_invalid_state(bucket_id):
+    token_bucket = TokenBucket(bucket_id, interval=10, burst=2)
+    os.makedirs(bucket.PATH_PREFIX, exist_ok=True)
+    with open(bucket.get_path(bucket_id), "w") as _file:
+        _file.write("{")
+
+    assert token_bucket.remaining() == 2
+
+def test_stats(bucket_id):
+    token_bucket = TokenBucket(bucket_id, interval=10)
+    with mock.patch("aiess.web.bucket.time.time", return_value=1000):
+        token_bucket.acquire()
+        token_bucket.acquire()
+        stats = token_bucket.stats()
+
+    assert stats == dict(remaining=-1, acquisitions=2, waits=1, wait_time=10)
+
+def test_get_bucket(bucket_id):
+    token_bucket = get_bucket(bucket_id, interval=10)
+    assert get_bucket(bucket_id, interval=5, burst=2) is token_bucket
+    assert token_bucket.interval == 5
+    assert token_bucket.burst == 2
+
+    with pytest.raises(ValueError):
+        TokenBucket(bucket_id, interval=10, burst=0)
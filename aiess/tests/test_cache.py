@@ -0,0 +1,120 @@
+import time
+import pytest
+import multiprocessing
+from unittest import mock
+
+from aiess.web.cache import DiskCache
+
+@pytest.fixture
+def cache():
+    cache = DiskCache("test", ttls={"/get_user": 120, "/get_user?u=1": 180}, ttl=60, size=2, purge_interval=1)
+    cache.clear()
+    return cache
+
+def put_in_other_process(key, value):
+    DiskCache("test").put(key, value)
+
+def test_get_put(cache):
+    cache.put("/get_beatmaps?s=1", [{"title": "DISCO PRINCE"}])
+
+    assert cache.get("/get_beatmaps?s=1") == [{"title": "DISCO PRINCE"}]
+    assert cache.get("/get_beatmaps?s=2") is None
+    assert cache.get("/get_beatmaps?s=2", default=False) is False
+    assert cache["/get_beatmaps?s=1"] == [{"title": "DISCO PRINCE"}]
+    assert "/get_beatmaps?s=1" in cache
+    assert "/get_beatmaps?s=2" not in cache
+    assert len(cache) == 1
+
+    with pytest.raises(KeyError):
+        cache["/get_beatmaps?s=2"]
+
+def test_get_many(cache):
+    cache.put("/get_beatmaps?s=1", 1)
+    cache.put("/get_beatmaps?s=2", None)
+
+    assert cache.get_many(["/get_beatmaps?s=1", "/get_beatmaps?s=2", "/get_beatmaps?s=3"]) == {
+        "/get_beatmaps?s=1": 1,
+        "/get_beatmaps?s=2": None
+    }
+    assert cache.get_many([]) == {}
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+def test_ttl(cache):
+    assert cache.ttl_of("/get_beatmaps?s=1") == 60
+    assert cache.ttl_of("/get_user?u=2") == 120
+    assert cache.ttl_of("/get_user?u=1") == 180
+
+    with mock.patch("aiess.web.cache.time.time", return_value=1000):
+        cache.put("/get_beatmaps?s=1", [])
+        cache.put("/get_user?u=2", [])
+
+    with mock.patch("aiess.web.cache.time.time", return_value=1061):
+        assert cache.get("/get_beatmaps?s=1") is None
+        assert cache.get("/get_user?u=2") == []
+
+    assert cache.stats()["expirations"] == 1
+
+def test_eviction(cache):
+    now = time.time()
+    with mock.patch("aiess.web.cache.time.time", side_effect=[now - 2, now - 1, now]):
+        cache.put("/get_beatmaps?s=1", 1)
+        cache.put("/get_beatmaps?s=2", 2)
+        cache.put("/get_beatmaps?s=3", 3)
+
+    assert "/get_beatmaps?s=1" not in cache
+    assert cache.get("/get_beatmaps?s=2") == 2
+    assert cache.get("/get_beatmaps?s=3") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_purge_interval(cache):
+    cache = DiskCache("test", ttl=60, size=1, purge_interval=3)
+    cache.put("/get_beatmaps?s=1", 1)
+    cache.put("/get_beatmaps?s=2", 2)
+    assert len(cache) == 2
+
+    cache.put("/get_beatmaps?s=3", 3)
+    assert len(cache) == 1
+    assert cache.get("/get_beatmaps?s=3") == 3
+    assert cache.stats()["evictions"] == 2
+
+def test_invalidate(cache):
+    cache.put("/get_beatmaps?s=1", 1)
+    cache.put("/get_user?u=1", 1)
+    cache.invalidate(["/get_beatmaps?s=1", "/get_beatmaps?s=2"])
+
+    assert "/get_beatmaps?s=1" not in cache
+    assert "/get_user?u=1" in cache
+    assert cache.stats()["invalidations"] == 1
+
+def test_invalidate_prefix(cache):
+    cache.put("/get_user?u=1", 1)
+    cache.put("/get_user_best?u=1", 1)
+    cache.invalidate_prefix("/get_user?")
+
+    assert "/get_user?u=1" not in cache
+    assert "/get_user_best?u=1" in cache
+
+def test_stats(cache):
+    cache.put("/get_beatmaps?s=1", 1)
+    cache.get("/get_beatmaps?s=1")
+    cache.get("/get_beatmaps?s=1")
+    cache.get("/get_beatmaps?s=2")
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+def test_shared_between_processes(cache):
+    process = multiprocessing.Process(target=put_in_other_process, args=("/get_user?u=2", {"username": "peppy"}))
+    process.start()
+    process.join()
+
+    assert cache.get("/get_user?u=2") == {"username": "peppy"}
+
+def test_survives_restart(cache):
+    cache.put("/get_user?u=2", {"username": "peppy"})
+
+    assert DiskCache("test").get("/get_user?u=2") == {"username": "peppy"}
@@ -0,0 +1,36 @@
+import os
+import pytest
+from contextlib import suppress
+
+from aiess import checkpoint
+
+@pytest.fixture
+def checkpoint_id():
+    _id = "test"
+    with suppress(OSError):
+        os.remove(checkpoint.get_path(_id))
+    yield _id
+    with suppress(OSError):
+        os.remove(checkpoint.get_path(_id))
+
+def test_get_missing(checkpoint_id):
+    assert checkpoint.get_last(checkpoint_id) is None
+    assert not checkpoint.exists(checkpoint_id)
+
+def test_get_set(checkpoint_id):
+    checkpoint.set_last(5, checkpoint_id)
+    assert checkpoint.exists(checkpoint_id)
+    assert checkpoint.get_last(checkpoint_id) == 5
+
+    checkpoint.set_last(12, checkpoint_id)
+    assert checkpoint.get_last(checkpoint_id) == 12
+    # Nothing is left behind from writing atomically.
+    assert not any(file_name.endswith(".tmp") for file_name in os.listdir(checkpoint.PATH_PREFIX))
+
+def test_get_empty(checkpoint_id):
+    checkpoint.set_last(5, checkpoint_id)
+    with open(checkpoint.get_path(checkpoint_id), "w"):
+        pass
+
+    with pytest.raises(ValueError):
+        checkpoint.get_last(checkpoint_id)
@@ -1,9 +1,13 @@
 import pytest
+import asyncio
+import threading
+from unittest import mock
 from mysql.connector.errors import ProgrammingError
 from datetime import datetime
 
 from aiess.objects import User, Beatmapset, Discussion, Event, NewsPost, Usergroup
-from aiess.database import Database, CachedDatabase, SCRAPER_TEST_DB_NAME
+from aiess.database import Database, AsyncDatabase, CachedDatabase, SCRAPER_TEST_DB_NAME
+from aiess.pool import HEALTH_CHECK_INTERVAL
 from aiess.common import anext
 from aiess.timestamp import from_string
 
@@ -38,10 +42,16 @@ def test_insert_delete(test_database):
     assert not test_database.retrieve_table_data("users")
 
 def test_auto_reconnect(test_database):
-    test_database.connection.close()
+    connection = test_database.pool.checkout()
+    connection.close()
+    test_database.pool.checkin(connection)
+    test_database.pool.health_check_interval = 0
     
-    test_database.insert_table_data("users", dict(id=1, name="test"))
-    assert test_database.retrieve_user("id=1")
+    try:
+        test_database.insert_table_data("users", dict(id=1, name="test"))
+        assert test_database.retrieve_user("id=1")
+    finally:
+        test_database.pool.health_check_interval = HEALTH_CHECK_INTERVAL
 
 def test_missing_table(test_database):
     with pytest.raises(ProgrammingError) as error:
@@ -353,6 +363,194 @@ async def test_insert_retrieve_multiple_events(test_database):
     assert await anext(retrieved_events, None) == event1
     assert await anext(retrieved_events, None) == event2
 
+@pytest.mark.asyncio
+async def test_insert_events(test_database):
+    user1 = User(1, name="someone")
+    user2 = User(2, name="sometwo")
+    beatmapset = Beatmapset(1, artist="123", title="456", creator=user1, modes=["osu", "taiko"], genre="genre", language="language")
+    discussion = Discussion(1, beatmapset=beatmapset, user=user2, content="testing", tab="tab", difficulty="diff")
+    newspost = NewsPost(_id=3, title="title", preview="preview", author=user2, slug="slug", image_url="image_url")
+    event1 = Event(_type="problem", time=from_string("2020-01-01 01:00:00"), beatmapset=beatmapset, discussion=discussion, user=user2)
+    event2 = Event(_type="nominate", time=from_string("2020-01-01 02:00:00"), beatmapset=beatmapset, user=user1)
+    event3 = Event(_type="news", time=from_string("2020-01-01 03:00:00"), newspost=newspost, user=user2)
+
+    test_database.insert_events([event1, event2, event3])
+
+    retrieved_events = test_database.retrieve_events("TRUE ORDER BY time")
+    assert await anext(retrieved_events, None) == event1
+    assert await anext(retrieved_events, None) == event2
+    assert await anext(retrieved_events, None) == event3
+    assert await anext(retrieved_events, None) is None
+    assert test_database.retrieve_beatmapset_modes(beatmapset.id) == ["osu", "taiko"]
+
+def test_insert_events_latest_values(test_database):
+    user_old = User(1, name="old name")
+    user_new = User(1, name="new name")
+    event1 = Event(_type="nominate", time=from_string("2020-01-01 01:00:00"), user=user_old)
+    event2 = Event(_type="nominate", time=from_string("2020-01-01 02:00:00"), user=user_new)
+
+    test_database.insert_events([event1, event2])
+
+    assert test_database.retrieve_user("id=%s", (1,)) == user_new
+
+def test_insert_events_group_changes(test_database):
+    test_database.insert_group_user(group=Usergroup(7), user=User(1, name="someone"))
+    event1 = Event(_type="remove", time=from_string("2020-01-01 01:00:00"), user=User(1, name="someone"), group=Usergroup(7))
+    event2 = Event(_type="add", time=from_string("2020-01-01 01:00:00"), user=User(2, name="sometwo"), group=Usergroup(7))
+    event3 = Event(_type="remove", time=from_string("2020-01-01 02:00:00"), user=User(2, name="sometwo"), group=Usergroup(7))
+    event4 = Event(_type="add", time=from_string("2020-01-01 03:00:00"), user=User(2, name="sometwo"), group=Usergroup(7))
+
+    test_database.insert_events([event1, event2, event3, event4])
+
+    assert list(test_database.retrieve_group_users("group_id=%s", (7,))) == [(Usergroup(7), User(2, name="sometwo"))]
+
+def test_insert_events_incomplete(test_database):
+    user = User(1, name="someone")
+    beatmapset = Beatmapset(1, artist="123", title="456", creator=user, modes=["osu"], genre="genre", language="language")
+    discussion = Discussion(1, beatmapset=beatmapset)
+    event1 = Event(_type="nominate", time=from_string("2020-01-01 01:00:00"), beatmapset=beatmapset, user=user)
+    event2 = Event(_type="disqualify", time=from_string("2020-01-01 02:00:00"), beatmapset=beatmapset, discussion=discussion)
+
+    with pytest.raises(ValueError):
+        test_database.insert_events([event1, event2])
+
+    assert not test_database.retrieve_table_data("events")
+    assert not test_database.retrieve_table_data("users")
+
+@pytest.mark.asyncio
+async def test_retrieve_events_hydrated_together(test_database):
+    user = User(1, name="test")
+    beatmapset = Beatmapset(1, artist="123", title="456", creator=user, modes=["osu", "taiko"], genre="genre", language="language")
+    discussion = Discussion(1, beatmapset=beatmapset, user=user, content="testing", tab="tab", difficulty="diff")
+    events = [
+        Event(_type="test", time=from_string(f"2020-01-01 0{hour}:00:00"), beatmapset=beatmapset, discussion=discussion, user=user)
+        for hour in range(5)
+    ]
+    for event in events:
+        test_database.insert_event(event)
+
+    with mock.patch.object(test_database, "_execute", wraps=test_database._execute) as mock_execute:
+        retrieved_events = [event async for event in test_database.retrieve_events("type=%s ORDER BY time", ("test",))]
+
+    assert retrieved_events == events
+    assert retrieved_events[0].beatmapset is retrieved_events[4].beatmapset
+    assert retrieved_events[0].discussion.beatmapset is retrieved_events[0].beatmapset
+    # Events, discussions, beatmapsets, users and modes, regardless of how many events there are.
+    assert mock_execute.call_count == 5
+
+@pytest.mark.asyncio
+async def test_retrieve_events_hydrated_fields(test_database):
+    user = User(1, name="test")
+    beatmapset = Beatmapset(1, artist="123", title="456", creator=user, modes=["osu", "taiko"], genre="genre", language="language")
+    discussion = Discussion(1, beatmapset=beatmapset, user=user, content="testing", tab="tab", difficulty="diff")
+    test_database.insert_event(
+        Event(_type="test", time=from_string("2020-01-01 00:00:00"), beatmapset=beatmapset, discussion=discussion, user=user))
+
+    with mock.patch.object(test_database, "_execute", wraps=test_database._execute) as mock_execute:
+        retrieved_events = [
+            event async for event in
+            test_database.retrieve_events("type=%s", ("test",), fields=["beatmapset", "user"])
+        ]
+
+    assert retrieved_events[0].beatmapset == beatmapset
+    assert retrieved_events[0].user == user
+    assert retrieved_events[0].discussion is None
+    # Events, beatmapsets, users and modes; no discussions.
+    assert mock_execute.call_count == 4
+
+def test_hydrate_events_unknown_field():
+    with pytest.raises(ValueError):
+        Database(SCRAPER_TEST_DB_NAME).hydrate_events([], fields=["beatmapset", "discussions"])
+
+@pytest.mark.asyncio
+async def test_retrieve_events_off_loop(test_database):
+    test_database.insert_event(Event(_type="test", time=from_string("2020-01-01 00:00:00")))
+
+    threads = []
+    def fetch_events(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return real_fetch_events(*args, **kwargs)
+
+    real_fetch_events = test_database._Database__fetch_events
+    with mock.patch.object(test_database, "_Database__fetch_events", side_effect=fetch_events):
+        retrieved_events = [event async for event in test_database.retrieve_events("type=%s", ("test",))]
+
+    assert len(retrieved_events) == 1
+    assert threads and threads[0] is not threading.main_thread()
+
+@pytest.mark.asyncio
+async def test_retrieve_events_streamed(test_database):
+    events = [Event(_type="test", time=from_string(f"2020-01-01 0{hour}:00:00")) for hour in range(5)]
+    test_database.insert_events(events)
+
+    retrieved_events = [event async for event in test_database.retrieve_events("type=%s ORDER BY time", ("test",), chunk_size=2)]
+
+    assert retrieved_events == events
+
+@pytest.mark.asyncio
+async def test_retrieve_events_streamed_early_exit(test_database):
+    events = [Event(_type="test", time=from_string(f"2020-01-01 0{hour}:00:00")) for hour in range(5)]
+    test_database.insert_events(events)
+
+    retrieved_events = test_database.retrieve_events("type=%s ORDER BY time", ("test",), chunk_size=2)
+    assert await anext(retrieved_events) == events[0]
+    await retrieved_events.aclose()
+
+    # The connection should be released, rather than holding on to the unread rows.
+    assert test_database.pool.stats()["opened"] == test_database.pool.stats()["idle"]
+    assert test_database.retrieve_table_data("events", "type=%s", ("test",), selection="COUNT(*)")[0][0] == 5
+
+def test_stream_table_data_chunks():
+    test_database = Database(SCRAPER_TEST_DB_NAME)
+    mock_connection = mock.MagicMock()
+    mock_connection.cursor.return_value.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    with mock.patch.object(test_database.pool, "checkout", return_value=mock_connection), \
+         mock.patch.object(test_database.pool, "checkin") as mock_checkin:
+        chunks = list(test_database.stream_table_data("users", selection="id", chunk_size=2))
+
+    assert chunks == [[(1,), (2,)], [(3,)]]
+    mock_connection.cursor.assert_called_with(buffered=False)
+    mock_connection.cursor.return_value.fetchmany.assert_called_with(2)
+    mock_checkin.assert_called_once_with(mock_connection)
+
+def test_stream_table_data_closed_early():
+    test_database = Database(SCRAPER_TEST_DB_NAME)
+    mock_connection = mock.MagicMock()
+    mock_connection.cursor.return_value.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    with mock.patch.object(test_database.pool, "checkout", return_value=mock_connection), \
+         mock.patch.object(test_database.pool, "discard") as mock_discard:
+        chunks = test_database.stream_table_data("users", selection="id", chunk_size=2)
+        assert next(chunks) == [(1,), (2,)]
+        chunks.close()
+
+    mock_discard.assert_called_once_with(mock_connection)
+
+@pytest.mark.asyncio
+async def test_async_database(test_database):
+    async_database = AsyncDatabase(test_database)
+    user = User(1, name="test")
+
+    await async_database.insert_user(user)
+    assert await async_database.retrieve_user("id=%s", (1,)) == user
+    assert await async_database.retrieve_users("name=%s", ("test",)) == [user]  # Generators are consumed on the worker thread.
+    assert await async_database.retrieve_table_data("users", selection="COUNT(*)") == [(1,)]
+    assert async_database.db_name == SCRAPER_TEST_DB_NAME
+
+@pytest.mark.asyncio
+async def test_async_database_concurrent(test_database):
+    async_database = AsyncDatabase(SCRAPER_TEST_DB_NAME)
+    await asyncio.gather(*(async_database.insert_user(User(_id, name="test")) for _id in range(1, 11)))
+
+    assert len(await async_database.retrieve_users("name=%s", ("test",))) == 10
+
+def test_async_database_transaction():
+    async_database = AsyncDatabase(SCRAPER_TEST_DB_NAME)
+    # Awaited calls run on any worker thread, so could not share the connection pinned by a transaction.
+    with pytest.raises(ValueError):
+        async_database.transaction()
+
 
 
 @pytest.fixture
@@ -394,4 +592,39 @@ async def test_insert_retrieve_event_cached(cached_database):
     delta_time_cached = datetime.utcnow() - start_time
 
     assert await anext(retrieved_events_uncached, None) == await anext(retrieved_events_cached, None)
-    assert delta_time_uncached > delta_time_cached
\ No newline at end of file
+    assert delta_time_uncached > delta_time_cached
+
+def test_cached_invalidated_on_write(cached_database):
+    cached_database.insert_user(User(1, name="test"))
+    assert cached_database.retrieve_user("id=%s", (1,)).name == "test"
+    assert cached_database.retrieve_user("id=%s", (1,)).name == "test"
+
+    hits = cached_database.cache.stats()["hits"]
+    assert hits >= 1
+
+    # Also through a separate uncached database object, as long as it's in the same process.
+    Database(SCRAPER_TEST_DB_NAME).insert_user(User(1, name="renamed"))
+    assert cached_database.retrieve_user("id=%s", (1,)).name == "renamed"
+
+def test_cached_invalidated_after_transaction(cached_database):
+    cached_database.insert_user(User(1, name="test"))
+    assert cached_database.retrieve_user("id=%s", (1,)).name == "test"
+
+    with cached_database.transaction():
+        cached_database.insert_user(User(1, name="renamed"))
+        # Reads within the transaction bypass the cache.
+        assert cached_database.retrieve_user("id=%s", (1,)).name == "renamed"
+
+    assert cached_database.retrieve_user("id=%s", (1,)).name == "renamed"
+
+def test_query_stats_recorded(test_database):
+    with mock.patch("aiess.database.query_stats") as mock_query_stats:
+        test_database.insert_user(User(1, name="test"))
+        test_database.retrieve_user("id=%s", (1,))
+
+    (db_name, query, values, duration, rows), _ = mock_query_stats.record.call_args
+    assert db_name == SCRAPER_TEST_DB_NAME
+    assert "SELECT id, name FROM aiess_test.users" in " ".join(query.split())
+    assert values == (1,)
+    assert duration >= 0
+    assert rows == 1
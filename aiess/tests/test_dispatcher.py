@@ -0,0 +1,148 @@
+import pytest
+import asyncio
+
+from aiess import Event
+from aiess import timestamp
+from aiess.dispatcher import Dispatcher
+
+def event(_type: str) -> Event:
+    return Event(_type=_type, time=timestamp.from_string("2020-01-01 00:00:00"))
+
+@pytest.mark.asyncio
+async def test_concurrency_bounded():
+    in_flight = []
+    max_in_flight = []
+    async def callback(event):
+        in_flight.append(event)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(event)
+
+    dispatcher = Dispatcher(callback, concurrency=3, key=lambda event: event.content)
+    for index in range(10):
+        await dispatcher.dispatch(Event(_type="test", time=timestamp.from_string("2020-01-01 00:00:00"), content=index))
+    await dispatcher.join()
+
+    assert max(max_in_flight) == 3
+    assert len(dispatcher.completed) == 10
+    assert not dispatcher.tasks
+
+@pytest.mark.asyncio
+async def test_ordered_per_key():
+    handled = []
+    async def callback(event):
+        # Earlier events take longer, so would finish last if not for the ordering.
+        await asyncio.sleep(0.03 if event.type.endswith("1") else 0.01)
+        handled.append(event.type)
+
+    dispatcher = Dispatcher(callback, concurrency=4, key=lambda event: event.type[0])
+    for _type in ["a1", "b1", "a2", "b2", "a3"]:
+        await dispatcher.dispatch(event(_type))
+    await dispatcher.join()
+
+    assert [_type for _type in handled if _type.startswith("a")] == ["a1", "a2", "a3"]
+    assert [_type for _type in handled if _type.startswith("b")] == ["b1", "b2"]
+
+@pytest.mark.asyncio
+async def test_slow_key_does_not_block_others():
+    handled = []
+    async def callback(event):
+        await asyncio.sleep(0.05 if event.type.startswith("a") else 0)
+        handled.append(event.type)
+
+    dispatcher = Dispatcher(callback, concurrency=2, key=lambda event: event.type[0])
+    # More events on the slow key than there are calls in flight, all waiting on each other.
+    for _type in ["a1", "a2", "a3", "a4", "b1"]:
+        await dispatcher.dispatch(event(_type))
+    await asyncio.sleep(0.02)
+
+    assert handled == ["b1"]
+    await dispatcher.join()
+    assert handled == ["b1", "a1", "a2", "a3", "a4"]
+
+@pytest.mark.asyncio
+async def test_backlog_bounded():
+    async def callback(event):
+        await asyncio.sleep(0.01)
+
+    dispatcher = Dispatcher(callback, concurrency=2, key=lambda event: None, backlog=3)
+    max_pending = []
+    for index in range(6):
+        await dispatcher.dispatch(event(str(index)))
+        max_pending.append(len(dispatcher.tasks))
+    await dispatcher.join()
+
+    assert max(max_pending) == 3
+    assert len(dispatcher.completed) == 6
+
+    with pytest.raises(ValueError):
+        Dispatcher(callback, concurrency=2, backlog=1)
+
+@pytest.mark.asyncio
+async def test_sequential_by_default():
+    handled = []
+    async def callback(event):
+        await asyncio.sleep(0.02 if event.type == "first" else 0)
+        handled.append(event.type)
+
+    dispatcher = Dispatcher(callback)
+    await dispatcher.dispatch(event("first"))
+    await dispatcher.dispatch(event("second"))
+    await dispatcher.join()
+
+    assert handled == ["first", "second"]
+
+@pytest.mark.asyncio
+async def test_failure():
+    handled = []
+    async def callback(event):
+        if event.type == "a1":
+            raise ValueError("failed")
+        await asyncio.sleep(0.01)
+        handled.append(event.type)
+
+    dispatcher = Dispatcher(callback, concurrency=4, key=lambda event: event.type[0])
+    await dispatcher.dispatch(event("a1"))
+    await dispatcher.dispatch(event("b1"))
+    await dispatcher.dispatch(event("a2"))
+
+    with pytest.raises(ValueError):
+        await dispatcher.join()
+
+    # Would otherwise be handled before the failed event is retried.
+    assert handled == ["b1"]
+    assert [event.type for event in dispatcher.completed] == ["b1"]
+
+    with pytest.raises(ValueError):
+        await dispatcher.dispatch(event("c1"))
+
+@pytest.mark.asyncio
+async def test_cancel():
+    async def callback(event):
+        await asyncio.sleep(10)
+
+    dispatcher = Dispatcher(callback, concurrency=2)
+    await dispatcher.dispatch(event("first"))
+    tasks = list(dispatcher.tasks)
+    await dispatcher.cancel()
+
+    assert tasks and all(task.cancelled() for task in tasks)
+    assert not dispatcher.tasks
+    assert not dispatcher.completed
+
+@pytest.mark.asyncio
+async def test_without_keeping_completed():
+    async def callback(event):
+        pass
+
+    dispatcher = Dispatcher(callback, keep_completed=False)
+    await dispatcher.dispatch(event("first"))
+    await dispatcher.dispatch(event("second"))
+    await dispatcher.join()
+
+    assert dispatcher.completed_count == 2
+    assert not dispatcher.completed
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        Dispatcher(lambda event: None, concurrency=0)
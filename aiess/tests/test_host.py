@@ -0,0 +1,147 @@
+import pytest
+from unittest import mock
+
+import aiess
+from aiess import Event
+from aiess import timestamp
+from aiess import checkpoint
+from aiess.database import SCRAPER_TEST_DB_NAME
+from aiess.host import ReaderHost, load_reader, union
+
+class Reader(aiess.Reader):
+    def __init__(self, reader_id: str, fail_id: int=None, event_types: list=None):
+        super().__init__(reader_id, db_name=SCRAPER_TEST_DB_NAME)
+        self.fail_id = fail_id
+        self.event_types = event_types
+        self.received = []
+        self.last_id = 0
+
+    async def on_event(self, event: Event):
+        if event.id == self.fail_id:
+            raise ValueError("failed")
+        self.received.append(event.id)
+
+def events(*types):
+    return [
+        Event(_type=_type, time=timestamp.from_string("2020-01-01 00:00:00"), _id=_id)
+        for _id, _type in enumerate(types, start=1)
+    ]
+
+def mock_events_after(host, events, reads):
+    async def events_after(last_id, limit=None, until_id=None, event_types=None, event_fields=None):
+        reads.append(last_id)
+        async def generator():
+            for event in [
+                event for event in events
+                if event.id > last_id and (until_id is None or event.id <= until_id) and
+                (event_types is None or event.type in event_types)
+            ][:limit]:
+                yield event
+        return generator()
+    return mock.patch.object(host, "events_after", side_effect=events_after)
+
+@pytest.fixture
+def host():
+    return ReaderHost("test", db_name=SCRAPER_TEST_DB_NAME)
+
+def test_register(host):
+    host.register(Reader("test-host-1"))
+    with pytest.raises(ValueError):
+        host.register(Reader("test-host-1"))
+
+    running_reader = Reader("test-host-2")
+    running_reader.running = True
+    with pytest.raises(ValueError):
+        host.register(running_reader)
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_shared(host):
+    reader1 = Reader("test-host-1")
+    reader2 = Reader("test-host-2")
+    host.register(reader1)
+    host.register(reader2)
+
+    reads = []
+    with mock_events_after(host, events("nominate", "qualify", "news"), reads):
+        await host._ReaderHost__push_all_new_events()
+
+    assert reads == [0]  # Read once for both.
+    assert reader1.received == [1, 2, 3]
+    assert reader2.received == [1, 2, 3]
+    assert checkpoint.get_last(reader1._Reader__checkpoint_id()) == 3
+    assert checkpoint.get_last(reader2._Reader__checkpoint_id()) == 3
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_types(host):
+    reader = Reader("test-host-1", event_types=["qualify"])
+    host.register(reader)
+
+    reads = []
+    with mock_events_after(host, events("nominate", "qualify", "nominate"), reads):
+        with mock.patch("aiess.reader.latest_id", return_value=3):
+            await host._ReaderHost__push_all_new_events()
+
+    assert reads == [0]
+    assert reader.received == [2]
+    # Caught up to the latest event, even though it is not of a type the reader handles.
+    assert reader.last_id == 3
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_types_union(host):
+    reader1 = Reader("test-host-1", event_types=["qualify"])
+    reader2 = Reader("test-host-2", event_types=["news"])
+    host.register(reader1)
+    host.register(reader2)
+
+    reads = []
+    with mock_events_after(host, events("nominate", "qualify", "news"), reads) as events_after:
+        with mock.patch("aiess.reader.latest_id", return_value=3):
+            await host._ReaderHost__push_all_new_events()
+
+    # Read once, for the types of either reader.
+    events_after.assert_called_once_with(0, mock.ANY, 3, ["news", "qualify"], None)
+    assert reader1.received == [2]
+    assert reader2.received == [3]
+    assert reader1.last_id == 3
+    assert reader2.last_id == 3
+
+def test_union():
+    assert union([["qualify"], ["news", "qualify"]]) == ["news", "qualify"]
+    assert union([["qualify"], None]) is None
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_failure_isolated(host):
+    failing_reader = Reader("test-host-1", fail_id=2)
+    reader = Reader("test-host-2")
+    host.register(failing_reader)
+    host.register(reader)
+
+    all_events = events("nominate", "qualify", "nominate", "qualify")
+    reads = []
+    with mock_events_after(host, all_events[:3], reads):
+        await host._ReaderHost__push_all_new_events()
+
+    assert failing_reader.received == [1]
+    assert failing_reader.last_id == 1
+    assert reader.received == [1, 2, 3]
+
+    # Waiting to be retried, so the other reader carries on without it.
+    with mock_events_after(host, all_events, reads):
+        await host._ReaderHost__push_all_new_events()
+
+    assert failing_reader.received == [1]
+    assert reader.received == [1, 2, 3, 4]
+
+    # Once retried, catches up on its own.
+    failing_reader.fail_id = None
+    with mock.patch("aiess.host.perf_counter", return_value=float("inf")):
+        with mock_events_after(host, all_events, reads):
+            await host._ReaderHost__push_all_new_events()
+
+    assert failing_reader.received == [1, 2, 3, 4]
+    assert reader.received == [1, 2, 3, 4]
+    assert reads == [0, 3, 1, 4]
+
+def test_load_reader():
+    with pytest.raises(ValueError):
+        load_reader("aiess.host:RETRY_DELAY")
@@ -0,0 +1,112 @@
+import time
+import pytest
+from unittest import mock
+from datetime import datetime, timezone
+
+from aiess.hydrator import BeatmapsetHydrator
+from aiess.objects import Beatmapset, User
+from aiess.registry import registry
+from aiess.database import Database, SCRAPER_TEST_DB_NAME
+from aiess import event_types as types
+
+def beatmapset(_id: int, genre: str="Electronic") -> Beatmapset:
+    return Beatmapset(_id, "artist", "title", User(2, "peppy"), ["osu"], genre, "English")
+
+@pytest.fixture
+def database():
+    database = mock.Mock()
+    database.retrieve_beatmapsets.return_value = [beatmapset(1)]
+    return database
+
+@pytest.fixture
+def hydrator(database):
+    hydrator = BeatmapsetHydrator(ttl=60)
+    hydrator.refresh_times.clear()
+    hydrator.use_database(database)
+    return hydrator
+
+def test_get_refreshes_from_api(hydrator, database):
+    with mock.patch("aiess.hydrator.registry.beatmapset", return_value=beatmapset(1)) as mock_beatmapset:
+        assert hydrator.get(1).genre == "Electronic"
+        assert hydrator.get(1).genre == "Electronic"
+
+    # Not fresh in the database, as it was never refreshed from the api.
+    database.retrieve_beatmapsets.assert_not_called()
+    mock_beatmapset.assert_called_once_with(1)
+    assert hydrator.stats()["api_refreshes"] == 1
+    assert hydrator.stats()["memory_hits"] == 1
+
+def test_get_from_database(hydrator, database):
+    hydrator.refresh_times.put("1", time.time())
+    with mock.patch("aiess.hydrator.registry.beatmapset") as mock_beatmapset:
+        assert hydrator.get(1).genre == "Electronic"
+        mock_beatmapset.assert_not_called()
+
+    assert database.retrieve_beatmapsets.call_args[1]["where_values"] == (1,)
+    assert hydrator.stats()["database_hits"] == 1
+
+def test_prefetch(hydrator, database):
+    hydrator.refresh_times.put("1", time.time())
+    hydrator.refresh_times.put("3", time.time())
+    with mock.patch.object(hydrator.refresh_times, "get_many", wraps=hydrator.refresh_times.get_many) as mock_get_many:
+        hydrator.prefetch([1, 2, 3, None])
+        mock_get_many.assert_called_once()
+
+    database.retrieve_beatmapsets.assert_called_once_with(where="id IN (%s, %s)", where_values=(1, 3))
+    assert list(hydrator.entries) == [1]
+
+def test_stale(hydrator):
+    with mock.patch("aiess.hydrator.registry.beatmapset", return_value=beatmapset(1)):
+        hydrator.get(1)
+
+    with mock.patch("aiess.hydrator.time.time", return_value=time.time() + 61):
+        with mock.patch("aiess.hydrator.registry.beatmapset", return_value=beatmapset(1, genre="Rock")):
+            assert hydrator.get(1).genre == "Rock"
+
+    assert hydrator.stats()["api_refreshes"] == 2
+
+def test_invalidate(hydrator):
+    with mock.patch("aiess.hydrator.registry.beatmapset", return_value=beatmapset(1)):
+        hydrator.get(1)
+
+    with mock.patch("aiess.hydrator.api.cache") as mock_cache:
+        hydrator.invalidate(1)
+        mock_cache.invalidate.assert_called_once_with(["/get_beatmaps?s=1"])
+
+    assert not hydrator.entries
+    assert hydrator.refresh_times.get("1") is None
+
+def test_size(database):
+    hydrator = BeatmapsetHydrator(size=1)
+    hydrator.refresh_times.clear()
+    with mock.patch("aiess.hydrator.registry.beatmapset", side_effect=[beatmapset(1), beatmapset(2)]):
+        hydrator.get(1)
+        hydrator.get(2)
+
+    assert list(hydrator.entries) == [2]
+
+def test_real_database():
+    database = Database(SCRAPER_TEST_DB_NAME)
+    database.clear_table_data("beatmapsets")
+    database.insert_beatmapset(beatmapset(1))
+    registry.clear()
+
+    hydrator = BeatmapsetHydrator()
+    hydrator.use_database(database)
+    hydrator.refresh_times.put("1", time.time())
+
+    assert hydrator.get(1) == beatmapset(1)
+
+def test_invalidate_by_event(hydrator):
+    hydrator.refresh_times.put("1", datetime(2020, 1, 1, 12, 0, 0).replace(tzinfo=timezone.utc).timestamp())
+
+    with mock.patch.object(hydrator, "invalidate") as mock_invalidate:
+        # Seen before the last refresh, e.g. on an earlier pass.
+        assert not hydrator.invalidate_by_event(types.GENRE_EDIT, 1, datetime(2020, 1, 1, 11, 0, 0))
+        # Does not change any metadata.
+        assert not hydrator.invalidate_by_event(types.NOMINATE, 1, datetime(2020, 1, 1, 13, 0, 0))
+        mock_invalidate.assert_not_called()
+
+        assert hydrator.invalidate_by_event(types.GENRE_EDIT, 1, datetime(2020, 1, 1, 13, 0, 0))
+        assert hydrator.invalidate_by_event(types.RANK, 2, datetime(2020, 1, 1, 11, 0, 0))  # Never refreshed.
+        assert mock_invalidate.call_args_list == [mock.call(1), mock.call(2)]
@@ -0,0 +1,59 @@
+import pytest
+from unittest import mock
+
+from aiess.database import Database, SCRAPER_TEST_DB_NAME
+from aiess.migrations import Migration, Index, MIGRATIONS, MIGRATIONS_TABLE
+from aiess.migrations import migrate, pending_migrations, applied_versions, explain, format_plan
+
+@pytest.fixture
+def test_database():
+    database = Database(SCRAPER_TEST_DB_NAME)
+    database._execute(f"DROP TABLE IF EXISTS {SCRAPER_TEST_DB_NAME}.{MIGRATIONS_TABLE}")
+    return database
+
+def test_pending_migrations_in_order():
+    migrations = [Migration(3, "c", []), Migration(1, "a", []), Migration(2, "b", [])]
+    with mock.patch("aiess.migrations.applied_versions", return_value=[1]):
+        pending = pending_migrations(database=None, migrations=migrations)
+
+    assert [migration.version for migration in pending] == [2, 3]
+
+def test_migration_versions_unique():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert len(versions) == len(set(versions))
+
+def test_format_plan():
+    plan = [{"table": "events", "type": "ref", "key": "events_type_time_idx", "rows": 5, "Extra": "Backward index scan"}]
+    assert format_plan(plan) == "events: ref using events_type_time_idx, ~5 rows (Backward index scan)"
+
+def test_format_plan_no_index():
+    plan = [{"table": "events", "type": "ALL", "key": None, "rows": 1000, "Extra": None}]
+    assert format_plan(plan) == "events: ALL using no index, ~1000 rows"
+
+def test_migrate(test_database):
+    applied = migrate(SCRAPER_TEST_DB_NAME)
+
+    assert [migration.version for migration in applied] == [migration.version for migration in MIGRATIONS]
+    assert applied_versions(test_database) == [migration.version for migration in MIGRATIONS]
+    for migration in MIGRATIONS:
+        for step in migration.steps:
+            if isinstance(step, Index):
+                assert step.exists(test_database)
+
+def test_migrate_idempotent(test_database):
+    migrate(SCRAPER_TEST_DB_NAME)
+    assert not migrate(SCRAPER_TEST_DB_NAME)
+
+def test_migrate_sql_step(test_database):
+    migration = Migration(1000, "test", ["SELECT 1 FROM %(db_name)s.events"])
+    migrate(SCRAPER_TEST_DB_NAME, migrations=[migration])
+
+    assert applied_versions(test_database) == [1000]
+
+def test_explain_uses_index(test_database):
+    migrate(SCRAPER_TEST_DB_NAME)
+    plan = explain(test_database, f"SELECT id FROM {SCRAPER_TEST_DB_NAME}.events WHERE beatmapset_id=%s ORDER BY time DESC", (1,))
+
+    assert plan[0]["table"] == "events"
+    # Which key is actually used depends on the data, but the index should at least be considered.
+    assert "events_beatmapset_id_time_idx" in plan[0]["possible_keys"]
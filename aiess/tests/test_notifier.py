@@ -0,0 +1,63 @@
+import pytest
+import os
+import socket
+import asyncio
+from unittest import mock
+
+from aiess import notifier
+from aiess.timestamp import from_string
+
+pytestmark = pytest.mark.skipif(not notifier.is_supported(), reason="Requires unix domain sockets.")
+
+@pytest.fixture
+def listener():
+    temp_listener = notifier.Listener("test")
+    assert temp_listener.open()
+    yield temp_listener
+    temp_listener.close()
+
+@pytest.mark.asyncio
+async def test_publish_wakes_listener(listener):
+    assert notifier.publish(from_string("2020-01-01 00:00:00"), count=3) >= 1
+    assert await listener.wait(timeout=1)
+
+@pytest.mark.asyncio
+async def test_wait_timeout(listener):
+    assert not await listener.wait(timeout=0.01)
+
+@pytest.mark.asyncio
+async def test_notifications_drained(listener):
+    notifier.publish(from_string("2020-01-01 00:00:00"))
+    notifier.publish(from_string("2020-01-01 00:00:01"))
+
+    assert await listener.wait(timeout=1)
+    assert not await listener.wait(timeout=0.01)  # Both were consumed by the first wake up.
+
+def test_publish_removes_stale_socket(listener):
+    stale_path = notifier.PATH_PREFIX + "stale" + notifier.SOCKET_POSTFIX
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale_socket.bind(stale_path)
+    stale_socket.close()  # Bound file remains, but no one is listening anymore.
+
+    notifier.publish(from_string("2020-01-01 00:00:00"))
+
+    assert not os.path.exists(stale_path)
+    assert os.path.exists(listener.path)
+
+def test_close_removes_socket():
+    temp_listener = notifier.Listener("test-close")
+    temp_listener.open()
+    temp_listener.close()
+
+    assert not os.path.exists(temp_listener.path)
+
+@pytest.mark.asyncio
+async def test_fallback_when_unsupported():
+    with mock.patch("aiess.notifier.is_supported", return_value=False):
+        temp_listener = notifier.Listener("test-unsupported")
+        assert not temp_listener.open()
+        assert notifier.publish(from_string("2020-01-01 00:00:00")) == 0
+
+    with mock.patch("asyncio.sleep") as mock_sleep:
+        assert not await temp_listener.wait(timeout=10)
+        mock_sleep.assert_called_once_with(10)
@@ -0,0 +1,74 @@
+import pytest
+import threading
+import time
+
+from aiess.database import Database, SCRAPER_TEST_DB_NAME
+from aiess.pool import ConnectionPool, get_pool
+
+@pytest.fixture
+def pool():
+    return ConnectionPool(SCRAPER_TEST_DB_NAME, size=1)
+
+def test_shared_across_databases():
+    assert Database(SCRAPER_TEST_DB_NAME).pool is Database(SCRAPER_TEST_DB_NAME).pool
+    assert Database(SCRAPER_TEST_DB_NAME).pool is get_pool(SCRAPER_TEST_DB_NAME)
+
+def test_reuse_connection(pool):
+    with pool.connection() as connection1:
+        pass
+    with pool.connection() as connection2:
+        pass
+
+    assert connection1 is connection2
+    assert pool.stats()["opened"] == 1
+    assert pool.stats()["checkouts"] == 2
+    assert pool.stats()["waits"] == 0
+
+def test_wait_for_connection(pool):
+    connection = pool.checkout()
+    thread = threading.Thread(target=lambda: pool.checkin(pool.checkout()))
+    thread.start()
+    time.sleep(0.1)
+
+    # The thread cannot open a second connection, so it has to wait for this one.
+    pool.checkin(connection)
+    thread.join()
+
+    assert pool.stats()["opened"] == 1
+    assert pool.stats()["waits"] == 1
+
+def test_checkout_timeout(pool):
+    pool.checkout_timeout = 0.1
+    pool.checkout()
+
+    with pytest.raises(ValueError) as error:
+        pool.checkout()
+    assert "Timed out" in str(error.value)
+
+def test_health_check(pool):
+    pool.health_check_interval = 0
+    connection = pool.checkout()
+    connection.close()
+    pool.checkin(connection)
+
+    with pool.connection() as connection:
+        connection.ping()
+
+    assert pool.stats()["reconnects"] == 1
+
+def test_discard_broken(pool):
+    with pytest.raises(Exception):
+        with pool.connection() as connection:
+            connection.close()
+            connection.cursor().execute("SELECT 1")
+
+    assert pool.stats()["opened"] == 0
+    assert pool.stats()["idle"] == 0
+
+def test_close(pool):
+    with pool.connection():
+        pass
+    pool.close()
+
+    assert pool.stats()["opened"] == 0
+    assert pool.stats()["idle"] == 0
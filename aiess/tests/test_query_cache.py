@@ -0,0 +1,62 @@
+import pytest
+from unittest import mock
+
+from aiess.query_cache import QueryCache, is_write, tables_in, get_query_cache
+
+@pytest.fixture
+def cache():
+    return QueryCache(size=2, ttl=60)
+
+def test_is_write():
+    assert is_write("INSERT INTO aiess.users (id) VALUES (%s)")
+    assert is_write("\n    DELETE IGNORE FROM aiess.users WHERE TRUE")
+    assert is_write("TRUNCATE aiess.events")
+    assert not is_write("SELECT * FROM aiess.users")
+    assert not is_write("SET FOREIGN_KEY_CHECKS = 0")
+
+def test_tables_in():
+    assert tables_in("SELECT * FROM aiess.events LEFT JOIN aiess.users AS user ON events.user_id=user.id") == {"events", "users"}
+    assert tables_in("INSERT INTO aiess.users (id) VALUES (%s) ON DUPLICATE KEY UPDATE id=VALUES(id)") == {"users"}
+    assert tables_in("SELECT id FROM aiess.events WHERE user_id IN (SELECT id FROM users)") == {"events", "users"}
+
+def test_get_put(cache):
+    cache.put("SELECT * FROM aiess.users WHERE id=%s", (1,), [(1, "test")])
+
+    assert cache.get("SELECT * FROM aiess.users WHERE id=%s", (1,)) == [(1, "test")]
+    assert cache.get("SELECT * FROM aiess.users WHERE id=%s", (2,)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_lru_eviction(cache):
+    cache.put("SELECT 1 FROM aiess.users", None, [(1,)])
+    cache.put("SELECT 2 FROM aiess.users", None, [(2,)])
+    cache.get("SELECT 1 FROM aiess.users")  # Most recently used, so the other goes first.
+    cache.put("SELECT 3 FROM aiess.users", None, [(3,)])
+
+    assert cache.get("SELECT 1 FROM aiess.users") == [(1,)]
+    assert cache.get("SELECT 2 FROM aiess.users") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry(cache):
+    with mock.patch("aiess.query_cache.perf_counter", return_value=100):
+        cache.put("SELECT * FROM aiess.users", None, [(1,)])
+    with mock.patch("aiess.query_cache.perf_counter", return_value=150):
+        assert cache.get("SELECT * FROM aiess.users") == [(1,)]
+    with mock.patch("aiess.query_cache.perf_counter", return_value=161):
+        assert cache.get("SELECT * FROM aiess.users") is None
+
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+def test_invalidate(cache):
+    cache.put("SELECT * FROM aiess.events LEFT JOIN aiess.users AS user ON TRUE", None, [(1,)])
+    cache.put("SELECT * FROM aiess.beatmapsets", None, [(2,)])
+    cache.invalidate(["users"])
+
+    assert cache.get("SELECT * FROM aiess.events LEFT JOIN aiess.users AS user ON TRUE") is None
+    assert cache.get("SELECT * FROM aiess.beatmapsets") == [(2,)]
+    assert cache.stats()["invalidations"] == 1
+
+def test_shared_per_database():
+    assert get_query_cache("test") is get_query_cache("test")
+    assert get_query_cache("test") is not get_query_cache("other")
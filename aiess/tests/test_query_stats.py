@@ -0,0 +1,54 @@
+import pytest
+from unittest import mock
+
+from aiess.query_stats import QueryStats, shape_of
+
+@pytest.fixture
+def stats():
+    return QueryStats(slow_threshold=1.0)
+
+def test_shape_of_placeholders():
+    assert shape_of("SELECT * FROM aiess.users\n    WHERE id=%s AND name=%(name)s") == "SELECT * FROM aiess.users WHERE id=? AND name=?"
+
+def test_shape_of_literals():
+    assert shape_of("SELECT * FROM aiess_test.events WHERE type=\"news\" AND time >= NOW() - INTERVAL 24 HOUR LIMIT 1") == \
+        "SELECT * FROM aiess_test.events WHERE type=? AND time >= NOW() - INTERVAL ? HOUR LIMIT ?"
+
+def test_shape_of_lists():
+    assert shape_of("SELECT id FROM aiess.users WHERE id IN (%s, %s, %s)") == shape_of("SELECT id FROM aiess.users WHERE id IN (%s)")
+    assert shape_of("INSERT INTO aiess.users (id, name) VALUES (%s, %s), (%s, %s)") == "INSERT INTO aiess.users (id, name) VALUES (?+)+"
+
+def test_record_grouped_by_shape(stats):
+    stats.record("aiess", "SELECT * FROM aiess.users WHERE id=%s", (1,), duration=0.002, rows=1)
+    stats.record("aiess", "SELECT * FROM aiess.users WHERE id=%s", (2,), duration=0.2, rows=0)
+    stats.record("aiess", "SELECT * FROM aiess.events", None, duration=0.001, rows=100)
+
+    shape_stats = stats.stats()
+    assert len(shape_stats) == 2
+    assert shape_stats[0]["shape"] == "SELECT * FROM aiess.users WHERE id=?"  # Most total time first.
+    assert shape_stats[0]["count"] == 2
+    assert shape_stats[0]["rows"] == 1
+    assert shape_stats[0]["max_time"] == 0.2
+    assert shape_stats[0]["mean_time"] == pytest.approx(0.101)
+    assert shape_stats[0]["histogram"][0.005] == 1
+    assert shape_stats[0]["histogram"][0.5] == 1
+    assert shape_stats[1]["rows"] == 100
+
+def test_slow_query_logged(stats):
+    with mock.patch("aiess.query_stats.log") as mock_log:
+        stats.record("aiess", "SELECT * FROM aiess.users WHERE id=%s", (1,), duration=0.5, rows=1)
+        mock_log.assert_not_called()
+
+        stats.record("aiess", "SELECT * FROM aiess.users WHERE id=%s", (1,), duration=2.5, rows=1)
+        mock_log.assert_called_once()
+        assert "SELECT * FROM aiess.users WHERE id=?" in mock_log.call_args[0][0]
+        assert mock_log.call_args[1]["postfix"] == "-slow-queries"
+
+def test_slowest_bucket(stats):
+    stats.record("aiess", "SELECT 1", None, duration=60, rows=1)
+    assert stats.stats()[0]["histogram"][float("inf")] == 1
+
+def test_clear(stats):
+    stats.record("aiess", "SELECT 1", None, duration=0.1, rows=1)
+    stats.clear()
+    assert not stats.stats()
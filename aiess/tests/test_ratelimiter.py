@@ -0,0 +1,78 @@
+import pytest
+import threading
+import requests
+from unittest import mock
+
+from aiess.web import ratelimiter
+from aiess.web.ratelimiter import try_request, get_session, is_iuam, run_in_executor
+from aiess.web.bucket import TokenBucket
+
+def response(text: str, content_type: str, status_code: int=200) -> requests.Response:
+    response = requests.Response()
+    response._content = text.encode()
+    response.status_code = status_code
+    response.headers["Content-Type"] = content_type
+    return response
+
+def test_get_session():
+    session = get_session("https://osu.ppy.sh/beatmapsets/events")
+    assert get_session("https://osu.ppy.sh/api/get_user?u=2") is session
+    assert get_session("https://bn.mappersguild.com/interOp/users/2") is not session
+
+def test_try_request_timeout():
+    with mock.patch.object(requests.Session, "get", return_value=response("[]", "application/json")) as mock_get:
+        assert try_request("https://osu.ppy.sh/api/get_user?u=2").text == "[]"
+        assert mock_get.call_args[1]["timeout"] == ratelimiter.TIMEOUT
+
+    with mock.patch.object(requests.Session, "get", side_effect=requests.exceptions.ReadTimeout):
+        assert try_request("https://osu.ppy.sh/api/get_user?u=2") is None
+
+def test_try_request_iuam():
+    iuam_html = "<html><title>Just a moment...</title></html>"
+    with mock.patch.object(requests.Session, "get", return_value=response(iuam_html, "text/html; charset=UTF-8")):
+        assert try_request("https://osu.ppy.sh/beatmapsets/events") is None
+
+def test_is_iuam_html_only():
+    # e.g. a discussion quoting the page title.
+    assert not is_iuam(response("{\"message\": \"<title>Just a moment...</title>\"}", "application/json"))
+    assert is_iuam(response("<title>Just a moment...</title>", "text/html"))
+    assert not is_iuam(response("<title>osu!</title>", "text/html"))
+
+@pytest.mark.asyncio
+async def test_run_in_executor():
+    assert await run_in_executor(threading.current_thread) is not threading.main_thread()
+
+@pytest.mark.asyncio
+async def test_request_with_rate_limit_async():
+    responses = [None, response("[]", "application/json", status_code=503), response("[]", "application/json")]
+    threads = []
+    def try_request(request_url, **kwargs):
+        threads.append(threading.current_thread())
+        return responses.pop(0)
+
+    with mock.patch("aiess.web.ratelimiter.try_request", side_effect=try_request):
+        with mock.patch.object(TokenBucket, "back_off") as mock_back_off:
+            result = await ratelimiter.request_with_rate_limit_async("https://osu.ppy.sh/api/get_user?u=2", 0, "test")
+
+    # Retried until valid, backing off after each failed attempt, none of which were made on the event loop.
+    assert result.status_code == 200
+    assert mock_back_off.call_count == 2
+    assert threads and threading.main_thread() not in threads
+
+@pytest.mark.asyncio
+async def test_request_with_rate_limit_async_bucket_off_loop():
+    responses = [None, response("[]", "application/json")]
+    threads = []
+    def record_thread(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return 0
+
+    with mock.patch("aiess.web.ratelimiter.try_request", side_effect=lambda *args, **kwargs: responses.pop(0)):
+        with mock.patch.object(TokenBucket, "acquire", side_effect=record_thread), \
+             mock.patch.object(TokenBucket, "back_off", side_effect=record_thread), \
+             mock.patch.object(TokenBucket, "succeed", side_effect=record_thread):
+            await ratelimiter.request_with_rate_limit_async("https://osu.ppy.sh/api/get_user?u=2", 0, "test")
+
+    # The bucket waits for any other process holding its file lock, so should not block the event loop either.
+    assert len(threads) == 4  # acquire, back_off, acquire, succeed
+    assert threading.main_thread() not in threads
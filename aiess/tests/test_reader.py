@@ -1,12 +1,19 @@
+import os
 import pytest
+import asyncio
+from unittest import mock
+from contextlib import suppress
 
 import aiess
 from aiess import Event, Beatmapset, User
 from aiess import timestamp
+from aiess import checkpoint
+from aiess import notifier
 from aiess.database import SCRAPER_TEST_DB_NAME
 from aiess.reader import merge_concurrent
+from aiess.benchmarks.merge_concurrent import merge_concurrent_quadratic, synthetic_events
 from aiess.common import anext
-from aiess.reader import Scope
+from aiess.reader import Scope, SCOPES, events_after_where
 
 received_events = []
 received_event_batches = []
@@ -30,16 +37,24 @@ def reader():
 
     temp_reader = Reader("test")
     temp_reader.database.clear_table_data("events")
+    with suppress(OSError):
+        os.remove(checkpoint.get_path(temp_reader._Reader__checkpoint_id()))
+    for scope in SCOPES:
+        with suppress(OSError):
+            os.remove(timestamp.get_path(temp_reader._Reader__time_id(scope)))
     return temp_reader
 
+def insert_events(reader, *events):
+    for event in events:
+        reader.database.insert_event(event)
+
 @pytest.mark.asyncio
-async def test_file_created(reader):
-    scope = Scope("any")
-    expected_id = reader._Reader__time_id(scope)
-    await reader._Reader__push_new_events(scope)
+async def test_checkpoint_created(reader):
+    expected_id = reader._Reader__checkpoint_id()
+    await reader._Reader__push_all_new_events()
 
     assert "test" in expected_id
-    assert timestamp.exists(expected_id)
+    assert checkpoint.exists(expected_id)
 
 @pytest.mark.asyncio
 async def test_push_all_new_events(reader):
@@ -49,22 +64,107 @@ async def test_push_all_new_events(reader):
     event4 = Event(_type="qualify",  time=timestamp.from_string("2020-01-01 04:00:00"))
     event5 = Event(_type="news",     time=timestamp.from_string("2020-01-01 05:00:00"))
 
-    reader.database.insert_event(event1)
-    reader.database.insert_event(event2)
-    reader.database.insert_event(event3)
-    reader.database.insert_event(event4)
-    reader.database.insert_event(event5)
+    checkpoint.set_last(0, reader._Reader__checkpoint_id())
+    insert_events(reader, event1, event2, event3, event4, event5)
+    await reader._Reader__push_all_new_events()
 
-    mapset_scope = Scope("mapset", None)
-    news_scope = Scope("news", None)
+    # Read in a single batch, delivered scope by scope.
+    assert received_events == [event1, event3, event4, event2, event5]
+    assert len(received_event_batches) == 1
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == reader._Reader__max_id()
+    assert reader.latest_event_time == timestamp.from_string("2020-01-01 05:00:00")
 
-    timestamp.set_last(new_datetime=timestamp.from_string("2020-01-01 00:00:00"), _id=reader._Reader__time_id(mapset_scope))
-    timestamp.set_last(new_datetime=timestamp.from_string("2020-01-01 00:00:00"), _id=reader._Reader__time_id(news_scope))
+@pytest.mark.asyncio
+async def test_push_all_new_events_batches(reader):
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 01:00:00"))
+    event2 = Event(_type="news",     time=timestamp.from_string("2020-01-01 02:00:00"))
+    event3 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 03:00:00"))
+    event4 = Event(_type="qualify",  time=timestamp.from_string("2020-01-01 04:00:00"))
+    event5 = Event(_type="news",     time=timestamp.from_string("2020-01-01 05:00:00"))
+
+    checkpoint.set_last(0, reader._Reader__checkpoint_id())
+    insert_events(reader, event1, event2, event3, event4, event5)
+    with mock.patch("aiess.reader.BATCH_SIZE", 2):
+        await reader._Reader__push_all_new_events()
+
+    assert received_events == [event1, event2, event3, event4, event5]
+    assert len(received_event_batches) == 3
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == reader._Reader__max_id()
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_inserted_late(reader):
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 05:00:00"))
+    event2 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 04:00:00"))
+
+    checkpoint.set_last(0, reader._Reader__checkpoint_id())
+    insert_events(reader, event1)
+    await reader._Reader__push_all_new_events()
+    # Older than the last event read, but inserted after it (e.g. the scraper caught up on something).
+    insert_events(reader, event2)
     await reader._Reader__push_all_new_events()
 
-    assert received_events == [event1, event3, event4, event2, event5]
-    assert timestamp.get_last(reader._Reader__time_id(mapset_scope)) == timestamp.from_string("2020-01-01 04:00:00")
-    assert timestamp.get_last(reader._Reader__time_id(news_scope)) == timestamp.from_string("2020-01-01 05:00:00")
+    assert received_events == [event1, event2]
+    assert len(received_event_batches) == 2
+    assert reader.latest_event_time == timestamp.from_string("2020-01-01 05:00:00")
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_without_checkpoint(reader):
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 05:00:00"))
+    event2 = Event(_type="qualify",  time=timestamp.from_string("2020-01-01 06:00:00"))
+
+    insert_events(reader, event1)
+    await reader._Reader__push_all_new_events()
+    insert_events(reader, event2)
+    await reader._Reader__push_all_new_events()
+
+    # Starts from the latest event on first run, same as if the reader was started right before `event2`.
+    assert received_events == [event2]
+
+@pytest.mark.asyncio
+async def test_push_all_new_events_upgrade_from_time_files(reader):
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 01:00:00"))
+    event2 = Event(_type="news",     time=timestamp.from_string("2020-01-01 02:00:00"))
+    event3 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 03:00:00"))
+
+    insert_events(reader, event1, event2, event3)
+    timestamp.set_last(timestamp.from_string("2020-01-01 02:00:00"), reader._Reader__time_id(SCOPES[0]))
+    timestamp.set_last(timestamp.from_string("2020-01-01 01:00:00"), reader._Reader__time_id(SCOPES[1]))
+    timestamp.set_last(timestamp.from_string("2020-01-01 03:00:00"), reader._Reader__time_id(SCOPES[2]))
+    await reader._Reader__push_all_new_events()
+
+    # Only what the former time-based reader had not read yet.
+    assert received_events == [event3, event2]
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == reader._Reader__max_id()
+    assert not any(timestamp.exists(reader._Reader__time_id(scope)) for scope in SCOPES)
+
+@pytest.mark.asyncio
+async def test_on_event_batch_without_events(reader):
+    await reader._Reader__push_all_new_events()
+    await reader._Reader__push_all_new_events()
+
+    assert not received_events
+    assert len(received_event_batches) == 2
+
+@pytest.mark.asyncio
+async def test_events_after(reader):
+    event1 = Event(_type="test", time=timestamp.from_string("2020-01-01 05:00:00"))
+    event2 = Event(_type="test", time=timestamp.from_string("2020-01-01 03:00:00"))
+    event3 = Event(_type="test", time=timestamp.from_string("2020-01-01 07:00:00"))
+
+    insert_events(reader, event1, event2, event3)
+    first_id = reader._Reader__max_id() - 2
+
+    all_events = await reader.events_after(first_id - 1)
+    assert await anext(all_events, None) == event1
+    assert await anext(all_events, None) == event2
+    assert await anext(all_events, None) == event3
+    assert await anext(all_events, None) is None
+
+    latter_events = await reader.events_after(first_id, limit=1)
+    latter_event = await anext(latter_events, None)
+    assert latter_event == event2
+    assert latter_event.id == first_id + 1
+    assert await anext(latter_events, None) is None
 
 @pytest.mark.asyncio
 async def test_events_between(reader):
@@ -100,61 +200,268 @@ async def test_events_between_greater_than(reader):
     assert await anext(events, None) == event2
     assert await anext(events, None) is None
 
+def mock_events_after(events, reads=None):
+    async def events_after(last_id, limit=None, until_id=None):
+        if reads is not None:
+            reads.append(last_id)
+        async def generator():
+            for event in [
+                event for event in events
+                if event.id > last_id and (until_id is None or event.id <= until_id)
+            ][:limit]:
+                yield event
+        return generator()
+    return events_after
+
+def mock_retrieve_events(events):
+    # Replay chunks end with the id to read after and the limit, see `Reader.replay`.
+    calls = []
+    async def retrieve_events(where, where_values=None, chunk_size=None, fields=None):
+        last_id, limit = where_values[-2:]
+        calls.append((last_id, limit, chunk_size))
+        for event in [event for event in events if event.id > last_id][:limit]:
+            yield event
+    return retrieve_events, calls
+
+class ConcurrentReader(aiess.Reader):
+    def __init__(self, fail_id: int=None):
+        super().__init__("test-concurrent", db_name=SCRAPER_TEST_DB_NAME, concurrency=3)
+        self.fail_id = fail_id
+        self.handled = []
+        self.last_id = 0
+
+    async def on_event(self, event: Event):
+        if event.id == self.fail_id:
+            raise ValueError("failed")
+        # Events on the first beatmapset take longer, so would be handled last if not for the ordering.
+        await asyncio.sleep(0.03 if event.beatmapset and event.beatmapset.id == 1 else 0.01)
+        self.handled.append(event.id)
+
+def concurrent_events():
+    beatmapset1 = Beatmapset(1, "artist", "title", User(1, "someone"), modes=["osu"], genre="g", language="l")
+    beatmapset2 = Beatmapset(2, "artist", "title", User(2, "sometwo"), modes=["osu"], genre="g", language="l")
+    return [
+        Event(_type="nominate", time=timestamp.from_string("2020-01-01 00:00:00"), beatmapset=beatmapset, _id=_id)
+        for _id, beatmapset in enumerate([beatmapset1, beatmapset2, beatmapset1, beatmapset2, beatmapset1], start=1)
+    ]
+
 @pytest.mark.asyncio
-async def test_on_events(reader):
-    event1 = Event(_type="hello", time=timestamp.from_string("2020-01-01 05:00:00"))
-    event2 = Event(_type="there", time=timestamp.from_string("2020-01-01 07:00:00"))
-    event3 = Event(_type="hi", time=timestamp.from_string("2020-01-01 11:00:00"))
-    event4 = Event(_type="yes", time=timestamp.from_string("2020-01-01 13:00:00"))
-    event5 = Event(_type="no", time=timestamp.from_string("2020-01-01 15:00:00"))
+async def test_push_all_new_events_concurrent():
+    reader = ConcurrentReader()
+    with mock.patch.object(reader, "events_after", side_effect=mock_events_after(concurrent_events())):
+        await reader._Reader__push_all_new_events()
 
-    reader.database.insert_event(event1)
-    reader.database.insert_event(event2)
-    reader.database.insert_event(event3)
-    reader.database.insert_event(event4)
-    reader.database.insert_event(event5)
+    assert sorted(reader.handled) == [1, 2, 3, 4, 5]
+    assert [_id for _id in reader.handled if _id in [1, 3, 5]] == [1, 3, 5]
+    assert reader.handled.index(2) < reader.handled.index(1)
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == 5
 
-    start = timestamp.from_string("2020-01-01 00:00:00")
-    middle = timestamp.from_string("2020-01-01 10:00:00")
-    end = timestamp.from_string("2020-01-01 18:00:00")
-    scope = Scope("any")
-    await reader._Reader__push_events_between(start, middle, scope)
-    await reader._Reader__push_events_between(middle, end, scope)
+@pytest.mark.asyncio
+async def test_push_all_new_events_concurrent_failure():
+    reader = ConcurrentReader(fail_id=3)
+    with mock.patch.object(reader, "events_after", side_effect=mock_events_after(concurrent_events())):
+        with pytest.raises(ValueError):
+            await reader._Reader__push_all_new_events()
 
-    assert len(received_event_batches) == 2
+    # Event 4 may have been handled, but event 3 was not, so we can only skip up to event 2 next time.
+    assert 5 not in reader.handled
+    assert reader.last_id == 2
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == 2
 
 @pytest.mark.asyncio
-async def test_on_event(reader):
-    event1 = Event(_type="hello", time=timestamp.from_string("2020-01-01 05:00:00"))
-    event2 = Event(_type="there", time=timestamp.from_string("2020-01-01 07:00:00"))
+async def test_push_all_new_events_prefetch():
+    reads = []
+    reader = ConcurrentReader()
+    async def on_event(event):
+        reader.handled.append((event.id, list(reads)))
+
+    with mock.patch("aiess.reader.BATCH_SIZE", 2):
+        with mock.patch.object(reader, "events_after", side_effect=mock_events_after(concurrent_events(), reads)):
+            with mock.patch.object(reader, "on_event", side_effect=on_event):
+                await reader._Reader__push_all_new_events()
+
+    # The second batch was already being read while the first was handled.
+    assert reader.handled[0] == (1, [0, 2])
+    assert reads == [0, 2, 4]
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == 5
 
-    reader.database.insert_event(event1)
-    reader.database.insert_event(event2)
+@pytest.mark.asyncio
+async def test_push_all_new_events_on_events():
+    calls = []
+    reader = ConcurrentReader()
+    async def on_events(events):
+        calls.append(([event.id for event in events], list(reader.handled)))
+
+    events = concurrent_events()
+    events[3].type = "news"
+    events[3].beatmapset = None
+    with mock.patch.object(reader, "events_after", side_effect=mock_events_after(events)):
+        with mock.patch.object(reader, "on_events", side_effect=on_events):
+            await reader._Reader__push_all_new_events()
+
+    # Once per scope with events, in order, before any of them are handled individually.
+    assert calls[0] == ([1, 2, 3, 5], [])
+    assert calls[1][0] == [4]
+    assert sorted(reader.handled) == [1, 2, 3, 4, 5]
 
-    _from = timestamp.from_string("2020-01-01 00:00:00")
-    to = timestamp.from_string("2020-01-01 10:00:00")
-    scope = Scope("any")
-    await reader._Reader__push_events_between(_from, to, scope)
+@pytest.mark.asyncio
+async def test_push_all_new_events_on_events_failure():
+    reader = ConcurrentReader()
+    async def on_events(events):
+        if events[0].type == "nominate":
+            raise ValueError("failed")
+
+    events = concurrent_events()
+    events[3].type = "news"
+    events[3].beatmapset = None
+    with mock.patch.object(reader, "events_after", side_effect=mock_events_after(events)):
+        with mock.patch.object(reader, "on_events", side_effect=on_events):
+            with pytest.raises(ValueError):
+                await reader._Reader__push_all_new_events()
+
+    # None of the events were handled, including those of the next scope, so none can be skipped next time.
+    assert not reader.handled
+    assert reader.last_id == 0
 
-    assert received_events == [event1, event2]
-    assert reader.latest_event_time == timestamp.from_string("2020-01-01 07:00:00")
+@pytest.mark.asyncio
+async def test_push_all_new_events_types():
+    reads = []
+    reader = ConcurrentReader()
+    reader.event_types = ["qualify"]
+    events = concurrent_events()
+    events[1].type = "qualify"
+
+    async def events_after(last_id, limit=None, until_id=None):
+        return await mock_events_after([event for event in events if event.type == "qualify"], reads)(last_id, limit, until_id)
+
+    with mock.patch.object(reader, "events_after", side_effect=events_after):
+        with mock.patch("aiess.reader.latest_id", return_value=5):
+            await reader._Reader__push_all_new_events()
+
+    assert reader.handled == [2]
+    assert reads == [0]
+    # Caught up to the latest event, rather than reading the nominations after the qualification again next time.
+    assert reader.last_id == 5
+    assert checkpoint.get_last(reader._Reader__checkpoint_id()) == 5
+
+def test_events_after_where():
+    assert events_after_where(3) == ("id > %s ORDER BY id ASC", (3,))
+    assert events_after_where(3, limit=10, until_id=20, event_types=["nominate", "qualify"]) == (
+        "id > %s AND id <= %s AND type IN (%s, %s) ORDER BY id ASC LIMIT %s",
+        (3, 20, "nominate", "qualify", 10)
+    )
+    # No types, no events.
+    assert events_after_where(3, event_types=[]) == ("id > %s AND type IN (NULL) ORDER BY id ASC", (3,))
 
 @pytest.mark.asyncio
-async def test_on_event_scope(reader):
-    event1 = Event(_type="hello", time=timestamp.from_string("2020-01-01 05:00:00"))
-    event2 = Event(_type="there", time=timestamp.from_string("2020-01-01 07:00:00"))
+async def test_replay(reader):
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 01:00:00"))
+    event2 = Event(_type="news",     time=timestamp.from_string("2020-01-01 02:00:00"))
+    event3 = Event(_type="qualify",  time=timestamp.from_string("2020-01-01 03:00:00"))
+    event4 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 04:00:00"))
 
-    reader.database.insert_event(event1)
-    reader.database.insert_event(event2)
+    insert_events(reader, event1, event2, event3, event4)
+    replayed = await reader.replay(timestamp.from_string("2020-01-01 02:00:00"), timestamp.from_string("2020-01-01 03:00:00"), chunk_size=1)
+
+    assert replayed == 2
+    assert received_events == [event2, event3]
+    assert not received_event_batches
+    assert not checkpoint.exists(reader._Reader__checkpoint_id())
+    assert reader.latest_event_time is None
+
+@pytest.mark.asyncio
+async def test_replay_ids_and_types(reader):
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 01:00:00"))
+    event2 = Event(_type="news",     time=timestamp.from_string("2020-01-01 02:00:00"))
+    event3 = Event(_type="qualify",  time=timestamp.from_string("2020-01-01 03:00:00"))
+
+    insert_events(reader, event1, event2, event3)
+    first_id = reader._Reader__max_id() - 2
+    reader.event_types = ["nominate", "qualify"]
+    replayed = await reader.replay(first_id)
+
+    assert replayed == 2
+    assert received_events == [event1, event3]
+
+def test_replay_where():
+    reader = Reader("test-replay")
+    reader.event_types = ["nominate", "qualify"]
+
+    where, where_values = reader._Reader__replay_where(5, 10)
+    assert where == "id >= %s AND id <= %s AND type IN (%s, %s)"
+    assert where_values == (5, 10, "nominate", "qualify")
 
     _from = timestamp.from_string("2020-01-01 00:00:00")
-    to = timestamp.from_string("2020-01-01 10:00:00")
-    scope = Scope("greet", sql_target="type=\"hello\"")
-    await reader._Reader__push_events_between(_from, to, scope)
+    reader.event_types = None
+    assert reader._Reader__replay_where(_from) == ("time >= %s", (_from,))
 
-    assert received_events == [event1]
-    assert timestamp.get_last(reader._Reader__time_id(scope)) == timestamp.from_string("2020-01-01 05:00:00")
-    assert reader.latest_event_time == timestamp.from_string("2020-01-01 05:00:00")
+    with pytest.raises(ValueError):
+        reader._Reader__replay_where(5, _from)
+
+@pytest.mark.asyncio
+async def test_replay_progress():
+    reader = ConcurrentReader()
+    retrieve_events, _ = mock_retrieve_events(concurrent_events())
+
+    batches = []
+    async def on_events(events):
+        batches.append(events)
+
+    with mock.patch.object(reader.database, "retrieve_events", side_effect=retrieve_events):
+        with mock.patch.object(reader.database, "retrieve_table_data", return_value=[(5,)]):
+            with mock.patch("aiess.reader.REPLAY_LOG_INTERVAL", 0):
+                with mock.patch("aiess.reader.log") as mock_log:
+                    with mock.patch.object(reader, "on_events", side_effect=on_events):
+                        replayed = await reader.replay(1, chunk_size=2)
+
+    assert replayed == 5
+    assert sorted(reader.handled) == [1, 2, 3, 4, 5]
+    assert [[event.id for event in events] for events in batches] == [[1, 2], [3, 4], [5]]
+    assert "Replayed 5/5 events (100.0%" in mock_log.call_args[0][0]
+    assert reader.last_id == 0
+
+@pytest.mark.asyncio
+async def test_replay_slow_consumer():
+    reader = ConcurrentReader()
+    reader.concurrency = 1
+    retrieve_events, calls = mock_retrieve_events(concurrent_events())
+
+    with mock.patch.object(reader.database, "retrieve_events", side_effect=retrieve_events):
+        with mock.patch.object(reader.database, "retrieve_table_data", return_value=[(5,)]):
+            # Each event takes a while to handle (see `ConcurrentReader.on_event`), spanning several chunks.
+            replayed = await reader.replay(1, chunk_size=2)
+
+    assert replayed == 5
+    assert reader.handled == [1, 2, 3, 4, 5]
+    # One buffered query per chunk, continuing after the last id of the previous one, rather than a stream
+    # left open while the events are handled.
+    assert calls == [(0, 2, None), (2, 2, None), (4, 2, None)]
+
+def test_scope_matches():
+    assert SCOPES[0].matches(Event(_type="nominate", time=timestamp.from_string("2020-01-01 05:00:00")))
+    assert SCOPES[1].matches(Event(_type="news",     time=timestamp.from_string("2020-01-01 05:00:00")))
+    assert not SCOPES[0].matches(Event(_type="add",  time=timestamp.from_string("2020-01-01 05:00:00")))
+    assert Scope("any").matches(Event(_type="add",   time=timestamp.from_string("2020-01-01 05:00:00")))
+
+    with pytest.raises(ValueError):
+        Scope("both", event_types=["add"], predicate=lambda event: True)
+
+@pytest.mark.asyncio
+async def test_on_event_scope():
+    reader = ConcurrentReader()
+    events = concurrent_events()
+    events[0].type = "hello"
+    events[2].type = "hello"
+
+    scope = Scope("greet", event_types=["hello"])
+    assert scope.matches(events[0])
+    assert not scope.matches(events[1])
+
+    with mock.patch("aiess.reader.SCOPES", [scope]):
+        with mock.patch.object(reader, "events_after", side_effect=mock_events_after(events)):
+            await reader._Reader__push_all_new_events()
+
+    assert reader.handled == [1, 3]
 
 def test_merge_concurrent():
     event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 05:00:00"), user=User(1, "someone"))
@@ -231,4 +538,44 @@ def test_merge_concurrent_almost_same_time_nominates():
     assert merged_events[0].type == nom_event1.type
     assert merged_events[0].user == nom_event2.user
     assert merged_events[1].type == qual_event1.type
-    assert merged_events[1].user == nom_event1.user
\ No newline at end of file
+    assert merged_events[1].user == nom_event1.user
+
+def test_merge_concurrent_copies_merged_only():
+    event1 = Event(_type="nominate", time=timestamp.from_string("2020-01-01 05:00:00"), user=User(1, "someone"))
+    event2 = Event(_type="qualify", time=timestamp.from_string("2020-01-01 05:00:00"))
+    event3 = Event(_type="something else", time=timestamp.from_string("2020-01-01 07:00:00"))
+
+    merged_events = merge_concurrent([event1, event2, event3])
+    assert event1.type == "nominate"
+    assert merged_events[0] is not event1
+    assert merged_events[1] is event3
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_concurrent_same_as_quadratic(seed):
+    events = synthetic_events(300, seed=seed)
+    merged_events = merge_concurrent(events)
+    expected_events = merge_concurrent_quadratic(events)
+
+    assert len(merged_events) < len(events)
+    assert merged_events == expected_events
+    assert [event.user for event in merged_events] == [event.user for event in expected_events]
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not notifier.is_supported(), reason="Requires unix domain sockets.")
+async def test_run_wakes_on_notification():
+    temp_reader = Reader("test-notified")
+    pushes = []
+    async def push_all_new_events():
+        pushes.append(True)
+
+    with mock.patch.object(temp_reader, "_Reader__push_all_new_events", side_effect=push_all_new_events):
+        task = asyncio.ensure_future(temp_reader.run())
+        await asyncio.sleep(0.1)
+        assert len(pushes) == 1
+
+        notifier.publish(timestamp.from_string("2020-01-01 00:00:00"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    # Woken up long before the next poll would have happened.
+    assert len(pushes) == 2
@@ -0,0 +1,96 @@
+import pytest
+from unittest import mock
+
+from aiess.objects import User, Beatmapset, Discussion
+from aiess.registry import Registry
+
+@pytest.fixture
+def registry():
+    return Registry(size=2)
+
+@pytest.fixture
+def beatmapset():
+    creator = User(2, name="someone")
+    return Beatmapset(1, artist="artist", title="title", creator=creator, modes=["osu"], genre="g", language="l")
+
+def test_user_shared(registry):
+    user = registry.user(1, "test")
+    assert registry.user(1, "test") is user
+    assert registry.user("1") is user  # Name is unknown, so the stored user is fine.
+
+def test_user_renamed(registry):
+    user = registry.user(1, "test")
+    renamed_user = registry.user(1, "other")
+
+    assert renamed_user is not user
+    assert renamed_user.name == "other"
+    assert registry.user(1) is renamed_user
+
+def test_user_without_id(registry):
+    with mock.patch("aiess.objects.api.request_user", return_value={"user_id": 3}):
+        user = registry.user(None, "test")
+    assert user == User(3, "test")
+    assert not registry.stats()["users"]
+
+def test_beatmapset_shared_without_api(registry, beatmapset):
+    stored = registry.beatmapset(1, "artist", "title", beatmapset.creator, ["osu"], "g", "l")
+    assert stored == beatmapset
+
+    with mock.patch("aiess.objects.api.request_beatmapset") as mock_request:
+        assert registry.beatmapset(1) is stored
+        mock_request.assert_not_called()
+
+def test_beatmapset_changed(registry, beatmapset):
+    stored = registry.beatmapset(1, "artist", "title", beatmapset.creator, ["osu"], "g", "l")
+    updated = registry.beatmapset(1, "artist", "title", beatmapset.creator, ["osu", "taiko"], "g", "l")
+
+    assert updated is not stored
+    assert updated.modes == ["osu", "taiko"]
+
+def test_discussion_shared(registry, beatmapset):
+    user = registry.user(3, "mapper")
+    discussion = registry.discussion(4, beatmapset, user, "content", "tab", "diff")
+
+    assert registry.discussion(4, beatmapset) is discussion
+    assert registry.discussion(4, beatmapset, content="edited") is not discussion
+
+def test_lru_eviction(registry):
+    first  = registry.user(1, "first")
+    second = registry.user(2, "second")
+    registry.user(1)  # Most recently used, so `second` goes first.
+    registry.user(3, "third")
+
+    assert registry.user(1) is first
+    assert registry.user(2, "second") is not second
+    assert registry.stats()["evictions"] == 2
+
+def test_invalidate(registry):
+    user = registry.user(1, "test")
+    registry.invalidate(User, 1)
+    assert registry.user(1, "test") is not user
+
+def test_clear(registry, beatmapset):
+    registry.user(1, "test")
+    registry.discussion(4, beatmapset)
+    registry.clear()
+
+    stats = registry.stats()
+    assert stats["users"] == 0
+    assert stats["discussions"] == 0
+
+def test_stats(registry):
+    registry.user(1, "test")
+    registry.user(1, "test")
+
+    stats = registry.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_eq_same_instance(beatmapset):
+    with mock.patch.object(Beatmapset, "_Beatmapset__key") as mock_key:
+        assert beatmapset == beatmapset
+        mock_key.assert_not_called()
+
+def test_eq_different_instance(beatmapset):
+    assert beatmapset != Discussion(1, beatmapset)
+    assert beatmapset == Beatmapset(1, artist="artist", title="title", creator=User(2, name="someone"), modes=["osu"], genre="g", language="l")
@@ -0,0 +1,152 @@
+import pytest
+from unittest import mock
+
+from aiess.resolver import UserResolver
+from aiess.database import Database, SCRAPER_TEST_DB_NAME
+from aiess.objects import User
+
+@pytest.fixture
+def database():
+    database = mock.Mock()
+    database.retrieve_table_data.return_value = [(2, "peppy"), (3, "BanchoBot")]
+    return database
+
+@pytest.fixture
+def resolver(database):
+    resolver = UserResolver()
+    resolver.use_database(database)
+    return resolver
+
+def test_remember(resolver, database):
+    resolver.remember(2, "peppy")
+
+    assert resolver.name_of(2) == "peppy"
+    assert resolver.id_of("PEPPY") == 2
+    assert resolver.stats()["map_hits"] == 2
+    database.retrieve_table_data.assert_not_called()
+
+def test_remember_renamed(resolver):
+    resolver.remember(2, "peppy")
+    resolver.remember(2, "not peppy")
+    resolver.remember(3, "peppy")  # Someone else taking the old name.
+
+    assert resolver.name_of(2) == "not peppy"
+    assert resolver.id_of("not peppy") == 2
+    assert resolver.id_of("peppy") == 3
+    assert resolver.stats()["size"] == 2
+
+def test_size():
+    resolver = UserResolver(size=2)
+    resolver.remember(1, "first")
+    resolver.remember(2, "second")
+    resolver.remember(3, "third")
+
+    assert resolver.stats()["size"] == 2
+    assert "first" not in resolver.ids
+    assert 1 not in resolver.names
+
+def test_prefetch(resolver, database):
+    resolver.remember(4, "known")
+    resolver.prefetch(ids=[2, 4, None], names=["BanchoBot", "known"])
+
+    database.retrieve_table_data.assert_called_once_with(
+        table        = "users",
+        where        = "id IN (%s) OR name IN (%s)",
+        where_values = (2, "BanchoBot"),
+        selection    = "id, name"
+    )
+    assert resolver.names == {4: "known", 2: "peppy", 3: "BanchoBot"}
+
+def test_name_of_database(resolver):
+    with mock.patch("aiess.resolver.api.request_user") as mock_request:
+        assert resolver.name_of(3) == "BanchoBot"
+        mock_request.assert_not_called()
+
+    assert resolver.stats()["database_hits"] == 1
+
+def test_name_of_api(resolver, database):
+    database.retrieve_table_data.return_value = []
+    with mock.patch("aiess.resolver.api.request_user", return_value={"user_id": "5", "username": "someone"}):
+        assert resolver.name_of(5) == "someone"
+        assert resolver.id_of("someone") == 5
+
+    assert resolver.stats()["api_requests"] == 1
+
+def test_name_of_restricted(resolver, database):
+    database.retrieve_table_data.return_value = []
+    with mock.patch("aiess.resolver.api.request_user", return_value=None):
+        assert resolver.name_of(1) is None
+        assert resolver.id_of("restricted") is None
+
+def test_id_of_without_name(resolver, database):
+    database.retrieve_table_data.return_value = []
+    with mock.patch("aiess.resolver.api.request_user", return_value={"user_id": "3"}):
+        assert resolver.id_of("someone") == 3
+
+    assert not resolver.names
+
+def test_without_database():
+    resolver = UserResolver()
+    with mock.patch("aiess.resolver.api.request_user", return_value={"user_id": "2", "username": "peppy"}):
+        assert resolver.id_of("peppy") == 2
+
+def test_forget(resolver):
+    resolver.remember(2, "peppy")
+    resolver.forget(2)
+
+    assert not resolver.names
+    assert not resolver.ids
+
+def test_user_resolved():
+    with mock.patch("aiess.objects.user_resolver") as mock_resolver:
+        mock_resolver.id_of.return_value = 2
+        user = User(name="peppy")
+
+    assert user.id == 2
+    mock_resolver.id_of.assert_called_once_with("peppy")
+
+def test_user_restricted():
+    with mock.patch("aiess.resolver.api.request_user", return_value=None) as mock_request:
+        user = User(1)
+
+    assert user.name is None
+    mock_request.assert_called_once_with(1)
+
+def test_real_database():
+    database = Database(SCRAPER_TEST_DB_NAME)
+    database.clear_table_data("users")
+    database.insert_user(User(2, "peppy"))
+
+    resolver = UserResolver()
+    resolver.use_database(database)
+    resolver.prefetch(names=["peppy"])
+
+    assert resolver.names == {2: "peppy"}
+
+def test_remember_renamed_invalidates_api(resolver):
+    resolver.remember(2, "peppy")
+    with mock.patch("aiess.resolver.api.cache") as mock_cache:
+        resolver.remember(2, "peppy")
+        mock_cache.invalidate.assert_not_called()
+
+        resolver.remember(2, "not peppy")
+        mock_cache.invalidate.assert_called_once_with(["/get_user?u=2", "/get_user?u=peppy"])
+
+        resolver.remember(3, "not peppy")
+        mock_cache.invalidate.assert_called_with(["/get_user?u=not%20peppy"])
+
+    assert resolver.stats()["renames"] == 1
+
+def test_harvest(resolver, database):
+    resolver.remember(2, "peppy")
+    harvested = resolver.harvest([(2, "peppy"), (3, "BanchoBot"), ("4", "someone"), (None, "unknown")])
+
+    assert harvested == 2
+    assert resolver.names == {2: "peppy", 3: "BanchoBot", 4: "someone"}
+    database.insert_table_data_many.assert_called_once_with(
+        "users", [dict(id=3, name="BanchoBot"), dict(id=4, name="someone")])
+
+    # Already known, so need not be stored again.
+    assert resolver.harvest([(3, "BanchoBot")]) == 0
+    assert database.insert_table_data_many.call_count == 1
+    assert resolver.stats()["harvested"] == 2
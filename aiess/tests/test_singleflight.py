@@ -0,0 +1,135 @@
+import time
+import pytest
+import asyncio
+import threading
+from unittest import mock
+
+from aiess.web.singleflight import SingleFlight
+from aiess.web import api
+
+def test_do():
+    single_flight = SingleFlight()
+    calls = []
+    def request(url):
+        calls.append(url)
+        time.sleep(0.1)
+        return [url]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(single_flight.do("a", request, "a")))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert results == [["a"], ["a"], ["a"]]
+    assert single_flight.stats() == dict(requests=3, saved=2, in_flight=0)
+
+def test_do_sequential():
+    single_flight = SingleFlight()
+    assert single_flight.do("a", lambda: 1) == 1
+    assert single_flight.do("a", lambda: 2) == 2
+    assert single_flight.stats()["saved"] == 0
+
+def test_do_failure():
+    single_flight = SingleFlight()
+    def request():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        single_flight.do("a", request)
+
+    assert single_flight.do("a", lambda: 1) == 1
+
+@pytest.mark.asyncio
+async def test_do_async():
+    single_flight = SingleFlight()
+    calls = []
+    async def request(url):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return [url]
+
+    results = await asyncio.gather(
+        single_flight.do_async("a", request, "a"),
+        single_flight.do_async("b", request, "b"),
+        single_flight.do_async("a", request, "a")
+    )
+
+    assert calls == ["a", "b"]
+    assert results == [["a"], ["b"], ["a"]]
+    assert single_flight.stats() == dict(requests=3, saved=1, in_flight=0)
+
+@pytest.mark.asyncio
+async def test_do_async_failure():
+    single_flight = SingleFlight()
+    async def request():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(
+        single_flight.do_async("a", request),
+        single_flight.do_async("a", request),
+        return_exceptions = True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_do_async_cancelled_caller():
+    single_flight = SingleFlight()
+    async def request():
+        await asyncio.sleep(0.05)
+        return 1
+
+    first = asyncio.ensure_future(single_flight.do_async("a", request))
+    second = asyncio.ensure_future(single_flight.do_async("a", request))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == 1
+
+def test_request_api_merged():
+    calls = []
+    def request(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.1)
+        response = mock.Mock()
+        response.text = "[{\"username\": \"peppy\"}]"
+        return response
+
+    api.cache.invalidate(["/get_user?u=2"])
+    with mock.patch("aiess.web.api.request_with_rate_limit", side_effect=request):
+        threads = [threading.Thread(target=api.request_user, args=(2,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(calls) == 1
+    assert api.request_user(2)["username"] == "peppy"
+    api.cache.invalidate(["/get_user?u=2"])
+
+@pytest.mark.asyncio
+async def test_request_api_async_merged():
+    calls = []
+    async def request(*args, **kwargs):
+        calls.append(args)
+        await asyncio.sleep(0.05)
+        response = mock.Mock()
+        response.text = "[{\"username\": \"peppy\"}]"
+        return response
+
+    api.cache.invalidate(["/get_user?u=2"])
+    with mock.patch("aiess.web.api.request_with_rate_limit_async", side_effect=request):
+        results = await asyncio.gather(api.request_user_async(2), api.request_user_async(2))
+        # Cached by then, so not requested again.
+        assert (await api.request_user_async(2))["username"] == "peppy"
+
+    assert len(calls) == 1
+    assert results == [{"username": "peppy"}, {"username": "peppy"}]
+    api.cache.invalidate(["/get_user?u=2"])
@@ -3,7 +3,9 @@ from collections import defaultdict
 
 from urllib.parse import quote
 
-from aiess.web.ratelimiter import request_with_rate_limit
+from aiess.web.ratelimiter import request_with_rate_limit, request_with_rate_limit_async, run_in_executor
+from aiess.web.cache import DiskCache
+from aiess.web.singleflight import SingleFlight
 from aiess.settings import API_KEY, API_RATE_LIMIT
 
 MODES = {
@@ -47,16 +49,51 @@ LANGUAGES = {
     "14": "Other"
 }
 
-cache = {}
+# Seconds responses stay cached, by request type. Shared between the scraper and any readers on this host.
+# Responses we know changed are invalidated before then, e.g. beatmapsets after genre edits (see `BeatmapsetHydrator`)
+# and users after their name on a page differs from the one we know (see `UserResolver.remember`).
+CACHE_TTLS = {
+    "/get_beatmaps": 21600,  # 6 hours
+    "/get_user":     21600
+}
+cache = DiskCache("api", ttls=CACHE_TTLS)
+# Identical requests made at the same time (e.g. the same beatmapset for several events) are only made once.
+single_flight = SingleFlight()
+
 def request_api(request_type: str, query: str) -> object:
-    """Requests a json object from the v1 osu!api, where the api key is supplied."""
-    request = f"https://osu.ppy.sh/api/{request_type}?{query}&k={API_KEY}"
+    """Requests a json object from the v1 osu!api, where the api key is supplied.
+    Responses are cached on disk for some time depending on the request type, see `CACHE_TTLS`."""
+    cache_line = f"/{request_type}?{query}"
+    cached_response = cache.get(cache_line)
+    if cached_response is not None:
+        return cached_response
+
+    return single_flight.do(cache_line, __request_api, request_type, query)
 
+async def request_api_async(request_type: str, query: str) -> object:
+    """Same as `request_api`, but without blocking the event loop, neither on the request nor the cache."""
     cache_line = f"/{request_type}?{query}"
-    if cache_line in cache:
-        return cache[cache_line]
+    cached_response = await run_in_executor(cache.get, cache_line)
+    if cached_response is not None:
+        return cached_response
+
+    return await single_flight.do_async(cache_line, __request_api_async, request_type, query)
+
+def __request_api(request_type: str, query: str) -> object:
+    """Requests a json object from the v1 osu!api, and caches it, regardless of whether it was cached already."""
+    response = request_with_rate_limit(__api_url(request_type, query), API_RATE_LIMIT, "api")
+    return __cache_response(request_type, query, response)
+
+async def __request_api_async(request_type: str, query: str) -> object:
+    """Same as `__request_api`, but without blocking the event loop."""
+    response = await request_with_rate_limit_async(__api_url(request_type, query), API_RATE_LIMIT, "api")
+    return await run_in_executor(__cache_response, request_type, query, response)
 
-    response = request_with_rate_limit(request, API_RATE_LIMIT, "api")
+def __api_url(request_type: str, query: str) -> str:
+    return f"https://osu.ppy.sh/api/{request_type}?{query}&k={API_KEY}"
+
+def __cache_response(request_type: str, query: str, response: object) -> object:
+    """Returns the json object of the given response to the given request, and caches it. Returns None if empty."""
     try:
         json_response = json.loads(response.text)
         if "error" in json_response:
@@ -64,7 +101,7 @@ def request_api(request_type: str, query: str) -> object:
             error_str = json_response["error"]
             raise ValueError(f"The osu! api responded with an error \"{error_str}\"")
 
-        cache[cache_line] = json_response
+        cache.put(f"/{request_type}?{query}", json_response)
         return json_response
     except json.decoder.JSONDecodeError:
         # The response text is empty (e.g. "[]").
@@ -72,15 +109,27 @@ def request_api(request_type: str, query: str) -> object:
 
 def request_beatmapset(beatmapset_id: str) -> object:
     """Requests a json object of the given beatmapset id.
-    Caches any response gotten until cleared manually."""
+    Caches any response gotten for some time, see `CACHE_TTLS`."""
     beatmapset_json = request_api("get_beatmaps", f"s={quote(str(beatmapset_id))}")
     return beatmapset_json
 
 def request_user(user_id: str) -> object:
     """Requests a json object of the given user id.
-    Caches any response gotten until cleared manually."""
+    Caches any response gotten for some time, see `CACHE_TTLS`."""
     user_json = request_api("get_user", f"u={quote(str(user_id))}")
     if len(user_json) > 0:
         return user_json[0]
     # The user is restricted.
-    return None
\ No newline at end of file
+    return None
+
+async def request_beatmapset_async(beatmapset_id: str) -> object:
+    """Same as `request_beatmapset`, but without blocking the event loop."""
+    return await request_api_async("get_beatmaps", f"s={quote(str(beatmapset_id))}")
+
+async def request_user_async(user_id: str) -> object:
+    """Same as `request_user`, but without blocking the event loop."""
+    user_json = await request_api_async("get_user", f"u={quote(str(user_id))}")
+    if len(user_json) > 0:
+        return user_json[0]
+    # The user is restricted.
+    return None
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Generator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # e.g. Windows, where buckets are then only shared between threads of the same process.
+
+from aiess.settings import ROOT_PATH
+
+# The state of each bucket is kept in here, such that all processes on this host share the same buckets.
+PATH_PREFIX = ROOT_PATH + "ratelimits/"
+FILE_NAME_POSTFIX = ".json"
+
+class TokenBucket:
+    """Allows up to `burst` requests at once, refilling one request every `interval` seconds, shared between all
+    processes on this host with the same bucket id (e.g. the scraper and a reader both using the osu! api).
+
+    The state of the bucket is kept in a small file (see `get_path`), which is locked while taking tokens, so
+    processes never take the same token twice. Taking a token which is not available yet reserves it, such that
+    concurrent callers queue up one interval apart, rather than all going at once when a token is refilled."""
+    def __init__(self, bucket_id: str, interval: float, burst: int=1):
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1, not {burst}.")
+
+        self.bucket_id = bucket_id
+        self.interval  = interval
+        self.burst     = burst
+        self.lock      = threading.Lock()
+
+        # Counters of this process only, see `stats`.
+        self.acquisitions = 0
+        self.waits        = 0
+        self.wait_time    = 0.0
+
+    def acquire(self) -> float:
+        """Takes a token, and returns the seconds to wait before using it (0 if it is available right away)."""
+        with self.__state() as state:
+            available_time = state["updated_at"] + max(0, 1 - state["tokens"]) * self.interval
+            wait = max(0.0, available_time - time.time())
+            state["tokens"] -= 1
+
+        with self.lock:
+            self.acquisitions += 1
+            if wait > 0:
+                self.waits += 1
+                self.wait_time += wait
+
+        return wait
+
+    def back_off(self) -> float:
+        """Postpones the next token for 30 -> 60 -> 120 -> 240 seconds for 1, 2, 3, and 4+ failures in a row
+        respectively, for every process. Returns the seconds postponed."""
+        with self.__state() as state:
+            state["failures"] = min(state["failures"] + 1, 4)
+            delay = 30 * 2**(state["failures"] - 1)
+            # Nothing is refilled until then (see `__refill`), so there is no burst of requests once it is over.
+            state["tokens"] = min(state["tokens"], 0)
+            state["updated_at"] += delay
+
+        return delay
+
+    def succeed(self) -> None:
+        """Resets the failures in a row, such that the next back off is the shortest again."""
+        with self.__state() as state:
+            state["failures"] = 0
+
+    def remaining(self) -> float:
+        """Returns the tokens available to all processes without waiting. Negative if callers are waiting."""
+        with self.__state() as state:
+            return state["tokens"]
+
+    def stats(self) -> dict:
+        """Returns the tokens remaining, along with how often and how long this process had to wait for tokens."""
+        remaining = self.remaining()
+        with self.lock:
+            return dict(
+                remaining    = remaining,
+                acquisitions = self.acquisitions,
+                waits        = self.waits,
+                wait_time    = self.wait_time
+            )
+
+    @contextmanager
+    def __state(self) -> Generator[dict, None, None]:
+        """Yields the current state of the bucket while holding its lock, across threads and, where supported,
+        processes. Any changes to the state are written back once done."""
+        with self.lock:
+            os.makedirs(PATH_PREFIX, exist_ok=True)
+            with open(get_path(self.bucket_id), "a+") as _file:
+                # Closing the file releases the lock.
+                if fcntl:
+                    fcntl.flock(_file, fcntl.LOCK_EX)
+
+                _file.seek(0)
+                state = parse_state(_file.read(), self.burst)
+                self.__refill(state)
+
+                yield state
+
+                _file.seek(0)
+                _file.truncate()
+                _file.write(json.dumps(state))
+
+    def __refill(self, state: dict) -> None:
+        """Adds the tokens refilled since the state was last updated, up to `burst`. Nothing is refilled while
+        backing off, as the state is then last updated in the future."""
+        now = time.time()
+        if now <= state["updated_at"]:
+            return
+
+        elapsed = now - state["updated_at"]
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed / self.interval) if self.interval else self.burst
+        state["updated_at"] = now
+
+def parse_state(text: str, burst: int) -> dict:
+    """Returns the state of a bucket from the given file contents. A missing or invalid state (e.g. corruption
+    due to power loss) is a full bucket, as if it was never used."""
+    state = dict(tokens=float(burst), updated_at=time.time(), failures=0)
+    try:
+        state.update(json.loads(text))
+    except ValueError:
+        pass
+    return state
+
+def get_path(bucket_id: str) -> str:
+    """Returns the path to the state file of the bucket with the given identifier."""
+    return f"{PATH_PREFIX}{bucket_id}{FILE_NAME_POSTFIX}"
+
+buckets: Dict[str, TokenBucket] = {}
+buckets_lock = threading.Lock()
+
+def get_bucket(bucket_id: str, interval: float, burst: int=1) -> TokenBucket:
+    """Returns the bucket of this process with the given id, created if it does not exist yet. Its interval and
+    burst are updated to the given ones, in case these changed (e.g. different settings)."""
+    with buckets_lock:
+        if bucket_id not in buckets:
+            buckets[bucket_id] = TokenBucket(bucket_id, interval, burst)
+
+        bucket = buckets[bucket_id]
+        bucket.interval = interval
+        bucket.burst    = burst
+        return bucket
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable
+
+from aiess.settings import ROOT_PATH
+
+# Each cache is kept in a database file in here, such that it survives restarts and is shared between processes.
+PATH_PREFIX = ROOT_PATH + "cache/"
+FILE_NAME_POSTFIX = ".db"
+
+DISK_CACHE_TTL  = 600
+DISK_CACHE_SIZE = 100000
+# Puts between each purge of expired and excess values, see `DiskCache.put`.
+DISK_CACHE_PURGE_INTERVAL = 100
+
+class DiskCache:
+    """Keeps up to `size` json-serializable values on disk, each for a number of seconds depending on its key (see
+    `ttls`, e.g. user lookups staying valid longer than beatmapset lookups), otherwise for `ttl` seconds. Once full,
+    the oldest stored values are evicted first, every `purge_interval` puts. Values can also be dropped explicitly,
+    see `invalidate`.
+
+    Supports `key in cache`, `cache[key]` and `len(cache)`, like the dictionaries used before, except that values are
+    kept in a SQLite database (see `get_path`), shared between all processes on this host using the same name."""
+    def __init__(
+            self, name: str, ttls: Dict[str, float]=None, ttl: float=DISK_CACHE_TTL, size: int=DISK_CACHE_SIZE,
+            purge_interval: int=DISK_CACHE_PURGE_INTERVAL):
+        self.name = name
+        self.ttls = ttls or {}  # key prefix -> seconds
+        self.ttl  = ttl
+        self.size = size
+        self.purge_interval = purge_interval
+
+        self.lock = threading.Lock()
+        self.__connection: sqlite3.Connection = None
+        self.__puts_since_purge = 0
+
+        # Counters of this process only, see `stats`.
+        self.hits          = 0
+        self.misses        = 0
+        self.expirations   = 0
+        self.evictions     = 0
+        self.invalidations = 0
+
+    def get(self, key: str, default: object=None) -> object:
+        """Returns the cached value of the given key, or `default` if not cached or expired."""
+        with self.lock:
+            row = self.__execute("SELECT value, expires_at FROM entries WHERE `key`=?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = row
+            if expires_at <= time.time():
+                self.__execute("DELETE FROM entries WHERE `key`=?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            return json.loads(value)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, object]:
+        """Returns the cached values of any of the given keys which are cached and not expired, by key, using a single
+        query (e.g. for everything on a page). Expired values are left to be dropped by the next purge."""
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        with self.lock:
+            rows = self.__execute(
+                f"SELECT `key`, value FROM entries WHERE `key` IN ({', '.join(['?'] * len(keys))}) AND expires_at > ?",
+                tuple(keys) + (time.time(),)
+            ).fetchall()
+            self.hits   += len(rows)
+            self.misses += len(keys) - len(rows)
+            return {key: json.loads(value) for key, value in rows}
+
+    def put(self, key: str, value: object) -> None:
+        """Caches the given value for the given key, for as long as its ttl (see `ttl_of`). Every `purge_interval` puts
+        of this process, drops any expired values and evicts the oldest stored values if full, rather than counting
+        the whole cache on each put. In between, it may hold up to that many values more than `size`."""
+        now = time.time()
+        with self.lock:
+            self.__execute(
+                "REPLACE INTO entries (`key`, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now + self.ttl_of(key))
+            )
+
+            self.__puts_since_purge += 1
+            if self.__puts_since_purge >= self.purge_interval:
+                self.__puts_since_purge = 0
+                self.__purge(now)
+
+    def ttl_of(self, key: str) -> float:
+        """Returns the seconds values of the given key stay cached, from the longest prefix in `ttls` it starts with."""
+        prefixes = [prefix for prefix in self.ttls if key.startswith(prefix)]
+        return self.ttls[max(prefixes, key=len)] if prefixes else self.ttl
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Drops the cached values of the given keys, if any (e.g. once we know these changed)."""
+        with self.lock:
+            for key in keys:
+                self.invalidations += self.__execute("DELETE FROM entries WHERE `key`=?", (key,)).rowcount
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Drops the cached values of any key starting with the given prefix (e.g. all beatmapset lookups)."""
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self.lock:
+            self.invalidations += self.__execute(
+                "DELETE FROM entries WHERE `key` LIKE ? ESCAPE '\\'", (pattern,)).rowcount
+
+    def clear(self) -> None:
+        """Drops all cached values, for all processes."""
+        with self.lock:
+            self.__execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Closes the connection to the database of this cache, if any. It is reconnected to on next use."""
+        with self.lock:
+            if self.__connection:
+                self.__connection.close()
+                self.__connection = None
+
+    def stats(self) -> dict:
+        """Returns the current size and usage counters of this cache (e.g. how often values were served from it)."""
+        with self.lock:
+            size = self.__count()
+            lookups = self.hits + self.misses
+            return dict(
+                size          = size,
+                hits          = self.hits,
+                misses        = self.misses,
+                hit_rate      = self.hits / lookups if lookups else 0.0,
+                expirations   = self.expirations,
+                evictions     = self.evictions,
+                invalidations = self.invalidations
+            )
+
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            return self.__execute(
+                "SELECT 1 FROM entries WHERE `key`=? AND expires_at > ?", (key, time.time())).fetchone() is not None
+
+    def __getitem__(self, key: str) -> object:
+        with self.lock:
+            row = self.__execute(
+                "SELECT value FROM entries WHERE `key`=? AND expires_at > ?", (key, time.time())).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.__count()
+
+    def __purge(self, now: float) -> None:
+        """Drops any expired values, and evicts the oldest stored values beyond `size`. Should hold `lock`."""
+        self.expirations += self.__execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+
+        excess = self.__count(now) - self.size
+        if excess > 0:
+            self.evictions += self.__execute(
+                "DELETE FROM entries WHERE `key` IN (SELECT `key` FROM entries ORDER BY stored_at LIMIT ?)",
+                (excess,)
+            ).rowcount
+
+    def __count(self, now: float=None) -> int:
+        now = now or time.time()
+        return self.__execute("SELECT COUNT(*) FROM entries WHERE expires_at > ?", (now,)).fetchone()[0]
+
+    def __execute(self, query: str, values: tuple=()) -> sqlite3.Cursor:
+        """Executes the given query on the database of this cache, connecting on first use. Should hold `lock`."""
+        if not self.__connection:
+            self.__connection = connect(get_path(self.name))
+        return self.__connection.execute(query, values)
+
+def connect(path: str) -> sqlite3.Connection:
+    """Returns a connection to the cache database at the given path, creating it if it does not exist yet.
+    Statements are committed right away, and processes wait for each other's writes rather than failing."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    # Readers then do not block the writer, nor the other way around.
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            `key` TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )""")
+    connection.execute("CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)")
+    connection.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+    return connection
+
+def get_path(name: str) -> str:
+    """Returns the path to the database file of the cache with the given name."""
+    return f"{PATH_PREFIX}{name}{FILE_NAME_POSTFIX}"
@@ -1,64 +1,123 @@
+import asyncio
+import functools
+import threading
 import requests
 from requests import Response
-from typing import Dict
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict
 from time import sleep
-from datetime import datetime, timedelta
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 from aiess.logger import log_err
+from aiess.web.bucket import TokenBucket, get_bucket
 
-next_request_time: Dict[str, datetime] = defaultdict(datetime.utcnow)
-failed_attempts: Dict[str, datetime] = defaultdict(int)
+# Seconds to wait for a connection, and then for the response, before giving up on a request (and backing off).
+TIMEOUT = (10, 60)
+# Connections kept alive per host, as well as the number of worker threads requests from async code run on.
+POOL_SIZE = 4
+
+sessions: Dict[str, requests.Session] = {}  # host -> session
+sessions_lock = threading.Lock()
+
+# Blocking requests made from async code run on these threads instead of the event loop.
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="aiess-web")
 
 def invalid_response(response: Response) -> bool:
     return response is None or str(response.status_code).startswith('5')
 
-def request_with_rate_limit(request_url: str, rate_limit: float, rate_limit_id: str=None, **kwargs) -> Response:
-    """Requests a response object at most once every rate_limit seconds for the same rate_limit_id (default None).
+def request_with_rate_limit(
+        request_url: str, rate_limit: float, rate_limit_id: str=None, burst: int=1, **kwargs) -> Response:
+    """Requests a response object at most once every rate_limit seconds for the same rate_limit_id (default None),
+    across all processes on this host, optionally allowing `burst` requests at once (see `get_rate_limiter`).
     Additional keyword arguments are given to the request function (e.g. headers, timeout, etc)."""
-    global next_request_time
-    
+    rate_limiter = get_rate_limiter(rate_limit_id, rate_limit, burst)
+
     response = None
     while invalid_response(response):
-        request_time = next_request_time[rate_limit_id]
-        if request_time and request_time > datetime.now():
-            sleep((request_time - datetime.now()).total_seconds())
-
+        sleep(rate_limiter.acquire())
         response = try_request(request_url, **kwargs)
-        next_request_time[rate_limit_id] = datetime.now() + timedelta(seconds=rate_limit)
 
-        # `try_request` will return None in case of ConnectionErrors or IUAM.
-        # In these cases we back off and wait until it's over.
+        # `try_request` will return None in case of ConnectionErrors, timeouts or IUAM.
+        # In these cases we back off and wait until it's over, giving the website some room to breathe
+        # if there are already many incoming connections causing this, see `TokenBucket.back_off`.
         if invalid_response(response):
-            back_off(rate_limit_id)
+            rate_limiter.back_off()
+
+    rate_limiter.succeed()
+    return response
+
+async def request_with_rate_limit_async(
+        request_url: str, rate_limit: float, rate_limit_id: str=None, burst: int=1, **kwargs) -> Response:
+    """Same as `request_with_rate_limit`, but waits for the rate limit and backs off without blocking the event loop.
+    Each attempt is made on a web worker thread (see `run_in_executor`), which it occupies for at most `TIMEOUT`.
+    So is each update of the rate limiter, as it waits for any other process holding its file lock."""
+    rate_limiter = get_rate_limiter(rate_limit_id, rate_limit, burst)
+
+    response = None
+    while invalid_response(response):
+        await asyncio.sleep(await run_in_executor(rate_limiter.acquire))
+        response = await run_in_executor(try_request, request_url, **kwargs)
 
-    if rate_limit_id in failed_attempts:
-        failed_attempts[rate_limit_id] = 0
+        if invalid_response(response):
+            await run_in_executor(rate_limiter.back_off)
 
+    await run_in_executor(rate_limiter.succeed)
     return response
 
+def get_rate_limiter(rate_limit_id: str=None, rate_limit: float=None, burst: int=1) -> TokenBucket:
+    """Returns the token bucket of the given rate limit id, refilling a request every `rate_limit` seconds, which
+    is shared between all processes on this host (e.g. the scraper and readers all requesting from the osu! api).
+    See `TokenBucket.stats` for how many requests remain, and how long requests had to wait."""
+    return get_bucket(str(rate_limit_id), interval=rate_limit or 0, burst=burst)
+
 def try_request(request_url: str, **kwargs) -> Response:
     """Requests a response object and returns it if successful, otherwise None is returned.
-    If the website is in cloudflare IUAM mode, we also return None."""
+    If the website is in cloudflare IUAM mode, we also return None.
+
+    Connections are kept alive between requests to the same host, see `get_session`. Unless another timeout is
+    given, requests not responding within `TIMEOUT` are considered unsuccessful."""
     response = None
+    kwargs.setdefault("timeout", TIMEOUT)
 
     try:
-        response = requests.get(request_url, **kwargs)
+        response = get_session(request_url).get(request_url, **kwargs)
     except requests.exceptions.ConnectionError:
         log_err(f"WARNING | ConnectionError was raised on GET \"{request_url}\"")
         return None
-    
-    if "<title>Just a moment...</title>" in response.text:
+    except requests.exceptions.Timeout:
+        log_err(f"WARNING | Timeout was raised on GET \"{request_url}\"")
+        return None
+
+    if is_iuam(response):
         log_err("WARNING | CloudFlare IUAM is active")
         return None
-    
+
     return response
 
-def back_off(rate_limit_id: str=None) -> None:
-    """Postpones the next request for 30 -> 60 -> 120 -> 240 seconds for 1, 2, 3, and 4+ tries respectively.
-    This way we give the website some room to breathe if there are already many incoming connections causing this."""
-    global failed_attempts
-    if failed_attempts[rate_limit_id] < 4:
-        failed_attempts[rate_limit_id] += 1
+def is_iuam(response: Response) -> bool:
+    """Returns whether the given response is the cloudflare IUAM page. Only html responses are checked,
+    so we do not search through large json responses (e.g. beatmapset discussions) for it."""
+    if not response.headers.get("Content-Type", "").startswith("text/html"):
+        return False
+    return "<title>Just a moment...</title>" in response.text
+
+def get_session(request_url: str) -> requests.Session:
+    """Returns the session used for requests to the host of the given url, such that connections are pooled and
+    kept alive between requests, rather than every request going through a new TCP and TLS handshake."""
+    host = urlsplit(request_url).netloc
+    with sessions_lock:
+        if host not in sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            sessions[host] = session
+
+        return sessions[host]
 
-    next_request_time[rate_limit_id] += timedelta(seconds = 30 * 2**(failed_attempts[rate_limit_id] - 1))
\ No newline at end of file
+async def run_in_executor(func: Callable, *args, **kwargs) -> object:
+    """Calls the given blocking function (e.g. `try_request`) with the given arguments on a web worker thread,
+    and returns its result once done, without blocking the event loop in the meantime."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
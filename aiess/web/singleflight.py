@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict
+
+class Call:
+    """A call in flight, which any number of threads can wait for the result of."""
+    def __init__(self):
+        self.done   = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+
+    def wait(self) -> object:
+        """Returns the result of the call once done, or raises its exception if it failed."""
+        self.done.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    """Merges concurrent calls with the same key (e.g. requesting the same url) into a single call, of which the result
+    is handed to every caller, rather than each making the same request. Calls made after it is done are made anew,
+    as results are not kept (see `DiskCache` for that).
+
+    Threads should use `do`, and coroutines `do_async`; these do not merge with one another."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[str, Call] = {}          # key -> call in flight, from threads
+        self.tasks: Dict[str, asyncio.Task] = {}  # key -> call in flight, from coroutines
+
+        self.requests = 0
+        self.saved    = 0
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> object:
+        """Returns the result of calling the given function with the given arguments, unless another thread is already
+        doing so for the same key, in which case we wait for that result instead. Exceptions are raised to all."""
+        with self.lock:
+            self.requests += 1
+            call = self.calls.get(key)
+            if call:
+                self.saved += 1
+            else:
+                self.calls[key] = leading_call = Call()
+
+        if call:
+            return call.wait()
+
+        try:
+            leading_call.result = func(*args, **kwargs)
+            return leading_call.result
+        except BaseException as error:
+            leading_call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            leading_call.done.set()
+
+    async def do_async(self, key: str, func: Callable[..., Awaitable], *args, **kwargs) -> object:
+        """Same as `do`, but awaits the given coroutine function instead. Should a caller be cancelled, the call
+        carries on for any others waiting on it."""
+        with self.lock:
+            self.requests += 1
+            task = self.tasks.get(key)
+            if task:
+                self.saved += 1
+            else:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                task.add_done_callback(lambda task: self.__on_done(key, task))
+                self.tasks[key] = task
+
+        return await asyncio.shield(task)
+
+    def __on_done(self, key: str, task: asyncio.Task) -> None:
+        with self.lock:
+            if self.tasks.get(key) is task:
+                del self.tasks[key]
+        if not task.cancelled():
+            # Marks the exception as retrieved, in case every caller was cancelled; otherwise they all raise it.
+            task.exception()
+
+    def stats(self) -> dict:
+        """Returns how many calls were requested, how many of these were saved by merging them with an identical call
+        in flight, and how many calls are currently in flight."""
+        with self.lock:
+            return dict(
+                requests  = self.requests,
+                saved     = self.saved,
+                in_flight = len(self.calls) + len(self.tasks)
+            )
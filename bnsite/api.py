@@ -4,36 +4,77 @@ sys.path.append('..')
 import json
 from typing import Tuple
 
-from aiess.web.ratelimiter import request_with_rate_limit
+from aiess.web.ratelimiter import request_with_rate_limit, request_with_rate_limit_async, run_in_executor
+from aiess.web.cache import DiskCache
+from aiess.web.singleflight import SingleFlight
 from aiess.settings import BNSITE_RATE_LIMIT, BNSITE_HEADERS
 
-cache = {}
+# Seconds responses stay cached. Shared between the scraper and any readers on this host.
+CACHE_TTL = 3600
+cache = DiskCache("bnsite", ttl=CACHE_TTL)
+# Distinguishes responses which are not cached from empty responses, which are cached as None.
+NOT_CACHED = object()
+# Identical requests made at the same time (e.g. the evaluation of a user in several group events) are only made once.
+single_flight = SingleFlight()
+
 def request(route: str, query: str) -> object:
     """Requests the page from the given route and query.
-    Caches any response such that requesting the same discussion id yields the same result."""
+    Caches any response for some time, such that requesting the same discussion id yields the same result."""
+    request_url = f"https://bn.mappersguild.com/interOp/{route}/{query}"
+    cached_result = cache.get(request_url, default=NOT_CACHED)
+    if cached_result is not NOT_CACHED:
+        return cached_result
+
+    return single_flight.do(request_url, __request, request_url)
+
+async def request_async(route: str, query: str) -> object:
+    """Same as `request`, but without blocking the event loop, neither on the request nor the cache."""
     request_url = f"https://bn.mappersguild.com/interOp/{route}/{query}"
-    if request_url in cache:
-        return cache[request_url]
+    cached_result = await run_in_executor(cache.get, request_url, default=NOT_CACHED)
+    if cached_result is not NOT_CACHED:
+        return cached_result
 
+    return await single_flight.do_async(request_url, __request_async, request_url)
+
+def __request(request_url: str) -> object:
+    """Requests the page from the given url, and caches it, regardless of whether it was cached already."""
     response = request_with_rate_limit(
         request_url   = request_url,
         rate_limit    = BNSITE_RATE_LIMIT,
         rate_limit_id = "bnsite",
         headers       = BNSITE_HEADERS
     )
+    return __cache_response(request_url, response)
+
+async def __request_async(request_url: str) -> object:
+    """Same as `__request`, but without blocking the event loop."""
+    response = await request_with_rate_limit_async(
+        request_url   = request_url,
+        rate_limit    = BNSITE_RATE_LIMIT,
+        rate_limit_id = "bnsite",
+        headers       = BNSITE_HEADERS
+    )
+    return await run_in_executor(__cache_response, request_url, response)
+
+def __cache_response(request_url: str, response: object) -> object:
+    """Returns the json object of the given response, if any, otherwise None, and caches it."""
     try:
         result = json.loads(response.text)
     except json.decoder.JSONDecodeError:
         # This happens whenever the response text is empty (e.g. "[]").
         result = None
     
-    cache[request_url] = result
+    cache.put(request_url, result)
     return result
 
 def request_last_eval(user_id: int) -> object:
     """Returns the last updated evaluation associated with a user given their user id. Caches results."""
     return request("latestEvaluation", query=user_id)
 
+async def request_last_eval_async(user_id: int) -> object:
+    """Same as `request_last_eval`, but without blocking the event loop."""
+    return await request_async("latestEvaluation", query=user_id)
+
 def request_user_info(user_id: int) -> str:
     """Returns the data associated with a user given their user id. Caches results."""
     return request("users", query=user_id)
@@ -1,6 +1,8 @@
 import sys
 sys.path.append('..')
 
+from typing import List
+
 from aiess import Event
 from aiess.settings import BNSITE_MONGODB_URI
 from aiess import event_types as types
@@ -25,4 +27,14 @@ def insert_event(event: Event) -> None:
     custom document, then immediately closes the connection."""
     client = MongoClient(BNSITE_MONGODB_URI, retryWrites=False)
     client.qat_db.aiess.insert_one(vars(Document(event)))
-    client.close()
\ No newline at end of file
+    client.close()
+
+def insert_events(events: List[Event]) -> None:
+    """Creates a connection to the MongoDB server, inserts all events as custom documents
+    at once, then immediately closes the connection."""
+    if not events:
+        return
+
+    client = MongoClient(BNSITE_MONGODB_URI, retryWrites=False)
+    client.qat_db.aiess.insert_many([vars(Document(event)) for event in events])
+    client.close()
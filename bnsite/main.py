@@ -2,6 +2,7 @@ import sys
 sys.path.append('..')
 
 import asyncio
+from typing import List
 
 import aiess
 from aiess import Event
@@ -22,11 +23,18 @@ EXPECTED_TYPES = [
 ]
 
 class Reader(aiess.Reader):
-    async def on_event(self, event: Event):
-        if event.type in EXPECTED_TYPES and (not event.user or event.user.id != 3):
+    event_types  = EXPECTED_TYPES
+    event_fields = ["beatmapset", "discussion", "user"]
+
+    async def on_events(self, events: List[Event]):
+        events = [event for event in events if not event.user or event.user.id != 3]
+        for event in events:
             log(event, postfix=self.reader_id)
-            interface.insert_event(event)
+        interface.insert_events(events)
 
 reader = Reader("bnsite", db_name=SCRAPER_DB_NAME)
-loop = asyncio.get_event_loop()
-loop.run_until_complete(reader.run())
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Can instead be hosted along with other readers, see `aiess.host`.
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(reader.run())
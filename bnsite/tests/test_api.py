@@ -1,6 +1,9 @@
 import sys
 sys.path.append('..')
 
+import pytest
+import asyncio
+from unittest import mock
 from datetime import datetime
 
 from aiess.timestamp import from_string
@@ -88,4 +91,23 @@ def test_request_qa_checks_none():
 
 def test_request_qa_checks_missing():
     json = api.request_qa_checks(user_id=4)
-    assert not json
\ No newline at end of file
+    assert not json
+@pytest.mark.asyncio
+async def test_request_async_cached():
+    calls = []
+    async def request(**kwargs):
+        calls.append(kwargs["request_url"])
+        await asyncio.sleep(0.05)
+        response = mock.Mock()
+        response.text = "{\"obviousness\": 0, \"severity\": 0}"
+        return response
+
+    with mock.patch("bnsite.api.request_with_rate_limit_async", side_effect=request):
+        results = await asyncio.gather(
+            api.request_async(route="dqInfoByDiscussionId", query=1755074),
+            api.request_async(route="dqInfoByDiscussionId", query=1755074)
+        )
+        assert await api.request_async(route="dqInfoByDiscussionId", query=1755074) == results[0]
+
+    assert calls == ["https://bn.mappersguild.com/interOp/dqInfoByDiscussionId/1755074"]
+    assert results[0] == results[1] == {"obviousness": 0, "severity": 0}
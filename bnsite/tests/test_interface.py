@@ -2,12 +2,13 @@ import sys
 sys.path.append('..')
 
 import pytest
+from unittest import mock
 
 from aiess import Event, Beatmapset, Discussion, User
 from aiess.timestamp import from_string
 from aiess import event_types as types
 
-from bnsite.interface import Document
+from bnsite.interface import Document, insert_events
 
 @pytest.fixture
 def dq_event():
@@ -36,4 +37,20 @@ def test_document(dq_event):
     assert document.discussionId == 3
     assert document.userId       == 1
     assert document.artistTitle  == "artist - title"
-    assert document.content      == "dqed"
\ No newline at end of file
+    assert document.content      == "dqed"
+
+def test_insert_events(dq_event):
+    with mock.patch("bnsite.interface.MongoClient") as mock_client:
+        insert_events([dq_event, dq_event])
+
+    # One insert for all events.
+    insert_many = mock_client.return_value.qat_db.aiess.insert_many
+    insert_many.assert_called_once()
+    assert insert_many.call_args[0][0] == [vars(Document(dq_event))] * 2
+    mock_client.return_value.close.assert_called_once()
+
+def test_insert_events_none():
+    with mock.patch("bnsite.interface.MongoClient") as mock_client:
+        insert_events([])
+
+    mock_client.assert_not_called()
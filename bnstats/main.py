@@ -20,11 +20,17 @@ EXPECTED_TYPES = [
 ]
 
 class Reader(aiess.Reader):
+    event_types  = EXPECTED_TYPES
+    event_fields = ["beatmapset", "discussion", "user"]
+
     async def on_event(self, event: Event):
-        if event.type in EXPECTED_TYPES and (not event.user or event.user.id != 3):
+        if not event.user or event.user.id != 3:
             log(event, postfix=self.reader_id)
             interface.insert_event(event)
 
 reader = Reader("bnstats", db_name=SCRAPER_DB_NAME)
-loop = asyncio.get_event_loop()
-loop.run_until_complete(reader.run())
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Can instead be hosted along with other readers, see `aiess.host`.
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(reader.run())
@@ -1,13 +1,15 @@
 import sys
 sys.path.append('..')
 
+import asyncio
+
 from discord import Embed
 
-from aiess.database import SCRAPER_DB_NAME
+from aiess.database import AsyncDatabase, SCRAPER_DB_NAME
 
 from bot.commands import Command, register
 from bot.commands import GENERAL_CATEGORY
-from bot.database import Database, BOT_DB_NAME
+from bot.database import BOT_DB_NAME
 from bot.formatter import format_timeago
 
 @register(
@@ -24,10 +26,12 @@ async def cmd_info(command: Command, key: str=None):
 
     created_at      = command.client.user.created_at
     guilds_n        = len(command.client.guilds)
-    subscriptions_n = retrieve_subscription_count()
-    events_n        = retrieve_event_count()
-    events_today_n  = retrieve_event_count_today()
-    first_event_at  = retrieve_first_event_at()
+    subscriptions_n, events_n, events_today_n, first_event_at = await asyncio.gather(
+        retrieve_subscription_count(),
+        retrieve_event_count(),
+        retrieve_event_count_today(),
+        retrieve_first_event_at()
+    )
 
     info_embed.add_field(name="Created at",     value=f"**{created_at.date()}**\n({format_timeago(created_at)})")
     info_embed.add_field(name="Author",         value=f"{app_info.owner}")
@@ -43,28 +47,28 @@ async def cmd_info(command: Command, key: str=None):
         embed    = info_embed
     )
 
-def retrieve_event_count():
-    return Database(SCRAPER_DB_NAME).retrieve_table_data(
+async def retrieve_event_count():
+    return (await AsyncDatabase(SCRAPER_DB_NAME).retrieve_table_data(
         table        = "events",
         selection    = "COUNT(*)"
-    )[0][0]
+    ))[0][0]
 
-def retrieve_event_count_today():
-    return Database(SCRAPER_DB_NAME).retrieve_table_data(
+async def retrieve_event_count_today():
+    return (await AsyncDatabase(SCRAPER_DB_NAME).retrieve_table_data(
         table        = "events",
         where        = "time >= NOW() - INTERVAL 24 HOUR",
         selection    = "COUNT(*)"
-    )[0][0]
+    ))[0][0]
 
-def retrieve_subscription_count():
-    return Database(BOT_DB_NAME).retrieve_table_data(
+async def retrieve_subscription_count():
+    return (await AsyncDatabase(BOT_DB_NAME).retrieve_table_data(
         table        = "subscriptions",
         selection    = "COUNT(*)"
-    )[0][0]
+    ))[0][0]
 
-def retrieve_first_event_at():
-    return Database(SCRAPER_DB_NAME).retrieve_table_data(
+async def retrieve_first_event_at():
+    return (await AsyncDatabase(SCRAPER_DB_NAME).retrieve_table_data(
         table        = "events",
         where        = "TRUE ORDER BY time ASC LIMIT 1",
         selection    = "time"
-    )[0][0]
\ No newline at end of file
+    ))[0][0]
\ No newline at end of file
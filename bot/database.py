@@ -2,7 +2,7 @@ import sys
 sys.path.append('..')
 
 from collections import defaultdict
-from typing import Generator, Dict, List
+from typing import Generator, Dict, List, Iterable
 
 import aiess
 from aiess import Event, Beatmapset, Usergroup
@@ -139,6 +139,23 @@ class Database(aiess.Database):
 
         return beatmapset_event_cache[self.db_name][beatmapset.id]
 
+    async def preload_beatmapset_events(self, beatmapsets: Iterable[Beatmapset]) -> None:
+        """Retrieves all events of any of the given beatmapsets not already cached in one query, rather than one query
+        per beatmapset, then stores the results in the cache used by `retrieve_beatmapset_events`."""
+        beatmapset_ids = set(beatmapset.id for beatmapset in beatmapsets) - set(beatmapset_event_cache[self.db_name])
+        if not beatmapset_ids:
+            return
+
+        events_by_id = { beatmapset_id: [] for beatmapset_id in beatmapset_ids }
+        raw_event_generator = self.retrieve_events(
+            where        = f"beatmapset_id IN ({', '.join(['%s'] * len(beatmapset_ids))}) ORDER BY time DESC",
+            where_values = tuple(beatmapset_ids)
+        )
+        async for event in raw_event_generator:
+            events_by_id[event.beatmapset.id].append(event)
+
+        beatmapset_event_cache[self.db_name].update(events_by_id)
+
 def clear_cache(db_name: str) -> None:
     """Clears any cache the database may be using, allowing new info to be obtained
     (e.g. for retrieving all events related to a beatmapset)."""
@@ -73,15 +73,21 @@ class Client(discord.Client):
 class Reader(aiess.Reader):
     client: Client = None
     
-    async def on_events(self, events):
-        # This is called before any on_event for each batch.
+    async def on_event_batch(self):
+        # This is called before any on_events or on_event for each batch.
         database.clear_cache(SCRAPER_DB_NAME)
 
+    async def on_events(self, events):
+        # Histories of all beatmapsets in the batch are then read at once, rather than when formatting each event.
+        await database.Database(SCRAPER_DB_NAME).preload_beatmapset_events(
+            event.beatmapset for event in events if event.beatmapset)
+
     async def on_event(self, event: Event):
         log(event, postfix=self.reader_id)
         await subscriber.forward(event, self.client)
 
-reader = Reader("bot", db_name=SCRAPER_DB_NAME)
+# Sending to one slow channel should not hold up events on other beatmapsets.
+reader = Reader("bot", db_name=SCRAPER_DB_NAME, concurrency=8)
 
 client = Client(reader)
 client.run(API_KEY)
\ No newline at end of file
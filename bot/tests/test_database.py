@@ -142,4 +142,26 @@ async def test_retrieve_beatmapset_events_cache(scraper_test_database):
     assert db_module.beatmapset_event_cache[SCRAPER_TEST_DB_NAME][3] == [qual_event, nom_event]
 
     db_module.clear_cache(SCRAPER_TEST_DB_NAME)
-    assert not db_module.beatmapset_event_cache[SCRAPER_TEST_DB_NAME]
\ No newline at end of file
+    assert not db_module.beatmapset_event_cache[SCRAPER_TEST_DB_NAME]
+
+@pytest.mark.asyncio
+async def test_preload_beatmapset_events(scraper_test_database):
+    beatmapset1 = Beatmapset(3, "artist", "title", User(4, "creator"), ["osu"], genre="g", language="l")
+    beatmapset2 = Beatmapset(5, "artist", "title", User(4, "creator"), ["osu"], genre="g", language="l")
+    beatmapset3 = Beatmapset(6, "artist", "title", User(4, "creator"), ["osu"], genre="g", language="l")
+    nom_event = Event("nominate", from_string("2020-01-01 00:00:00"), beatmapset1, user=User(1, "someone"))
+    qual_event = Event("qualify", from_string("2020-01-01 05:00:00"), beatmapset1, user=User(2, "sometwo"))
+    other_event = Event("nominate", from_string("2020-01-01 03:00:00"), beatmapset2, user=User(1, "someone"))
+
+    scraper_test_database.insert_event(nom_event)
+    scraper_test_database.insert_event(qual_event)
+    scraper_test_database.insert_event(other_event)
+
+    await scraper_test_database.preload_beatmapset_events([beatmapset1, beatmapset2, beatmapset3])
+    assert db_module.beatmapset_event_cache[SCRAPER_TEST_DB_NAME][3] == [qual_event, nom_event]
+    assert db_module.beatmapset_event_cache[SCRAPER_TEST_DB_NAME][5] == [other_event]
+    assert db_module.beatmapset_event_cache[SCRAPER_TEST_DB_NAME][6] == []
+
+    # Already cached, so not retrieved again.
+    scraper_test_database.clear_table_data("events")
+    assert await scraper_test_database.retrieve_beatmapset_events(beatmapset1) == [qual_event, nom_event]
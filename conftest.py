@@ -0,0 +1,51 @@
+import pytest
+
+from aiess.web import api
+from aiess.web import cache
+from aiess.web import bucket
+from aiess import checkpoint
+from aiess import notifier
+from aiess.hydrator import beatmapset_hydrator
+from aiess.resolver import user_resolver
+from bnsite import api as bnsite_api
+
+@pytest.fixture(scope="session", autouse=True)
+def temp_root_path(tmp_path_factory):
+    """Keeps the caches, rate limits, checkpoints and notification sockets of tests out of `ROOT_PATH`, which is shared
+    with the scraper and bot running on this host, such that tests neither wipe, poison nor wake theirs. Session-wide,
+    as module and session fixtures (e.g. parsed pages) request through these as well."""
+    root_path = tmp_path_factory.mktemp("root")
+    # These connect on first use, so would otherwise keep using whichever path they first connected to.
+    disk_caches = [api.cache, bnsite_api.cache, beatmapset_hydrator.refresh_times]
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(cache, "PATH_PREFIX", f"{root_path}/cache/")
+        monkeypatch.setattr(bucket, "PATH_PREFIX", f"{root_path}/ratelimits/")
+        monkeypatch.setattr(checkpoint, "PATH_PREFIX", f"{root_path}/checkpoints/")
+        monkeypatch.setattr(notifier, "PATH_PREFIX", f"{root_path}/notify/")
+        for disk_cache in disk_caches:
+            disk_cache.close()
+        yield root_path
+
+    for disk_cache in disk_caches:
+        disk_cache.close()
+
+@pytest.fixture(autouse=True)
+def reset_user_resolver():
+    """Forgets the users any previous test came across (e.g. `User(1, "someone")`), and any database it was given,
+    such that tests do not depend on which ran before."""
+    user_resolver.clear()
+    user_resolver.database = None
+    yield
+    user_resolver.clear()
+    user_resolver.database = None
+
+@pytest.fixture(autouse=True)
+def reset_beatmapset_hydrator():
+    """Likewise forgets the beatmapsets any previous test came across, along with when they were refreshed."""
+    beatmapset_hydrator.clear()
+    beatmapset_hydrator.refresh_times.clear()
+    beatmapset_hydrator.database = None
+    yield
+    beatmapset_hydrator.clear()
+    beatmapset_hydrator.database = None
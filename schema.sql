@@ -95,7 +95,12 @@ CREATE TABLE `events` (
   `news_id` bigint(20) unsigned DEFAULT NULL,
   `content` mediumtext,
   PRIMARY KEY (`id`),
-  UNIQUE KEY `id_UNIQUE` (`id`)
+  UNIQUE KEY `id_UNIQUE` (`id`),
+  KEY `events_time_idx` (`time`),
+  KEY `events_type_time_idx` (`type`,`time`),
+  KEY `events_beatmapset_id_time_idx` (`beatmapset_id`,`time`),
+  KEY `events_user_id_time_idx` (`user_id`,`time`),
+  KEY `events_group_id_time_idx` (`group_id`,`time`)
 ) ENGINE=InnoDB AUTO_INCREMENT=22 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 DROP TABLE IF EXISTS `newsposts`;
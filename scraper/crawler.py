@@ -2,10 +2,10 @@ import sys
 sys.path.append('..')
 
 from datetime import datetime
-from typing import Generator, Callable
+from typing import Generator, Callable, Awaitable
 
-from aiess.web import api
 from aiess.objects import Event
+from aiess.registry import registry
 
 from scraper.requester import get_discussion_events, get_reply_events, get_beatmapset_events, get_news_events, get_group_events
 from scraper import populator
@@ -14,7 +14,9 @@ async def get_all_events_between(start_time: datetime, end_time: datetime, last_
     """Returns a generator of all events within the given time frame."""
     # Ensures name changes, beatmap updates, etc are considered.
     # Updates once for each pass (more than that isn't necessary considering time is locked).
-    api.cache.clear()
+    # Api responses and beatmapset metadata instead last for hours, as these are invalidated by the events changing them
+    # (see `STALE_AFTER_TYPES`) and by user names on pages differing from the ones we know (see `UserResolver.remember`).
+    registry.clear()
     populator.cached_discussions_json = {}
 
     # These are closely intertwined; beatmapset events rely on replies, which in turn rely on discussions.
@@ -25,7 +27,7 @@ async def get_all_events_between(start_time: datetime, end_time: datetime, last_
 async def get_news_between(start_time: datetime, end_time: datetime, last_checked_time: datetime=None) -> Generator[Event, None, None]:
     """Returns a generator of news events (from /home/news) within the given time frame."""
     # `get_news_events` generates events before a given time, rather than page, hence `generate_by_page=False`.
-    for event in __get_event_generations_between(get_news_events, start_time, end_time, generate_by_page=False):
+    async for event in __get_event_generations_between(get_news_events, start_time, end_time, generate_by_page=False):
         yield event
 
 async def get_group_events_between(start_time: datetime, end_time: datetime, last_checked_time: datetime) -> Generator[Event, None, None]:
@@ -33,18 +35,18 @@ async def get_group_events_between(start_time: datetime, end_time: datetime, las
     Note that start time does nothing in this case, as group changes are not timestamped, and as such have no
     time limit for latest event possible."""
     # `_from` in `get_group_events` denotes the timestamp to set on any group events found.
-    for event in get_group_events(_from=last_checked_time):
+    for event in await get_group_events(_from=last_checked_time):
         await populator.populate_from_bnsite(event)
         yield event
 
 async def __get_discussion_events_between(start_time: datetime, end_time: datetime) -> Generator[Event, None, None]:
     """Returns a generator of discussion events (from /beatmap-disussions) within the given time frame."""
-    for event in __get_event_generations_between(get_discussion_events, start_time, end_time):
+    async for event in __get_event_generations_between(get_discussion_events, start_time, end_time):
         yield event
 
 async def __get_reply_events_between(start_time: datetime, end_time: datetime) -> Generator[Event, None, None]:
     """Returns a generator of discussion events (from /beatmap-disussions) within the given time frame."""
-    for event in __get_event_generations_between(get_reply_events, start_time, end_time):
+    async for event in __get_event_generations_between(get_reply_events, start_time, end_time):
         await populator.populate_from_discussion(event)
         if not event.marked_for_deletion:
             yield event
@@ -52,21 +54,23 @@ async def __get_reply_events_between(start_time: datetime, end_time: datetime) -
 async def __get_beatmapset_events_between(start_time: datetime, end_time: datetime) -> Generator[Event, None, None]:
     """Returns a generator of beatmapset events (from /events) within the given time frame.
     Should be run after discussion events so that discussion contexts are available."""
-    for event in __get_event_generations_between(get_beatmapset_events, start_time, end_time):
+    async for event in __get_event_generations_between(get_beatmapset_events, start_time, end_time):
         await populator.populate_from_discussion(event)
         if not event.marked_for_deletion:
             yield event
 
-def __get_event_generations_between(
-        generator_function: Callable[[int], Generator[Event, None, None]],
+async def __get_event_generations_between(
+        generator_function: Callable[[int], Awaitable[Generator[Event, None, None]]],
         start_time: datetime, end_time: datetime, generate_by_page: bool=True) -> Generator[Event, None, None]:
     """Returns the same generator as the generation function argument, but within the given time frame and across multiple
-    generations rather than just one. This essentially bypasses the `limit` of pages by performing all requests necessary."""
+    generations rather than just one. This essentially bypasses the `limit` of pages by performing all requests necessary.
+
+    Each generation is requested without blocking the event loop, see `scraper.requester`."""
     current_time = start_time
     page = 1
 
     while current_time > end_time:
-        event_generator = generator_function(page if generate_by_page else current_time)
+        event_generator = await generator_function(page if generate_by_page else current_time)
         found_events = False
         found_too_new_events = False
 
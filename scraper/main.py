@@ -4,10 +4,12 @@ sys.path.append('..')
 import asyncio
 from datetime import datetime
 
-from aiess import timestamp, logger
+from aiess import timestamp, logger, notifier
 from aiess import Event
 from aiess.logger import log, colors, fmt
 from aiess.database import Database, SCRAPER_DB_NAME
+from aiess.resolver import user_resolver
+from aiess.hydrator import beatmapset_hydrator
 from aiess.reader import merge_concurrent
 
 from scraper.crawler import get_all_events_between, get_news_between, get_group_events_between
@@ -82,17 +84,17 @@ def format_event_log(event: Event) -> str:
     ])
 
 def insert_db(events) -> None:
-    """Inserts the given event list into the database in reversed order."""
+    """Inserts the given event list into the database in chronological order, all in one transaction,
+    then notifies any listening readers."""
     if not events:
         return
     
     events.sort(key=lambda event: event.time)
 
     log(f"--- Inserting {len(events)} Events into the Database ---")
-    for event in events:
-        log(".", newline=False)
-        database.insert_event(event)
-    log()
+    database.insert_events(events)
+    # Wakes up any readers (e.g. the bot) right away, rather than on their next poll.
+    notifier.publish(events[-1].time, count=len(events))
 
 def last_updated(current_time: datetime, _id: str) -> None:
     """Updates the last updated file to reflect the given time."""
@@ -101,6 +103,10 @@ def last_updated(current_time: datetime, _id: str) -> None:
 
 logger.init()
 database = Database(SCRAPER_DB_NAME)
+# Users already stored need not be requested from the api again, e.g. news post authors.
+user_resolver.use_database(database)
+# Likewise for beatmapsets, unless their metadata is stale, see `BEATMAPSET_TTL`.
+beatmapset_hydrator.use_database(database)
 
 loop = asyncio.get_event_loop()
 loop.run_until_complete(gather_loop())
\ No newline at end of file
@@ -7,12 +7,14 @@ from bs4.element import Tag
 import json
 
 from aiess.objects import Event, Beatmapset, Discussion, User
+from aiess.registry import registry
+from aiess.hydrator import beatmapset_hydrator
 from aiess.errors import DeletedContextError
 from aiess.logger import log_err
 from aiess import timestamp
 from aiess import event_types as types
 
-from scraper.parsers.event_parser import EventParser
+from scraper.parsers.event_parser import EventParser, harvest_users, prefetch_missing_users, prefetch_beatmapsets
 
 class BeatmapsetEventParser(EventParser):
 
@@ -26,6 +28,12 @@ class BeatmapsetEventParser(EventParser):
 
         event_jsons = json.loads(json_events.string)
         user_jsons  = json.loads(json_users.string)
+        harvest_users(user_jsons)
+        prefetch_missing_users(event_jsons, user_jsons)
+        prefetch_beatmapsets([
+            event_json["beatmapset"]["id"] for event_json in event_jsons
+            if event_json and event_json.get("beatmapset")
+        ])
 
         for event_json in event_jsons:
             event = self.parse_event_json(event_json, user_jsons)
@@ -69,9 +77,11 @@ class BeatmapsetEventParser(EventParser):
                 content = event_json["comment"]["reason"]
 
             # Reconstruct objects
-            beatmapset = Beatmapset(beatmapset_id)
-            user       = User(user_id, user_name) if user_id is not None else None
-            discussion = Discussion(discussion_id, beatmapset) if discussion_id is not None else None
+            # Edits and status changes make the metadata we know of stale, in which case it is refreshed from the api.
+            beatmapset_hydrator.invalidate_by_event(_type, beatmapset_id, time)
+            beatmapset = beatmapset_hydrator.get(beatmapset_id)
+            user       = registry.user(user_id, user_name) if user_id is not None else None
+            discussion = registry.discussion(discussion_id, beatmapset) if discussion_id is not None else None
         except DeletedContextError as err:
             log_err(err)
         else:
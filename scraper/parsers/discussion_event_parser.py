@@ -7,11 +7,13 @@ from bs4.element import Tag
 import json
 
 from aiess.objects import Event, Beatmapset, User, Discussion
+from aiess.registry import registry
+from aiess.hydrator import beatmapset_hydrator
 from aiess.errors import ParsingError, DeletedContextError
 from aiess import timestamp
 from aiess.logger import log_err
 
-from scraper.parsers.event_parser import EventParser
+from scraper.parsers.event_parser import EventParser, harvest_users, prefetch_missing_users, prefetch_beatmapsets
 
 class DiscussionEventParser(EventParser):
 
@@ -33,6 +35,9 @@ class DiscussionEventParser(EventParser):
 
         event_jsons = json.loads(json_discussions.string)
         user_jsons = json.loads(json_users.string)
+        harvest_users(user_jsons)
+        prefetch_missing_users(event_jsons, user_jsons)
+        prefetch_beatmapsets([event_json["beatmapset_id"] for event_json in event_jsons if event_json])
 
         for event_json in event_jsons:
             event = self.parse_event_json(event_json, user_jsons)
@@ -57,16 +62,16 @@ class DiscussionEventParser(EventParser):
             content = self.parse_discussion_message(event)
 
             # Reconstruct objects
-            beatmapset = Beatmapset(beatmapset_id)
-            user = User(user_id, user_name) if user_id is not None else None
+            beatmapset = beatmapset_hydrator.get(beatmapset_id)
+            user = registry.user(user_id, user_name) if user_id is not None else None
             if _type == "reply":
                 # Replies should look up the discussion they are posted on.
-                discussion = Discussion(discussion_id, beatmapset) if discussion_id is not None else None
+                discussion = registry.discussion(discussion_id, beatmapset) if discussion_id is not None else None
             else:
                 tab = self.parse_discussion_tab(event)
                 difficulty = self.parse_discussion_diff(event)
 
-                discussion = Discussion(discussion_id, beatmapset, user, content, tab, difficulty) if discussion_id is not None else None
+                discussion = registry.discussion(discussion_id, beatmapset, user, content, tab, difficulty) if discussion_id is not None else None
         except DeletedContextError as err:
             log_err(err)
         else:
@@ -113,11 +118,11 @@ class DiscussionEventParser(EventParser):
             else:                                   tab = "generalAll"
 
             # Reconstruct objects
-            beatmapset = Beatmapset(beatmapset_id)
-            user = User(user_id, user_name) if user_id is not None else None
+            beatmapset = beatmapset_hydrator.get(beatmapset_id)
+            user = registry.user(user_id, user_name) if user_id is not None else None
             # TODO: This portion is missing handling for replies, see the other method.
             # Still unclear which message_type replies use; will need to find out if/when replies get json formats.
-            discussion = Discussion(discussion_id, beatmapset, user, content, tab, difficulty) if discussion_id is not None else None
+            discussion = registry.discussion(discussion_id, beatmapset, user, content, tab, difficulty) if discussion_id is not None else None
         except DeletedContextError as err:
             log_err(err)
         else:
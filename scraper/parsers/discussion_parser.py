@@ -4,12 +4,16 @@ sys.path.append('..')
 from typing import Generator
 
 from aiess import Discussion, Beatmapset, User
+from aiess.registry import registry
+
+from scraper.parsers.event_parser import harvest_users
 
 class DiscussionParser():
 
     def parse(self, discussions_json: object, beatmapset: Beatmapset) -> Generator[Discussion, None, None]:
         """Returns a generator of discussions from the given beatmapset discussion page json, or None if no discussions exist."""
         discussion_jsons = discussions_json["beatmapset"]["discussions"]
+        harvest_users(discussions_json["beatmapset"].get("related_users"))
         for discussion_json in discussion_jsons:
             if not discussion_json: continue
             yield self.parse_discussion(discussion_json, discussions_json["beatmapset"], beatmapset)
@@ -21,13 +25,13 @@ class DiscussionParser():
         content    = discussion_json["posts"][0]["message"] if discussion_json["posts"] else None
         tab        = self.parse_tab(discussion_json, beatmapset_json)
         difficulty = self.parse_diff(discussion_json, beatmapset_json)
-        return Discussion(_id, beatmapset, user, content, tab, difficulty)
+        return registry.discussion(_id, beatmapset, user, content, tab, difficulty)
 
     def parse_user(self, user_id: str, beatmapset_json: object) -> User:
         """Returns a user with the given id and name supplied by the beatmapset json."""
         for related_user in beatmapset_json["related_users"]:
             if related_user["id"] == user_id:
-                return User(user_id, related_user["username"])
+                return registry.user(user_id, related_user["username"])
     
     def parse_discussion_post_author(self, post_id: str, beatmapset_json: object) -> User:
         """Returns the author of the given discussion post id if one exists, otherwise None."""
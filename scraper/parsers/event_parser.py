@@ -5,7 +5,10 @@ from bs4.element import Tag
 from datetime import datetime
 import re as regex
 
+from typing import List
 from aiess.errors import ParsingError, DeletedContextError
+from aiess.resolver import user_resolver
+from aiess.hydrator import beatmapset_hydrator
 from aiess import timestamp
 
 class EventParser():
@@ -130,4 +133,23 @@ class EventParser():
     
     def raise_if_deleted(self, event: Tag) -> bool:
         if self.is_beatmap_deleted(event):
-            raise DeletedContextError()
\ No newline at end of file
+            raise DeletedContextError()
+
+def prefetch_missing_users(event_jsons: List[object], user_jsons: List[object]) -> None:
+    """Looks up the users of the given event json objects which are not among the given user json objects all at once,
+    rather than one at a time when each of their events is parsed, see `UserResolver.prefetch`."""
+    page_user_ids = set(user_json["id"] for user_json in user_jsons or [])
+    user_resolver.prefetch(ids=[
+        event_json["user_id"] for event_json in event_jsons
+        if event_json and event_json.get("user_id") not in page_user_ids
+    ])
+
+def prefetch_beatmapsets(beatmapset_ids: List[int]) -> None:
+    """Loads the given beatmapsets from the database all at once, rather than one at a time when each of their events
+    is parsed, see `BeatmapsetHydrator.prefetch`."""
+    beatmapset_hydrator.prefetch(beatmapset_ids)
+
+def harvest_users(user_jsons: List[object]) -> None:
+    """Keeps the id and name of every given user json object (e.g. the json-users of a page) in memory and the
+    database, such that these need not be requested from the api later, see `UserResolver.harvest`."""
+    user_resolver.harvest((user_json["id"], user_json["username"]) for user_json in user_jsons or [])
@@ -9,6 +9,9 @@ import json
 from aiess import Event, User, Usergroup
 from aiess import event_types as types
 from aiess.database import Database, SCRAPER_DB_NAME
+from aiess.registry import registry
+
+from scraper.parsers.event_parser import harvest_users
 
 def parse(group_id: int, group_page: BeautifulSoup, last_checked_at: datetime) -> Generator[Event, None, None]:
     """Returns a generator of group addition and removal events from the given BeautifulSoup group page and its id."""
@@ -17,6 +20,7 @@ def parse(group_id: int, group_page: BeautifulSoup, last_checked_at: datetime) -
         raise ValueError("No group users json could be found.")
 
     users_json = json.loads(json_users.string)
+    harvest_users(users_json)
     return parse_users_json(group_id, users_json, last_checked_at)
 
 def parse_users_json(group_id: int, users_json: object, last_checked_at: datetime) -> Generator[Event, None, None]:
@@ -28,7 +32,7 @@ def parse_users_json(group_id: int, users_json: object, last_checked_at: datetim
         if user_id in missing_user_ids:
             missing_user_ids.remove(user_id)
         else:
-            new_users.append(User(_id=user_id, name=user_json["username"]))
+            new_users.append(registry.user(user_id, user_json["username"]))
     
     content = None
     time = last_checked_at
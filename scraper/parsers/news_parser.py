@@ -6,6 +6,7 @@ from bs4 import BeautifulSoup
 import json
 
 from aiess.objects import Event, User, NewsPost
+from aiess.resolver import user_resolver
 from aiess.timestamp import from_string
 
 def parse(events: BeautifulSoup) -> Generator[Event, None, None]:
@@ -15,6 +16,8 @@ def parse(events: BeautifulSoup) -> Generator[Event, None, None]:
         raise ValueError("No news json could be found.")
 
     post_jsons = json.loads(json_index.string)["news_posts"]
+    # Authors are only known by name, so are looked up all at once rather than for each post.
+    user_resolver.prefetch(names=[post_json["author"].strip() for post_json in post_jsons])
     return parse_post_jsons(post_jsons)
 
 def parse_post_jsons(post_jsons: Iterator[object]) -> Generator[Event, None, None]:
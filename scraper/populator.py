@@ -10,7 +10,7 @@ from aiess.timestamp import from_string
 from aiess import event_types as types
 from bnsite import api as bnsite_api
 
-from scraper.requester import request_discussions_json
+from scraper.requester import request_discussions_json_async
 from scraper.requester import get_map_page_discussions
 from scraper.requester import get_map_page_event_jsons
 from scraper.requester import get_map_page_discussion_jsons
@@ -21,27 +21,27 @@ cached_discussions_json = {}
 async def populate_from_discussion(event: Event) -> None:
     """Populates the given event using the beatmapset discussion json
     (e.g. missing discussion info and additional details like who did votes)."""
-    discussions_json = get_discussions_json(event.beatmapset)
+    discussions_json = await get_discussions_json(event.beatmapset)
     if discussions_json is None:
         # This happens if the beatmapset was deleted in between us scraping it and populating it.
         event.marked_for_deletion = True
         return
 
-    event.discussion = get_complete_discussion_info(event.discussion, event.beatmapset, discussions_json)
+    event.discussion = await get_complete_discussion_info(event.discussion, event.beatmapset, discussions_json)
     await __populate_additional_details(event, discussions_json)
 
 async def populate_from_bnsite(event: Event) -> None:
     """Populates the given event using the bnsite API if possible."""
     if event.type in [types.REMOVE, types.ADD]:
         # Group removal content should reflect the bnsite removal reason (e.g. Kicked/Resigned)
-        event.content = get_group_bnsite_comment(event)
-        event.group.mode = get_group_bnsite_mode(event)
+        event.content = await get_group_bnsite_comment(event)
+        event.group.mode = await get_group_bnsite_mode(event)
 
-def get_discussions_json(beatmapset: Beatmapset) -> object:
+async def get_discussions_json(beatmapset: Beatmapset) -> object:
     """Returns the beatmapset discussions json, containing all of the discussion information for the mapset,
     if possible, otherwise None."""
     if beatmapset.id not in cached_discussions_json:
-        discussions_json = request_discussions_json(beatmapset.id)
+        discussions_json = await request_discussions_json_async(beatmapset.id)
         if discussions_json:
             cached_discussions_json[beatmapset.id] = discussions_json
     else:
@@ -49,7 +49,7 @@ def get_discussions_json(beatmapset: Beatmapset) -> object:
     
     return discussions_json
 
-def get_complete_discussion_info(
+async def get_complete_discussion_info(
         discussion: Discussion, beatmapset: Beatmapset,
         discussions_json: object=None, db_name: str=SCRAPER_DB_NAME) -> Discussion:
     """Returns a discussion with complete information from the beatmapset discussion json
@@ -70,7 +70,7 @@ def get_complete_discussion_info(
         if __complete_discussion_context(discussion, db_name=db_name):
             return discussion
         
-        discussions_json = get_discussions_json(beatmapset)
+        discussions_json = await get_discussions_json(beatmapset)
         if not discussions_json:
             raise ParsingError("No discussions json exists to use for discussion context.")
 
@@ -169,7 +169,7 @@ def get_nomination_comment(event: Event, discussions_json: object) -> str:
     
     return None
 
-def get_group_bnsite_comment(event: Event) -> str:
+async def get_group_bnsite_comment(event: Event) -> str:
     """Returns any comment the bnsite has put on group events
     (e.g. BN removal reasons), if any, otherwise None."""
     if not event.group:
@@ -179,7 +179,7 @@ def get_group_bnsite_comment(event: Event) -> str:
     if event.type != types.REMOVE or event.group.id not in [32, 28]:
         return None
 
-    json = bnsite_api.request_last_eval(event.user.id)
+    json = await bnsite_api.request_last_eval_async(event.user.id)
     if not json or eval_likely_outdated(eval_json=json):
         return None
 
@@ -197,7 +197,7 @@ def get_group_bnsite_comment(event: Event) -> str:
 
     return comment
 
-def get_group_bnsite_mode(event: Event) -> str:
+async def get_group_bnsite_mode(event: Event) -> str:
     """Returns the mode of the bn according to the bnsite
     (e.g. "taiko"), if any, otherwise None."""
     if not event.group:
@@ -207,7 +207,7 @@ def get_group_bnsite_mode(event: Event) -> str:
     if event.group.id not in [7, 32, 28]:
         return None
     
-    json = bnsite_api.request_last_eval(event.user.id)
+    json = await bnsite_api.request_last_eval_async(event.user.id)
     if not json or eval_likely_outdated(eval_json=json):
         return None
     
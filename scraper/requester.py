@@ -4,10 +4,11 @@ sys.path.append('..')
 from datetime import datetime
 from bs4 import BeautifulSoup
 from requests import Response
-from typing import Generator
+from typing import Generator, List
 import json
 
-from aiess.web.ratelimiter import request_with_rate_limit
+from aiess.web.ratelimiter import request_with_rate_limit, request_with_rate_limit_async
+from aiess.web.singleflight import SingleFlight
 from aiess.objects import Event, Beatmapset, Discussion
 from aiess.settings import PAGE_RATE_LIMIT
 from aiess import event_types as types
@@ -18,15 +19,27 @@ from scraper.parsers.discussion_event_parser import discussion_event_parser
 from scraper.parsers.discussion_parser import discussion_parser
 from scraper.parsers import news_parser, group_parser
 
+# Pages requested while the same page is already being requested (e.g. the discussions of a beatmapset
+# several events are on) are only requested once, see `SingleFlight.stats` for how many requests this saved.
+single_flight = SingleFlight()
+
 def request_page(url: str) -> Response:
     """Requests a response object using the page rate limit.
     If cloudflare IUAM (https://blog.cloudflare.com/tag/iuam/) is active we simply wait until it's over."""
-    return request_with_rate_limit(url, PAGE_RATE_LIMIT, "page")
+    return single_flight.do(url, request_with_rate_limit, url, PAGE_RATE_LIMIT, "page")
+
+async def request_page_async(url: str) -> Response:
+    """Same as `request_page`, but without blocking the event loop, see `request_with_rate_limit_async`."""
+    return await single_flight.do_async(url, request_with_rate_limit_async, url, PAGE_RATE_LIMIT, "page")
 
 def request_json(url: str) -> object:
     """Requests the page from the url as a json object."""
     return json.loads(request_page(url).text)
 
+async def request_json_async(url: str) -> object:
+    """Requests the page from the url as a json object, without blocking the event loop."""
+    return json.loads((await request_page_async(url)).text)
+
 def soupify(html: str) -> BeautifulSoup:
     """Returns the given html as a BeautifulSoup object."""
     return BeautifulSoup(html, features="html.parser")
@@ -36,9 +49,14 @@ def request_soup(url: str) -> BeautifulSoup:
     text = request_page(url).text
     return soupify(text)
 
+async def request_soup_async(url: str) -> BeautifulSoup:
+    """Requests the page from the url as a BeautifulSoup object, without blocking the event loop."""
+    text = (await request_page_async(url)).text
+    return soupify(text)
+
 
 
-def request_beatmapset_events(page: int=1, limit: int=50) -> BeautifulSoup:
+async def request_beatmapset_events(page: int=1, limit: int=50) -> BeautifulSoup:
     """Requests the beatmapset events page as a BeautifulSoup object. Only certain events are queried."""
     # This way if events are added we ignore them until we've properly supported them.
     event_types = [
@@ -53,9 +71,9 @@ def request_beatmapset_events(page: int=1, limit: int=50) -> BeautifulSoup:
     for _type in map(lambda _type: _type.replace("-", "_"), event_types):
         type_query += f"&types[]={_type}"
     
-    return request_soup(f"https://osu.ppy.sh/beatmapsets/events?page={page}&limit={limit}{type_query}")
+    return await request_soup_async(f"https://osu.ppy.sh/beatmapsets/events?page={page}&limit={limit}{type_query}")
 
-def request_discussion_events(page: int=1, limit: int=50) -> BeautifulSoup:
+async def request_discussion_events(page: int=1, limit: int=50) -> BeautifulSoup:
     """Requests the discussion events page as a BeautifulSoup object."""
     event_types = [types.SUGGESTION, types.PROBLEM, types.NOTE, types.PRAISE, types.HYPE]
 
@@ -63,43 +81,46 @@ def request_discussion_events(page: int=1, limit: int=50) -> BeautifulSoup:
     for _type in map(lambda _type: _type.replace("-", "_"), event_types):
         type_query += f"&message_types[]={_type}"
     
-    return request_soup(f"https://osu.ppy.sh/beatmapsets/discussions?page={page}&limit={limit}{type_query}")
+    return await request_soup_async(f"https://osu.ppy.sh/beatmapsets/discussions?page={page}&limit={limit}{type_query}")
 
-def request_reply_events(page: int=1, limit: int=50) -> BeautifulSoup:
+async def request_reply_events(page: int=1, limit: int=50) -> BeautifulSoup:
     """Requests the discussion reply events page as a BeautifulSoup object."""
-    return request_soup(f"https://osu.ppy.sh/beatmapsets/discussions/posts?page={page}&limit={limit}")
+    return await request_soup_async(f"https://osu.ppy.sh/beatmapsets/discussions/posts?page={page}&limit={limit}")
 
-def request_news(_from: datetime, limit: int=20) -> BeautifulSoup:
+async def request_news(_from: datetime, limit: int=20) -> BeautifulSoup:
     """Requests the news home page as a BeautifulSoup object with the newest post being from the given datetime."""
     # The `id` attribute doesn't seem to matter.
-    return request_soup(f"https://osu.ppy.sh/home/news?cursor[id]=0&cursor[published_at]={to_string(_from)}&limit={limit}")
+    return await request_soup_async(f"https://osu.ppy.sh/home/news?cursor[id]=0&cursor[published_at]={to_string(_from)}&limit={limit}")
 
-def request_group_page(group_id: int) -> BeautifulSoup:
+async def request_group_page(group_id: int) -> BeautifulSoup:
     """Requests the group page of the given group id as a BeautifulSoup object."""
-    return request_soup(f"https://osu.ppy.sh/groups/{group_id}")
+    return await request_soup_async(f"https://osu.ppy.sh/groups/{group_id}")
 
 
 
-def get_beatmapset_events(page: int=1, limit: int=50) -> Generator[Event, None, None]:
+async def get_beatmapset_events(page: int=1, limit: int=50) -> Generator[Event, None, None]:
     """Returns a generator of Event objects from the beatmapset events page. Newer events are yielded first."""
-    return beatmapset_event_parser.parse(request_beatmapset_events(page, limit))
+    return beatmapset_event_parser.parse(await request_beatmapset_events(page, limit))
 
-def get_discussion_events(page: int=1, limit: int=50) -> Generator[Event, None, None]:
+async def get_discussion_events(page: int=1, limit: int=50) -> Generator[Event, None, None]:
     """Returns a generator of Event objects from the discussion events page. Newer events are yielded first."""
-    return discussion_event_parser.parse(request_discussion_events(page, limit))
+    return discussion_event_parser.parse(await request_discussion_events(page, limit))
 
-def get_reply_events(page: int=1, limit: int=50) -> Generator[Event, None, None]:
+async def get_reply_events(page: int=1, limit: int=50) -> Generator[Event, None, None]:
     """Returns a generator of Event objects from the discussion reply events page. Newer events are yielded first."""
-    return discussion_event_parser.parse(request_reply_events(page, limit))
+    return discussion_event_parser.parse(await request_reply_events(page, limit))
 
-def get_news_events(_from: datetime, limit: int=20) -> Generator[Event, None, None]:
+async def get_news_events(_from: datetime, limit: int=20) -> Generator[Event, None, None]:
     """Returns a generator of Event objects from the news home page. Newer events are yielded first."""
-    return news_parser.parse(request_news(_from, limit))
+    return news_parser.parse(await request_news(_from, limit))
 
-def get_group_events(_from: datetime) -> Generator[Event, None, None]:
-    """Returns a generator of group addition and removal Event objects from all group pages."""
+async def get_group_events(_from: datetime) -> List[Event]:
+    """Returns a list of group addition and removal Event objects from all group pages."""
+    events = []
     for group_id in [4, 7, 11, 16, 22, 28, 32]:
-        yield from group_parser.parse(group_id=group_id, group_page=request_group_page(group_id), last_checked_at=_from)
+        group_page = await request_group_page(group_id)
+        events.extend(group_parser.parse(group_id=group_id, group_page=group_page, last_checked_at=_from))
+    return events
 
 
 
@@ -111,6 +132,13 @@ def request_discussions_json(beatmapset_id: int) -> object:
     except json.decoder.JSONDecodeError:
         return None
 
+async def request_discussions_json_async(beatmapset_id: int) -> object:
+    """Same as `request_discussions_json`, but without blocking the event loop."""
+    try:
+        return await request_json_async(f"https://osu.ppy.sh/beatmapsets/{beatmapset_id}/discussion?format=json")
+    except json.decoder.JSONDecodeError:
+        return None
+
 def get_map_page_discussions(beatmapset: Beatmapset, discussions_json: object=None) -> Generator[Discussion, None, None]:
     """Returns a generator of discussion objects from the beatmapset discussion page json. If not supplied it is scraped."""
     discussions_json = request_discussions_json(beatmapset.id) if discussions_json is None else discussions_json
@@ -2,13 +2,16 @@ import sys
 sys.path.append('..')
 
 import pytest
+import json
+from unittest import mock
 
 from aiess.errors import ParsingError, DeletedContextError
 from aiess.timestamp import from_string
 
 from scraper.tests.mocks.events import issue_resolve, problem
 from scraper.tests.mocks.events.faulty import no_events, resolve_deleted_beatmap, kudosu_deleted_beatmap
-from scraper.parsers.event_parser import EventParser
+from scraper.parsers.event_parser import EventParser, harvest_users
+from scraper.tests.mocks import events_json as mock_events_json
 
 @pytest.fixture
 def event_parser():
@@ -190,4 +193,13 @@ def test_from_ISO_8601_to_datetime():
     assert test_datetime.hour == 10
     assert test_datetime.day == 5
     assert test_datetime.month == 12
-    assert test_datetime.year == 2019
\ No newline at end of file
+    assert test_datetime.year == 2019
+
+def test_harvest_users():
+    user_jsons = json.loads(mock_events_json.soup.find("script", {"id": "json-users"}).string)
+    with mock.patch("scraper.parsers.event_parser.user_resolver") as mock_resolver:
+        harvest_users(user_jsons)
+
+    harvested_users = list(mock_resolver.harvest.call_args[0][0])
+    assert len(harvested_users) == len(user_jsons)
+    assert all(_id and name for _id, name in harvested_users)
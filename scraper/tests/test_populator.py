@@ -37,21 +37,23 @@ def test_correct_setup():
     assert not database.retrieve_table_data("events")
     assert not database.retrieve_table_data("discussions")
 
-def test_old_discussion():
+@pytest.mark.asyncio
+async def test_old_discussion():
     beatmapset = Beatmapset(41823, beatmapset_json=mock_old_beatmap.JSON)
     discussion = Discussion(1234956, beatmapset)
     
     # Can't obtain any discussion data from a beatmapset that doesn't have a discussion interface.
     with pytest.raises(ParsingError):
-        get_complete_discussion_info(discussion, beatmapset, db_name=SCRAPER_TEST_DB_NAME)
+        await get_complete_discussion_info(discussion, beatmapset, db_name=SCRAPER_TEST_DB_NAME)
 
-def test_discussion():
+@pytest.mark.asyncio
+async def test_discussion():
     beatmapset = Beatmapset(1001546, beatmapset_json=mock_beatmap.JSON)
     discussion = Discussion(1234956, beatmapset)
 
     # Some information will not be available until it is supplied by other sources
     # (e.g. discussion jsons, prior database entires, scraping)
-    discussion = get_complete_discussion_info(discussion, beatmapset, db_name=SCRAPER_TEST_DB_NAME)
+    discussion = await get_complete_discussion_info(discussion, beatmapset, db_name=SCRAPER_TEST_DB_NAME)
 
     assert discussion.user.id == 4967662
     assert discussion.user.name == "greenhue"
@@ -219,8 +221,8 @@ async def test_populate_from_bnsite_content(group_event):
         mock_datetime.utcnow.return_value = from_string("2020-01-02 06:00:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": True,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z",
@@ -230,8 +232,8 @@ async def test_populate_from_bnsite_content(group_event):
             await populate_from_bnsite(group_event)
             assert group_event.content == "Resigned"
         
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": False,
                 "kind": "currentBn",
                 "updatedAt": "2020-01-01T00:00:00.000Z",
@@ -242,8 +244,8 @@ async def test_populate_from_bnsite_content(group_event):
             await populate_from_bnsite(group_event)
             assert group_event.content is None
         
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": False,
                 "kind": "currentBn",
                 "updatedAt": "2020-01-01T00:00:00.000Z",
@@ -260,8 +262,8 @@ async def test_populate_from_bnsite_mode(group_event):
         mock_datetime.utcnow.return_value = from_string("2020-01-02 06:00:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": True,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z",
@@ -284,103 +286,110 @@ async def test_populate_from_bnsite_mode_integration():
         assert event.content is None
         assert event.group.mode == "osu"
 
-def test_get_group_nat_comment(group_event):
+@pytest.mark.asyncio
+async def test_get_group_nat_comment(group_event):
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-01-01 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": True,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z"
             }
 
-            assert get_group_bnsite_comment(group_event) == "Resigned"
+            assert await get_group_bnsite_comment(group_event) == "Resigned"
 
-def test_get_group_nat_comment_wrong_group(group_event):
+@pytest.mark.asyncio
+async def test_get_group_nat_comment_wrong_group(group_event):
     group_event.group = Usergroup(4, "Global Moderation Team")
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-03-08 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": True,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z"
             }
 
-            assert get_group_bnsite_comment(group_event) is None
+            assert await get_group_bnsite_comment(group_event) is None
 
-def test_get_group_nat_comment_added(group_event):
+@pytest.mark.asyncio
+async def test_get_group_nat_comment_added(group_event):
     group_event.type = "add"
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-03-08 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": True,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z"
             }
 
-            assert get_group_bnsite_comment(group_event) is None
+            assert await get_group_bnsite_comment(group_event) is None
 
-def test_get_group_nat_comment_old(group_event):
+@pytest.mark.asyncio
+async def test_get_group_nat_comment_old(group_event):
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-03-08 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": False,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z"
             }
 
-            assert get_group_bnsite_comment(group_event) is None
+            assert await get_group_bnsite_comment(group_event) is None
 
-def test_get_group_nat_comment_empty_json(group_event):
+@pytest.mark.asyncio
+async def test_get_group_nat_comment_empty_json(group_event):
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-01-01 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {}
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {}
 
-            assert get_group_bnsite_comment(group_event) is None
+            assert await get_group_bnsite_comment(group_event) is None
 
-def test_get_group_mode(group_event):
+@pytest.mark.asyncio
+async def test_get_group_mode(group_event):
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-01-01 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": False,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z",
                 "mode": "taiko"
             }
 
-            assert get_group_bnsite_mode(group_event) == "taiko"
+            assert await get_group_bnsite_mode(group_event) == "taiko"
 
-def test_get_group_mode_outdated(group_event):
+@pytest.mark.asyncio
+async def test_get_group_mode_outdated(group_event):
     with mock.patch("scraper.populator.datetime") as mock_datetime:
         mock_datetime.utcnow.return_value = from_string("2020-03-01 00:01:00")
         mock_datetime.side_effect = datetime
 
-        with mock.patch("scraper.populator.bnsite_api") as mock_bnsite_api:
-            mock_bnsite_api.request_last_eval.return_value = {
+        with mock.patch("scraper.populator.bnsite_api.request_last_eval_async") as mock_request:
+            mock_request.return_value = {
                 "active": False,
                 "kind": "resignation",
                 "updatedAt": "2020-01-01T00:00:00.000Z",
                 "mode": "taiko"
             }
 
-            assert get_group_bnsite_mode(group_event) is None
+            assert await get_group_bnsite_mode(group_event) is None
 
 def test_eval_likely_outdated():
     old_archived_json = {
@@ -2,6 +2,7 @@ import sys
 sys.path.append('..')
 
 import mock
+import pytest
 from datetime import datetime
 
 from aiess.database import Database, SCRAPER_TEST_DB_NAME
@@ -13,11 +14,12 @@ from scraper.requester import get_beatmapset_events
 from scraper.requester import get_discussion_events
 from scraper.requester import get_reply_events
 
-def test_get_group_events():
+@pytest.mark.asyncio
+async def test_get_group_events():
     Database(SCRAPER_TEST_DB_NAME).clear_table_data("group_users")
 
     with mock.patch("scraper.parsers.group_parser.SCRAPER_DB_NAME", SCRAPER_TEST_DB_NAME):
-        events = get_group_events(_from=datetime.utcnow())
+        events = await get_group_events(_from=datetime.utcnow())
 
         event_n = 0
         for event in events:
@@ -28,8 +30,9 @@ def test_get_group_events():
     
     assert event_n > 100
 
-def test_get_news_events():
-    events = get_news_events(_from=datetime.utcnow(), limit=20)
+@pytest.mark.asyncio
+async def test_get_news_events():
+    events = await get_news_events(_from=datetime.utcnow(), limit=20)
     
     event_n = 0
     for event in events:
@@ -44,8 +47,9 @@ def test_get_news_events():
     
     assert event_n == 20
 
-def test_get_beatmapset_events():
-    events = get_beatmapset_events(page=1, limit=50)
+@pytest.mark.asyncio
+async def test_get_beatmapset_events():
+    events = await get_beatmapset_events(page=1, limit=50)
 
     event_n = 0
     for event in events:
@@ -54,8 +58,9 @@ def test_get_beatmapset_events():
     
     assert event_n >= 45  # Leniency in case a beatmapset was deleted.
 
-def test_get_discussion_events():
-    events = get_discussion_events(page=1, limit=50)
+@pytest.mark.asyncio
+async def test_get_discussion_events():
+    events = await get_discussion_events(page=1, limit=50)
     
     event_n = 0
     for event in events:
@@ -65,8 +70,9 @@ def test_get_discussion_events():
     
     assert event_n >= 45  # Leniency in case a discussion was deleted.
 
-def test_get_reply_events():
-    events = get_reply_events(page=1, limit=50)
+@pytest.mark.asyncio
+async def test_get_reply_events():
+    events = await get_reply_events(page=1, limit=50)
     
     event_n = 0
     for event in events: